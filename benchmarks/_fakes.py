@@ -0,0 +1,181 @@
+"""Offline stand-ins for the OpenAI client and search transport.
+
+Shared by the benchmark scripts so they run without network access or API
+keys. Responses are shaped just enough for every agent to parse them.
+"""
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from swarm.transport import Transport  # noqa: E402
+
+
+class FakeCompletions:
+    def __init__(self, client):
+        self._client = client
+
+    def create(self, model, messages, **kwargs):
+        client = self._client
+        with client.lock:
+            client.calls += 1
+            client.calls_by_model[model] = client.calls_by_model.get(model, 0) + 1
+        with client.pool.connection() if client.pool else _no_connection():
+            if client.latency:
+                time.sleep(client.latency)
+
+        system = messages[0]["content"] if messages else ""
+        padding = " Lorem ipsum dolor sit amet." * (client.reply_chars // 28)
+        if "JSON array" in system:
+            # Queries differ per task, as real generated queries would
+            task = (messages[-1].get("content") or "").split("\n", 1)[0].removeprefix("Research task: ")
+            content = json.dumps([f"{task} overview", f"{task} statistics", f"{task} analysis"])
+        elif "follow-up" in system:
+            content = json.dumps({"questions": client.followups})
+        elif kwargs.get("response_format", {}).get("type") == "json_object":
+            content = json.dumps({
+                "content": "Fake analysis." + padding,
+                "summary": "Fake data summary.",
+                "data": {},
+                "sources": [],
+            })
+        else:
+            # Echo the first prompt line so callers can check which run got it
+            first_line = (messages[-1].get("content") or "").split("\n", 1)[0][:200]
+            content = f"Fake report.\n\nBody of the fake report. {first_line}{padding}"
+
+        prompt_tokens = sum(len(m.get("content") or "") for m in messages) // 4
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content, tool_calls=None))],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=len(content) // 4,
+                total_tokens=prompt_tokens + len(content) // 4,
+                prompt_tokens_details=SimpleNamespace(cached_tokens=0),
+            ),
+        )
+
+
+class FakeClient:
+    """Counts chat completion calls and returns canned responses.
+
+    ``reply_chars`` pads free-text replies to about that length, for
+    benchmarks where completion size matters. ``followups`` are returned
+    when asked to predict follow-up questions. With a ``pool`` every call
+    holds one of its connections while it waits.
+    """
+
+    def __init__(self, latency: float = 0.0, reply_chars: int = 0, followups: tuple = (),
+                 pool: "FakeConnectionPool" = None):
+        self.latency = latency
+        self.reply_chars = reply_chars
+        self.followups = list(followups)
+        self.pool = pool
+        self.calls = 0
+        self.calls_by_model: dict[str, int] = {}
+        self.lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=FakeCompletions(self))
+
+
+@contextmanager
+def _no_connection():
+    yield
+
+
+class FakeConnectionPool:
+    """Stands in for the transport's httpx pool.
+
+    At most ``max_connections`` requests are in flight; the rest wait for a
+    free connection.
+    """
+
+    def __init__(self, transport: Transport):
+        self._transport = transport
+        self._slots = threading.BoundedSemaphore(transport.max_connections)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.opened = 0
+        self.waited = 0
+
+    @contextmanager
+    def connection(self):
+        transport = self._transport
+        with transport._lock:
+            transport._llm_requests += 1
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.waited += 1
+            self._slots.acquire()
+        with self._lock:
+            self._in_flight += 1
+            if self._in_flight > self.opened:
+                # Connections stay open, so a new one is only needed at a new peak
+                self.opened += 1
+                with transport._lock:
+                    transport._llm_connections += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+
+class FakeResponse:
+    def __init__(self, payload: dict, status_code: int = 200):
+        self._payload = payload
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode()
+        self.headers = {"content-type": "application/json"}
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeTransport(Transport):
+    """Serves Tavily-shaped search results with a fixed relevance score.
+
+    ``openai_client()`` returns a ``FakeClient`` taking ``llm_latency`` per
+    call on a pool of ``max_connections``, so a swarm built without a client
+    waits on its transport's pool as it would on the real one.
+    """
+
+    def __init__(self, score: float = 0.8, results: int = 5, latency: float = 0.0,
+                 llm_latency: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.score = score
+        self.results = results
+        self.latency = latency
+        self.llm_latency = llm_latency
+        self.pool = FakeConnectionPool(self)
+
+    def openai_client(self, **kwargs) -> FakeClient:
+        return FakeClient(latency=self.llm_latency, pool=self.pool, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        with self._lock:
+            self._search_requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        query = (kwargs.get("json") or kwargs.get("params") or {}).get("query", "")
+        return FakeResponse({
+            "results": [
+                {
+                    "title": f"Result {i} for {query}",
+                    "url": f"https://example.com/{abs(hash(query)) % 10000}/{i}",
+                    "content": f"Snippet {i} about {query}. " * 20,
+                    "score": self.score,
+                }
+                for i in range(self.results)
+            ]
+        })
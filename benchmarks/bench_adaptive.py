@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Average LLM calls per query: fixed ``standard`` preset vs ``auto`` depth.
+
+Usage:
+    python benchmarks/bench_adaptive.py
+"""
+
+import sys
+
+from _fakes import FakeClient, FakeTransport
+
+from swarm.coordinator import ResearchSwarm
+
+QUERIES = [
+    "Who founded OpenAI?",
+    "What is retrieval augmented generation?",
+    "When was the transformer architecture introduced?",
+    "Define vector database",
+    "What is the market size of AI agents in 2024?",
+    "How many developers use GitHub Copilot?",
+    "Recent research advances in protein folding algorithms",
+    "Pros and cons of remote work: risks, limitations and implications for productivity",
+    "Compare pricing and adoption trends of cloud GPU providers",
+    "Impact of LLMs on software engineering studies and evidence of productivity growth",
+]
+
+
+def average_calls(depth: str) -> float:
+    client = FakeClient()
+    swarm = ResearchSwarm(client=client, transport=FakeTransport(score=0.85))
+    swarm.agents["search"].tavily_api_key = "bench"
+    for query in QUERIES:
+        swarm.research(query, depth=depth)
+    return client.calls / len(QUERIES)
+
+
+def main() -> int:
+    before = average_calls("standard")
+    after = average_calls("auto")
+    print(f"standard: {before:.2f} LLM calls/query")
+    print(f"auto:     {after:.2f} LLM calls/query ({(1 - after / before):.0%} fewer)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Per-turn latency and tokens of a chat conversation, stateless vs session.
+
+Plays one scripted conversation (a question and its follow-ups) twice, each
+time on a fresh swarm against fakes with fixed I/O latency: once the way the
+stateless chat did it, researching every message from scratch, and once
+through a ``ChatSession`` that answers follow-ups from its working set.
+Fails if the session does not save at least ``--min-savings`` of the
+follow-ups' tokens.
+
+Usage:
+    python benchmarks/bench_chat_session.py [--depth standard] [--latency 0.05] [--reply-chars 2000]
+"""
+
+import argparse
+import sys
+import time
+
+from _fakes import FakeClient, FakeTransport
+
+from swarm.coordinator import ResearchSwarm
+from swarm.session import ChatSession
+
+CONVERSATION = (
+    "What is the market size of AI agents in 2024?",
+    "How fast is it growing?",
+    "Who are the main vendors?",
+    "What about in Europe?",
+    "Which of those are profitable?",
+    "How fast is it growing?",
+)
+
+
+def make_swarm(latency: float, reply_chars: int) -> ResearchSwarm:
+    swarm = ResearchSwarm(
+        client=FakeClient(latency=latency, reply_chars=reply_chars),
+        transport=FakeTransport(latency=latency / 2),
+    )
+    swarm.agents["search"].tavily_api_key = "bench"
+    return swarm
+
+
+def tokens(result) -> int:
+    total = result.metadata["usage"]["total"]
+    return total["prompt_tokens"] + total["completion_tokens"]
+
+
+def play(ask, depth: str) -> list[tuple[float, int, int]]:
+    """(seconds, tokens, search requests) per turn."""
+    turns = []
+    for message in CONVERSATION:
+        start = time.perf_counter()
+        result = ask(message, depth=depth)
+        turns.append((
+            time.perf_counter() - start,
+            tokens(result),
+            result.metadata["transport"]["search_requests"],
+        ))
+    return turns
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--depth", default="standard", choices=["quick", "standard", "deep"])
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per fake LLM call")
+    parser.add_argument("--reply-chars", type=int, default=2000, help="Length of fake LLM replies")
+    parser.add_argument("--min-savings", type=float, default=0.15,
+                        help="Required fraction of follow-up tokens saved")
+    args = parser.parse_args()
+
+    stateless = play(make_swarm(args.latency, args.reply_chars).research, args.depth)
+    session = ChatSession(make_swarm(args.latency, args.reply_chars))
+    reused = play(session.ask, args.depth)
+
+    print(f"{args.depth} depth, {args.latency * 1e3:g} ms per LLM call:")
+    print(f"  {'turn':<48} {'stateless':>18} {'session':>18}")
+    searches = [0, 0]
+    for i, (message, a, b) in enumerate(zip(CONVERSATION, stateless, reused)):
+        kind = "follow-up" if session.stats.history[i]["followup"] else "full"
+        # Transport counters are cumulative per swarm
+        for side, turns in enumerate((stateless, reused)):
+            searches[side] = turns[i][2] - (turns[i - 1][2] if i else 0)
+        print(f"  {message[:38]:<38} {kind:>9} "
+              f"{a[0]:5.2f}s {a[1]:6,}t {searches[0]:2}q "
+              f"{b[0]:5.2f}s {b[1]:6,}t {searches[1]:2}q")
+
+    followups = [i for i, turn in enumerate(session.stats.history) if turn["followup"]]
+    base_tokens = sum(stateless[i][1] for i in followups)
+    session_tokens = sum(reused[i][1] for i in followups)
+    base_seconds = sum(stateless[i][0] for i in followups)
+    session_seconds = sum(reused[i][0] for i in followups)
+    saved = 1 - session_tokens / base_tokens if base_tokens else 0.0
+    print(f"\nfollow-ups ({len(followups)}): {base_seconds:.2f}s -> {session_seconds:.2f}s, "
+          f"{base_tokens:,} -> {session_tokens:,} tokens ({saved:.0%} saved)")
+    print(f"session's own estimate: {session.stats.to_dict()['tokens_saved']:,} tokens, "
+          f"{session.stats.seconds_saved:.2f}s saved; "
+          f"{session.stats.searches_skipped} follow-ups needed no search")
+    if saved < args.min_savings:
+        print(f"FAIL: saved less than {args.min_savings:.0%} of follow-up tokens")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Stress one shared ResearchSwarm with many concurrent research() calls.
+
+Every run goes through a single warm swarm, against fakes with fixed I/O
+latency. LLM calls wait on the swarm transport's connection pool
+(``--max-connections``), so an undersized pool shows up as lost scaling. Each result is checked against a sequential reference run of the
+same depth: it must answer its own query (the fake echoes the synthesis
+prompt into the report), use the same agents and make the same number of
+LLM calls (usage tracked per run, with no cross-talk). ``DEPTH_CONFIG`` must
+be unchanged afterwards. Throughput is reported per concurrency level. The
+script fails if any check fails or if throughput at the highest level is
+below ``--min-scaling`` of ideal linear scaling. With fake latencies this
+short, the gap to linear is mostly the runs' own CPU time (prompt building,
+reranking) contending for the GIL, plus the slowest run of the last wave.
+
+Usage:
+    python benchmarks/bench_concurrency.py [--runs 96] [--levels 1 8 32] [--max-connections 64]
+"""
+
+import argparse
+import copy
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from _fakes import FakeTransport
+
+from swarm.coordinator import ResearchSwarm
+
+DEPTHS = ("quick", "standard", "deep", "auto")
+TOPICS = (
+    "What is the market size of AI agents in 2024?",
+    "Recent research advances in protein folding",
+    "Pros and cons of remote work for productivity",
+    "Who founded OpenAI?",
+)
+
+
+def queries(n: int) -> list[tuple[str, str]]:
+    """Distinct (query, depth) pairs cycling through depths and topics."""
+    return [(f"[{i}] {TOPICS[i % len(TOPICS)]}", DEPTHS[i % len(DEPTHS)]) for i in range(n)]
+
+
+def signature(result) -> tuple:
+    return (
+        tuple(sorted(result.agent_outputs)),
+        result.metadata["usage"]["total"]["calls"],
+    )
+
+
+def check(result, query: str, depth: str, reference: dict) -> list[str]:
+    problems = []
+    if result.query != query or result.depth != depth:
+        problems.append(f"{query}: got result for {result.query!r} ({result.depth})")
+    if f"Research Question: {query}" not in result.report:
+        problems.append(f"{query}: report was written for another query")
+    expected = reference[(query.split("] ", 1)[1], depth)]
+    if signature(result) != expected:
+        problems.append(f"{query}: agents/calls {signature(result)} != sequential {expected}")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=96)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds per fake LLM call")
+    parser.add_argument("--max-connections", type=int, default=64, help="Transport pool size")
+    parser.add_argument("--min-scaling", type=float, default=0.4,
+                        help="Required fraction of linear speedup at the highest level")
+    args = parser.parse_args()
+
+    # No client: the swarm builds it on its transport, as it does in production
+    transport = FakeTransport(
+        latency=args.latency / 2, llm_latency=args.latency, max_connections=args.max_connections
+    )
+    swarm = ResearchSwarm(transport=transport)
+    swarm.agents["search"].tavily_api_key = "bench"
+    presets = copy.deepcopy(dict(ResearchSwarm.DEPTH_CONFIG))
+
+    # Sequential reference for every (topic, depth) pair
+    reference = {}
+    for topic in TOPICS:
+        for depth in DEPTHS:
+            reference[(topic, depth)] = signature(swarm.research(f"[ref] {topic}", depth=depth))
+
+    problems: list[str] = []
+    rates = {}
+    work = queries(args.runs)
+    for level in args.levels:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=level) as executor:
+            futures = [executor.submit(swarm.research, q, depth=d) for q, d in work]
+            for (query, depth), future in zip(work, futures):
+                try:
+                    problems.extend(check(future.result(), query, depth, reference))
+                except Exception as e:
+                    problems.append(f"{query}: raised {e!r}")
+        elapsed = time.perf_counter() - start
+        rates[level] = args.runs / elapsed
+        print(f"  {level:3d} concurrent: {rates[level]:7.1f} runs/s "
+              f"({rates[level] / rates[args.levels[0]]:.1f}x)")
+
+    stats = transport.stats()
+    print(f"\npool of {args.max_connections}: {stats.llm_requests} LLM requests on "
+          f"{stats.llm_connections} connections, {transport.pool.waited} waited for one")
+
+    if dict(ResearchSwarm.DEPTH_CONFIG) != presets:
+        problems.append("DEPTH_CONFIG was modified by research()")
+
+    top = args.levels[-1]
+    ideal = min(top, args.runs) / args.levels[0]
+    scaling = rates[top] / rates[args.levels[0]] / ideal
+    print(f"\n{len(problems)} problems; scaling at {top}: {scaling:.0%} of linear")
+    for problem in problems[:20]:
+        print(f"  {problem}")
+    if problems or scaling < args.min_scaling:
+        print("FAIL")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
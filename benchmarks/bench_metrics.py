@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Cost of metrics instrumentation on the research hot path.
+
+Measures each recording primitive in isolation, then runs the whole swarm
+against zero-latency fakes with the real registry and with a no-op one,
+which isolates the CPU time instrumentation adds per run. Fails if that is
+more than ``--budget`` percent of a run with ``--latency`` seconds per fake
+LLM call (still far below real API latency).
+
+Usage:
+    python benchmarks/bench_metrics.py [--runs 100] [--latency 0.002] [--budget 2]
+"""
+
+import argparse
+import sys
+import time
+
+from _fakes import FakeClient, FakeTransport
+
+from swarm.coordinator import ResearchSwarm
+from swarm.metrics import MetricsRegistry
+
+QUERY = "What is the market size of AI agents in 2024?"
+
+
+class _NullSeries:
+    def inc(self, amount=1.0):
+        pass
+
+    dec = inc
+
+    def observe(self, value):
+        pass
+
+    def set(self, value):
+        pass
+
+
+class _NullMetric:
+    _series = _NullSeries()
+
+    def labels(self, *values, **labels):
+        return self._series
+
+
+class NullRegistry(MetricsRegistry):
+    """A registry whose metrics record nothing: the uninstrumented baseline."""
+
+    _metric = _NullMetric()
+
+    def counter(self, *args, **kwargs):
+        return self._metric
+
+    gauge = histogram = counter
+
+
+def per_op_ns(fn, n: int = 200_000) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e9
+
+
+def run_seconds(registry: MetricsRegistry, runs: int, latency: float = 0.0) -> float:
+    client = FakeClient(latency=latency)
+    swarm = ResearchSwarm(client=client, transport=FakeTransport(), metrics=registry)
+    swarm.agents["search"].tavily_api_key = "bench"
+    swarm.research(QUERY, depth="deep")  # warm up
+    start = time.perf_counter()
+    for _ in range(runs):
+        swarm.research(QUERY, depth="deep")
+    return (time.perf_counter() - start) / runs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.002, help="Seconds per fake LLM call")
+    parser.add_argument("--budget", type=float, default=2.0, help="Max overhead in percent")
+    args = parser.parse_args()
+
+    registry = MetricsRegistry()
+    counter = registry.counter("bench_total", "", ("agent", "outcome"))
+    histogram = registry.histogram("bench_seconds", "", ("agent",))
+    gauge = registry.gauge("bench_depth", "").labels()
+    print("per operation:")
+    print(f"  counter.labels().inc()       {per_op_ns(lambda: counter.labels('search', 'ok').inc()):7.0f} ns")
+    print(f"  histogram.labels().observe() {per_op_ns(lambda: histogram.labels('search').observe(0.42)):7.0f} ns")
+    print(f"  gauge.inc()                  {per_op_ns(gauge.inc):7.0f} ns")
+
+    # Alternate to spread out machine noise; keep the best of each
+    baseline, instrumented = [], []
+    for _ in range(5):
+        baseline.append(run_seconds(NullRegistry(), args.runs))
+        instrumented.append(run_seconds(MetricsRegistry(), args.runs))
+    base, inst = min(baseline), min(instrumented)
+    added = inst - base
+    print(f"\ndeep research run, zero-latency fakes ({args.runs} runs):")
+    print(f"  no metrics:   {base * 1e3:7.3f} ms/run")
+    print(f"  instrumented: {inst * 1e3:7.3f} ms/run ({added * 1e6:+.0f} us)")
+
+    slow = run_seconds(MetricsRegistry(), args.runs, args.latency)
+    overhead = added / slow * 100
+    print(f"\nat {args.latency * 1e3:g} ms per LLM call a run takes {slow * 1e3:.2f} ms; "
+          f"instrumentation is {overhead:.2f}% of it")
+    if overhead > args.budget:
+        print(f"FAIL: overhead above {args.budget}%")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
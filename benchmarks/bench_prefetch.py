@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Speculative prefetch in chat: wait per turn, hit rate and wasted spend.
+
+Plays one scripted conversation through a ``ChatSession`` on a fresh swarm
+with each prefetch mode (off, search, full). The user "reads" each answer
+for ``--think`` seconds before asking the next question. The fake predictor
+always proposes the same follow-ups, and only some of them get asked, so
+both hits and waste show up. Fails if a prefetch round overspends its
+budget, or if a hit in full mode takes more than ``--max-hit-ratio`` of the
+no-prefetch follow-up wait.
+
+Usage:
+    python benchmarks/bench_prefetch.py [--think 0.5] [--latency 0.05]
+"""
+
+import argparse
+import sys
+import time
+
+from _fakes import FakeClient, FakeTransport
+
+from swarm.coordinator import ResearchSwarm
+from swarm.prefetch import Prefetcher
+from swarm.session import ChatSession
+
+CONVERSATION = (
+    "What is the market size of AI agents in 2024?",
+    "How fast is it growing?",
+    "Who are the main vendors?",
+    "What about in Europe?",
+    "Which of those are profitable?",
+)
+PREDICTED = (
+    "How fast is the AI agent market growing?",
+    "Who are the main AI agent vendors?",
+    "What are the risks of deploying AI agents?",
+)
+
+
+def make_session(latency: float) -> ChatSession:
+    swarm = ResearchSwarm(
+        client=FakeClient(latency=latency, reply_chars=2000, followups=PREDICTED),
+        transport=FakeTransport(latency=latency / 2),
+    )
+    swarm.agents["search"].tavily_api_key = "bench"
+    return ChatSession(swarm)
+
+
+def play(ask, think: float) -> list[float]:
+    """Seconds the user waited for each answer."""
+    waits = []
+    for message in CONVERSATION:
+        start = time.perf_counter()
+        ask(message, depth="standard")
+        waits.append(time.perf_counter() - start)
+        time.sleep(think)
+    return waits
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--think", type=float, default=0.5, help="Seconds the user reads each answer")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per fake LLM call")
+    parser.add_argument("--token-budget", type=int, default=8000)
+    parser.add_argument("--request-budget", type=int, default=8)
+    parser.add_argument("--max-hit-ratio", type=float, default=0.2,
+                        help="Max wait of a full-mode hit relative to a follow-up without prefetch")
+    args = parser.parse_args()
+
+    waits = {"off": play(make_session(args.latency).ask, args.think)}
+    prefetchers = {}
+    for mode in ("search", "full"):
+        prefetcher = Prefetcher(
+            make_session(args.latency), mode=mode,
+            token_budget=args.token_budget, request_budget=args.request_budget,
+        )
+        waits[mode] = play(prefetcher.ask, args.think)
+        prefetcher.wait()
+        prefetcher.cancel()
+        prefetchers[mode] = prefetcher
+
+    print(f"wait per turn ({args.latency * 1e3:g} ms per LLM call, {args.think:g}s reading time):")
+    print(f"  {'turn':<48} {'off':>7} {'search':>7} {'full':>7}")
+    hits = {mode: [] for mode in prefetchers}
+    for i, message in enumerate(CONVERSATION):
+        marks = {}
+        for mode, prefetcher in prefetchers.items():
+            hit = i > 0 and prefetcher.rounds[i - 1].hit
+            hits[mode].append(hit)
+            marks[mode] = "*" if hit else " "
+        print(f"  {message:<48} {waits['off'][i]:6.2f}s "
+              f"{waits['search'][i]:6.2f}s{marks['search']}{waits['full'][i]:6.2f}s{marks['full']}")
+    print("  (* prefetch hit)")
+
+    problems = []
+    for mode, prefetcher in prefetchers.items():
+        stats = prefetcher.stats()
+        spent, wasted = stats["spent"], stats["wasted"]
+        print(f"\n{mode}: hit rate {stats['hit_rate']:.0%} ({stats['hits']}/{stats['lookups']}), "
+              f"{stats['predicted']} predictions")
+        print(f"  spent  {spent['tokens']:6,} tokens {spent['requests']:3} requests ${spent['cost']:.4f}")
+        print(f"  wasted {wasted['tokens']:6,} tokens {wasted['requests']:3} requests ${wasted['cost']:.4f}")
+        for round_ in prefetcher.rounds:
+            if round_.tokens > args.token_budget or round_.requests > args.request_budget:
+                problems.append(f"{mode}: round spent {round_.tokens} tokens, {round_.requests} requests")
+
+    followup_off = sum(waits["off"][1:]) / (len(CONVERSATION) - 1)
+    full_hits = [w for w, hit in zip(waits["full"], hits["full"]) if hit]
+    if full_hits:
+        ratio = max(full_hits) / followup_off
+        print(f"\nfull-mode hits wait {ratio:.0%} of a follow-up without prefetch")
+        if ratio > args.max_hit_ratio:
+            problems.append(f"full-mode hit waited {ratio:.0%} of a normal follow-up")
+    else:
+        problems.append("no full-mode hits")
+
+    for problem in problems:
+        print(f"  {problem}")
+    if problems:
+        print("FAIL")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Orchestration overhead of a recorded run, replayed offline.
+
+Record a cassette first:
+    swarm research "your query" --record run.cassette.json.gz
+
+Then compare versions deterministically:
+    python benchmarks/bench_replay.py run.cassette.json.gz --runs 20
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from swarm.cassette import Cassette, replaying_swarm  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cassette")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="Latency scale: 0 measures pure orchestration overhead")
+    parser.add_argument("--query", help="Override the recorded query")
+    parser.add_argument("--depth", help="Override the recorded depth")
+    args = parser.parse_args()
+
+    recorded = Cassette.load(args.cassette)
+    query = args.query or recorded.meta.get("query")
+    depth = args.depth or recorded.meta.get("depth", "standard")
+    if not query:
+        parser.error("cassette has no recorded query; pass --query")
+
+    timings = []
+    for _ in range(args.runs):
+        # A fresh copy per run so every run replays the full sequence
+        cassette = Cassette(recorded.interactions, recorded.meta)
+        swarm = replaying_swarm(cassette, speed=args.speed)
+        start = time.perf_counter()
+        swarm.research(query, depth=depth, max_rounds=recorded.meta.get("max_rounds"))
+        timings.append(time.perf_counter() - start)
+        if cassette.misses:
+            print(f"warning: {cassette.misses} requests were not in the cassette")
+
+    print(f"interactions:       {len(recorded.interactions)}")
+    print(f"recorded I/O time:  {recorded.recorded_latency:.3f} s")
+    print(f"replay median:      {statistics.median(timings) * 1000:.1f} ms")
+    print(f"replay p90:         {sorted(timings)[int(0.9 * (len(timings) - 1))] * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Peak memory of the search-to-prompt pipeline as result sets grow.
+
+Compares the streaming pipeline (``swarm.pipeline.build_context``) against
+collecting every result into a list first, as the search agent used to.
+
+Usage:
+    python benchmarks/bench_search_memory.py [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from swarm.pipeline import build_context  # noqa: E402
+
+TASK = "Impact of retrieval augmented generation on enterprise search quality"
+WORDS = "retrieval generation enterprise search quality latency index vector model".split()
+
+
+def results(n: int, content_chars: int):
+    """Lazily produce ``n`` distinct results with full-page-sized content."""
+    pages = [
+        " ".join(WORDS[(k + j) % len(WORDS)] for j in range(content_chars // 8))
+        for k in range(len(WORDS))
+    ]
+    for i in range(n):
+        # A fresh string per result, as a fetched page would be
+        body = f"Page {i}. " + pages[i % len(pages)]
+        yield {
+            "title": f"Result {i}",
+            "url": f"https://example.com/page/{i}",
+            "content": body,
+            "score": (i % 100) / 100,
+        }
+
+
+def measure(fn) -> tuple[float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024, elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--content-chars", type=int, default=4000)
+    parser.add_argument("--budget-chars", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'results':>9} {'streaming MiB':>14} {'list MiB':>10} {'streaming s':>12}")
+    for n in args.sizes:
+        streaming_mib, seconds = measure(
+            lambda: build_context(results(n, args.content_chars), TASK, args.budget_chars)
+        )
+        collected_mib, _ = measure(
+            lambda: build_context(list(results(n, args.content_chars)), TASK, args.budget_chars)
+        )
+        print(f"{n:>9} {streaming_mib:>14.2f} {collected_mib:>10.1f} {seconds:>12.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Cold-start benchmark for lightweight CLI commands.
+
+Runs each command in a fresh interpreter under ``python -X importtime`` and
+fails (exit code 1) when the cumulative import time of the ``swarm`` package
+exceeds the budget, or when a heavy dependency is imported at all.
+
+Usage:
+    python benchmarks/bench_startup.py [--budget-ms 150] [--runs 5]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that lightweight commands must never load.
+HEAVY_MODULES = ("openai", "requests", "rich", "swarm.coordinator", "swarm.agents.base")
+
+COMMANDS = {
+    "--version": ["--version"],
+    "agents": ["agents"],
+}
+
+RUNNER = """
+import sys
+from swarm.cli import cli
+try:
+    cli({args!r}, standalone_mode=False)
+finally:
+    heavy = [m for m in {heavy!r} if m in sys.modules]
+    print("HEAVY:" + ",".join(heavy), file=sys.stderr)
+"""
+
+
+def measure(args: list[str]) -> tuple[float, list[str]]:
+    """Return (cumulative swarm import time in ms, heavy modules loaded)."""
+    code = RUNNER.format(args=args, heavy=HEAVY_MODULES)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    total_us = 0
+    heavy: list[str] = []
+    finished = False
+    for line in proc.stderr.splitlines():
+        if line.startswith("HEAVY:"):
+            finished = True
+            heavy = [m for m in line[len("HEAVY:"):].split(",") if m]
+            continue
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        # Top-level swarm imports (no extra indentation) carry the cumulative
+        # time of everything they pulled in, click included.
+        name = line.rsplit("|", 1)[1]
+        if parts[1].isdigit() and name.startswith(" swarm"):
+            total_us += int(parts[1])
+    if proc.returncode != 0 or not finished:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return total_us / 1000, heavy
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=150.0,
+                        help="Maximum median import time per command")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    for label, argv in COMMANDS.items():
+        timings = []
+        heavy: list[str] = []
+        for _ in range(args.runs):
+            ms, heavy = measure(argv)
+            timings.append(ms)
+        median = statistics.median(timings)
+        status = "ok"
+        if heavy:
+            status = f"FAIL (loaded {', '.join(heavy)})"
+            failed = True
+        elif median > args.budget_ms:
+            status = f"FAIL (budget {args.budget_ms:.0f} ms)"
+            failed = True
+        print(f"swarm {label:10} median {median:7.1f} ms  {status}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
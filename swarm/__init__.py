@@ -2,6 +2,13 @@
 
 __version__ = "0.1.0"
 
-from .coordinator import ResearchSwarm, ResearchResult
-
 __all__ = ["ResearchSwarm", "ResearchResult"]
+
+
+def __getattr__(name: str):
+    # Load the coordinator (and with it openai/requests) only when it is used,
+    # so lightweight entry points such as `swarm --version` start fast.
+    if name in __all__:
+        from . import coordinator
+        return getattr(coordinator, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
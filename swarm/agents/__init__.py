@@ -1,11 +1,15 @@
 """Research agents."""
 
-from .base import BaseAgent
-from .search import SearchAgent
-from .data import DataAgent
-from .literature import LiteratureAgent
-from .critic import CriticAgent
-from .synthesis import SynthesisAgent
+import importlib
+
+_AGENT_MODULES = {
+    "BaseAgent": ".base",
+    "SearchAgent": ".search",
+    "DataAgent": ".data",
+    "LiteratureAgent": ".literature",
+    "CriticAgent": ".critic",
+    "SynthesisAgent": ".synthesis",
+}
 
 __all__ = [
     "BaseAgent",
@@ -15,3 +19,11 @@ __all__ = [
     "CriticAgent",
     "SynthesisAgent",
 ]
+
+
+def __getattr__(name: str):
+    # Agent modules are imported on first access rather than with the package.
+    if name in _AGENT_MODULES:
+        module = importlib.import_module(_AGENT_MODULES[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
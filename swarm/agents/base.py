@@ -1,11 +1,58 @@
 """Base agent class."""
 
+import contextvars
+import time
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 from datetime import datetime
 
-from openai import OpenAI
+from ..events import LLM_RECEIVED, LLM_SENT, emit
+from ..mapreduce import ChunkCache, MapReduceSummarizer
+from ..metrics import MetricsRegistry, observe_llm
+from ..transport import Transport
+from ..usage import create_within_ceiling, current_ceiling, record_usage
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+
+# Canonical order for agent outputs inside prompts. Keeping prompts
+# byte-identical for identical inputs lets provider prefix caching hit.
+AGENT_ORDER = ("search", "data", "literature", "critic", "synthesis")
+
+
+def ordered_items(context: Optional[dict]) -> list[tuple[str, Any]]:
+    """Context items in canonical agent order, unknown keys sorted after."""
+    if not context:
+        return []
+    rank = {name: i for i, name in enumerate(AGENT_ORDER)}
+    return sorted(context.items(), key=lambda kv: (rank.get(kv[0], len(rank)), str(kv[0])))
+
+
+def unique(items) -> list:
+    """Deduplicate while keeping first-seen order (unlike ``list(set(...))``)."""
+    return list(dict.fromkeys(items))
+
+
+# Per-run overrides (model, context_scale) for one agent invocation. A context
+# variable keeps them private to that invocation even though agent instances
+# are shared between runs.
+_run_overrides: contextvars.ContextVar[dict] = contextvars.ContextVar(
+    "agent_run_overrides", default={}
+)
+
+
+@contextmanager
+def run_overrides(**overrides):
+    """Override agent settings for the calls made inside the block."""
+    merged = {**_run_overrides.get(), **{k: v for k, v in overrides.items() if v is not None}}
+    token = _run_overrides.set(merged)
+    try:
+        yield
+    finally:
+        _run_overrides.reset(token)
 
 
 @dataclass
@@ -18,6 +65,7 @@ class AgentOutput:
     timestamp: datetime = field(default_factory=datetime.now)
     success: bool = True
     error: Optional[str] = None
+    duration_seconds: float = 0.0
     
     def to_dict(self) -> dict:
         return {
@@ -28,28 +76,101 @@ class AgentOutput:
             "timestamp": self.timestamp.isoformat(),
             "success": self.success,
             "error": self.error,
+            "duration_seconds": self.duration_seconds,
         }
 
 
 class BaseAgent(ABC):
-    """Base class for all research agents."""
+    """Base class for all research agents.
+    
+    One instance serves every run of a swarm, concurrently. ``run`` must keep
+    per-run state in locals (or ``run_overrides``), never on ``self``; shared
+    state such as caches needs its own lock.
+    """
     
     name: str = "base"
     description: str = "Base agent"
     
-    def __init__(self, client: Optional[OpenAI] = None, model: str = "gpt-4o"):
-        self.client = client or OpenAI()
+    # Condense oversized input with map-reduce instead of truncating it
+    map_reduce: bool = False
+    
+    def __init__(
+        self,
+        client: Optional["OpenAI"] = None,
+        model: str = "gpt-4o",
+        transport: Optional[Transport] = None,
+    ):
+        self.transport = transport or Transport()
+        self.client = client or self.transport.openai_client()
+        self.chunk_cache = ChunkCache()
+        self.metrics = MetricsRegistry()
         self.model = model
     
+    @property
+    def active_model(self) -> str:
+        """Model for the current invocation (the scheduler may override it)."""
+        return _run_overrides.get().get("model", self.model)
+    
+    def _budget(self, chars: int) -> int:
+        """Scale a prompt truncation limit by the run's context budget."""
+        return int(chars * _run_overrides.get().get("context_scale", 1.0))
+    
+    def _fit(self, task: str, text: str, limit: int, label: str = "") -> str:
+        """Fit text into ``limit`` characters.
+        
+        Truncates by default; in map-reduce mode oversized text is condensed
+        chunk by chunk instead, so nothing past the limit is silently lost.
+        """
+        return self._fit_all(task, [(label, text, limit)])[0]
+    
+    def _fit_all(self, task: str, sections: list[tuple[str, str, int]]) -> list[str]:
+        """Fit each ``(label, text, limit)`` section, as ``_fit`` does.
+        
+        Oversized sections are condensed together, so their chunks are
+        mapped in parallel rather than one section after another.
+        """
+        fitted = [text[:limit] for _, text, limit in sections]
+        if not self.map_reduce:
+            return fitted
+        oversized = [i for i, (_, text, limit) in enumerate(sections) if len(text) > limit]
+        if oversized:
+            summarizer = MapReduceSummarizer(
+                self._complete,
+                cache=self.chunk_cache,
+                key_prefix=f"{self.name}:{self.active_model}",
+            )
+            condensed = summarizer.summarize_each(task, [sections[i] for i in oversized])
+            for i, text in zip(oversized, condensed):
+                fitted[i] = text
+        return fitted
+    
     @abstractmethod
     def run(self, task: str, context: dict = None) -> AgentOutput:
         """Execute the agent's task."""
         pass
     
+    def _create(self, **kwargs):
+        """Send one chat completion, recording its usage and events."""
+        model = kwargs.setdefault("model", self.active_model)
+        emit(LLM_SENT, self.name, model=model)
+        start = time.perf_counter()
+        response = create_within_ceiling(self.client.chat.completions.create, **kwargs)
+        seconds = time.perf_counter() - start
+        record_usage(self.name, response, model)
+        usage = getattr(response, "usage", None)
+        observe_llm(self.metrics, self.name, model, seconds, usage)
+        emit(
+            LLM_RECEIVED, self.name,
+            model=model,
+            seconds=round(seconds, 3),
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        )
+        return response
+    
     def _complete(self, system_prompt: str, user_prompt: str, **kwargs) -> str:
         """Call the LLM."""
-        response = self.client.chat.completions.create(
-            model=self.model,
+        response = self._create(
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
@@ -59,6 +180,51 @@ class BaseAgent(ABC):
         )
         return response.choices[0].message.content
     
+    def _complete_stream(self, system_prompt: str, user_prompt: str, on_delta, **kwargs) -> str:
+        """Call the LLM with streaming, passing each text delta to ``on_delta``."""
+        model = self.active_model
+        request = dict(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=kwargs.get("temperature", 0.3),
+            stream=True,
+            stream_options={"include_usage": True},
+            **{k: v for k, v in kwargs.items() if k != "temperature"}
+        )
+        ceiling = current_ceiling()
+        reserved = ceiling.reserve(request) if ceiling else 0
+        emit(LLM_SENT, self.name, model=model, stream=True)
+        start = time.perf_counter()
+        parts = []
+        usage = None
+        try:
+            for chunk in self.client.chat.completions.create(**request):
+                # The final chunk carries usage and no choices
+                if getattr(chunk, "usage", None) is not None:
+                    usage = chunk.usage
+                    record_usage(self.name, chunk, model)
+                for choice in chunk.choices or []:
+                    delta = choice.delta.content
+                    if delta:
+                        parts.append(delta)
+                        on_delta(delta)
+        finally:
+            if ceiling:
+                ceiling.settle(reserved, usage)
+        seconds = time.perf_counter() - start
+        observe_llm(self.metrics, self.name, model, seconds, usage)
+        emit(
+            LLM_RECEIVED, self.name,
+            model=model,
+            seconds=round(seconds, 3),
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        )
+        return "".join(parts)
+    
     def _complete_with_tools(self, system_prompt: str, user_prompt: str, tools: list) -> tuple[str, list]:
         """Call the LLM with tools."""
         messages = [
@@ -66,8 +232,7 @@ class BaseAgent(ABC):
             {"role": "user", "content": user_prompt}
         ]
         
-        response = self.client.chat.completions.create(
-            model=self.model,
+        response = self._create(
             messages=messages,
             tools=tools,
             tool_choice="auto",
@@ -94,8 +259,7 @@ class BaseAgent(ABC):
                     "content": "Tool executed successfully"
                 })
             
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = self._create(
                 messages=messages,
                 tools=tools,
                 tool_choice="auto",
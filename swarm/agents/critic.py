@@ -3,7 +3,7 @@
 import json
 from typing import Optional
 
-from .base import BaseAgent, AgentOutput
+from .base import BaseAgent, AgentOutput, ordered_items
 
 
 class CriticAgent(BaseAgent):
@@ -24,7 +24,8 @@ class CriticAgent(BaseAgent):
                 data={
                     "counterarguments": analysis.get("counterarguments", []),
                     "limitations": analysis.get("limitations", []),
-                    "alternative_views": analysis.get("alternative_views", [])
+                    "alternative_views": analysis.get("alternative_views", []),
+                    "gaps": analysis.get("missing_considerations", []),
                 },
                 success=True
             )
@@ -74,9 +75,9 @@ Return JSON:
         context_str = ""
         if context:
             context_str = f"\n\nFindings to critique:\n"
-            for key, value in context.items():
+            for key, value in ordered_items(context):
                 if isinstance(value, str):
-                    context_str += f"\n{key}:\n{value[:1500]}\n"
+                    context_str += f"\n{key}:\n{value[:self._budget(1500)]}\n"
         
         user_prompt = f"Research task: {task}{context_str}"
         
@@ -3,7 +3,7 @@
 import json
 from typing import Optional
 
-from .base import BaseAgent, AgentOutput
+from .base import BaseAgent, AgentOutput, ordered_items
 
 
 class DataAgent(BaseAgent):
@@ -18,7 +18,7 @@ class DataAgent(BaseAgent):
             # Get any existing content from other agents
             existing_content = ""
             if context:
-                for key, value in context.items():
+                for key, value in ordered_items(context):
                     if isinstance(value, str):
                         existing_content += f"\n{key}:\n{value}\n"
             
@@ -64,7 +64,8 @@ Return a JSON object with:
 
 If no quantitative data is available, provide qualitative insights instead."""
 
-        user_prompt = f"Task: {task}\n\nContent to analyze:\n{content[:8000]}"
+        content = self._fit(task, content, self._budget(8000))
+        user_prompt = f"Task: {task}\n\nContent to analyze:\n{content}"
         
         response = self._complete(
             system_prompt, 
@@ -62,7 +62,7 @@ Return JSON:
 
         context_str = ""
         if context:
-            context_str = f"\n\nContext from other research:\n{json.dumps(context, default=str)[:2000]}"
+            context_str = f"\n\nContext from other research:\n{json.dumps(context, sort_keys=True, default=str)[:self._budget(2000)]}"
         
         user_prompt = f"Research task: {task}{context_str}"
         
@@ -2,11 +2,19 @@
 
 import os
 import json
+import logging
+import threading
+import time
+from collections import OrderedDict
 from typing import Optional
 
-import requests
-
 from .base import BaseAgent, AgentOutput
+from ..events import SEARCH_ISSUED, emit
+from ..pipeline import PipelineStats, build_context
+from ..rerank import Reranker, available as rerank_available
+from ..router import NoProviderAvailable, SearchRouter
+
+logger = logging.getLogger(__name__)
 
 
 class SearchAgent(BaseAgent):
@@ -15,33 +23,69 @@ class SearchAgent(BaseAgent):
     name = "search"
     description = "Searches the web for relevant information and sources"
     
+    # Results cached per normalized query, shared across rounds and runs;
+    # entries older than cache_ttl seconds are searched again
+    cache_size = 256
+    cache_ttl = 3600.0
+    
+    # Prompt budget for search evidence and the size of each content chunk
+    prompt_chars = 5000
+    chunk_chars = 500
+    
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.tavily_api_key = os.getenv("TAVILY_API_KEY")
+        self._cache: OrderedDict[str, tuple[float, list[dict]]] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        # Provider health is shared across queries, runs and threads
+        self.router = SearchRouter(race_workers=self.transport.max_connections)
+        # Batch reranking needs NumPy; without it chunks keep their streaming
+        # scores. Set to None to disable.
+        self.reranker: Optional[Reranker] = Reranker() if rerank_available() else None
     
     def run(self, task: str, context: dict = None) -> AgentOutput:
         """Search the web for information related to the task."""
         try:
-            # Generate search queries
-            queries = self._generate_search_queries(task, context)
+            # Search breadth may be set per request by the coordinator
+            context = dict(context or {})
+            max_queries = context.pop("max_queries", 3)
             
-            # Execute searches
-            all_results = []
-            sources = []
+            # Generate search queries
+            if max_queries <= 1:
+                # A single query doesn't need an LLM call to write it
+                queries = [task]
+            else:
+                queries = self._generate_search_queries(task, context)
             
-            for query in queries[:3]:  # Limit to 3 queries
-                results = self._search(query)
-                all_results.extend(results)
-                sources.extend([r.get("url", "") for r in results if r.get("url")])
+            # Stream results through dedupe -> chunk -> score -> select;
+            # only the selected chunks are held in memory
+            stats = PipelineStats()
+            providers_used: list[Optional[str]] = []
+            results_text, sources, _ = build_context(
+                self._iter_results(queries[:max_queries], providers_used),
+                task,
+                budget_chars=self._budget(self.prompt_chars),
+                chunk_chars=self.chunk_chars,
+                stats=stats,
+                reranker=self.reranker,
+            )
             
             # Synthesize search results
-            content = self._synthesize_results(task, all_results)
+            content = self._synthesize_results(task, results_text)
             
             return AgentOutput(
                 agent_name=self.name,
                 content=content,
-                sources=list(set(sources))[:10],  # Dedupe and limit
-                data={"queries": queries, "result_count": len(all_results)},
+                sources=sources[:10],
+                data={
+                    "queries": queries,
+                    "result_count": stats.results,
+                    "duplicates": stats.duplicates,
+                    "confidence": stats.confidence,
+                    "providers": providers_used,
+                    "reranked": self.reranker is not None,
+                },
                 success=True
             )
         
@@ -53,6 +97,13 @@ class SearchAgent(BaseAgent):
                 error=str(e)
             )
     
+    def _iter_results(self, queries: list[str], providers_used: list):
+        """Yield search results query by query, as they arrive."""
+        for query in queries:
+            results, provider = self._search(query)
+            providers_used.append(provider)
+            yield from results
+    
     def _generate_search_queries(self, task: str, context: dict = None) -> list[str]:
         """Generate search queries for the task."""
         system_prompt = """You are a search query generator. Given a research task, 
@@ -63,7 +114,7 @@ Example: ["query 1", "query 2", "query 3"]"""
 
         user_prompt = f"Research task: {task}"
         if context:
-            user_prompt += f"\n\nAdditional context: {json.dumps(context)}"
+            user_prompt += f"\n\nAdditional context: {json.dumps(context, sort_keys=True, default=str)}"
         
         response = self._complete(system_prompt, user_prompt)
         
@@ -78,93 +129,160 @@ Example: ["query 1", "query 2", "query 3"]"""
         # Fallback: use the task as the query
         return [task]
     
-    def _search(self, query: str) -> list[dict]:
-        """Execute a web search."""
+    def _providers(self) -> list[tuple[str, object]]:
+        """Search backends in order of preference."""
+        providers = []
         if self.tavily_api_key:
-            return self._tavily_search(query)
-        else:
-            return self._duckduckgo_search(query)
+            providers.append(("tavily", self._tavily_search))
+        providers.append(("duckduckgo", self._duckduckgo_search))
+        return [(name, self._instrumented(name, fn)) for name, fn in providers]
     
-    def _tavily_search(self, query: str) -> list[dict]:
-        """Search using Tavily API."""
+    def _instrumented(self, provider: str, search_fn):
+        """Wrap a provider call to record its outcome and latency."""
+        requests = self.metrics.counter(
+            "swarm_search_requests_total", "Search provider requests by outcome (ok, empty, error)",
+            ("provider", "outcome"),
+        )
+        latency = self.metrics.histogram(
+            "swarm_search_duration_seconds", "Search provider latency", ("provider",)
+        ).labels(provider)
+        
+        def search(query: str) -> list[dict]:
+            start = time.perf_counter()
+            try:
+                results = search_fn(query)
+            except Exception:
+                requests.labels(provider, "error").inc()
+                raise
+            finally:
+                latency.observe(time.perf_counter() - start)
+            requests.labels(provider, "ok" if results else "empty").inc()
+            return results
+        
+        return search
+    
+    def clear_cache(self):
+        """Drop all cached search results."""
+        with self._cache_lock:
+            self._cache.clear()
+    
+    def warm(self, query: str) -> Optional[str]:
+        """Search ahead of time so a later run is served from the cache.
+
+        Returns the provider that answered, as ``_search`` does.
+        """
+        return self._search(query)[1]
+
+    def _search(self, query: str) -> tuple[list[dict], Optional[str]]:
+        """Execute a web search, serving repeated queries from the cache.
+        
+        Returns the results and the provider that answered ("cache" for a
+        cache hit, None when every provider failed).
+        """
+        key = " ".join(query.lower().split())
+        with self._cache_lock:
+            results = None
+            entry = self._cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.cache_ttl:
+                del self._cache[key]
+            elif entry is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                results = list(entry[1])
+        cache = self.metrics.counter(
+            "swarm_search_cache_total", "Search cache lookups by result (hit, miss)", ("result",)
+        )
+        cache.labels("hit" if results is not None else "miss").inc()
+        if results is not None:
+            emit(SEARCH_ISSUED, self.name, query=query, provider="cache", results=len(results))
+            return results, "cache"
+        
         try:
-            response = requests.post(
-                "https://api.tavily.com/search",
-                json={
-                    "api_key": self.tavily_api_key,
-                    "query": query,
-                    "search_depth": "basic",
-                    "max_results": 5,
-                },
-                timeout=10
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            return [
-                {
-                    "title": r.get("title", ""),
-                    "url": r.get("url", ""),
-                    "content": r.get("content", ""),
-                    "score": r.get("score", 0),
-                }
-                for r in data.get("results", [])
-            ]
-        except Exception as e:
-            print(f"Tavily search error: {e}")
-            return []
+            results, provider = self.router.search(query, self._providers())
+        except NoProviderAvailable as e:
+            logger.warning("Search failed for %r: %s", query[:80], e)
+            emit(SEARCH_ISSUED, self.name, query=query, provider=None, results=0, error=str(e))
+            return [], None
+        emit(SEARCH_ISSUED, self.name, query=query, provider=provider, results=len(results))
+        
+        # Failed searches return [] and are not cached so they can be retried
+        if results:
+            with self._cache_lock:
+                self._cache[key] = (time.monotonic(), results)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return results, provider
+    
+    def _tavily_search(self, query: str) -> list[dict]:
+        """Search using Tavily API. Errors propagate to the router."""
+        response = self.transport.post(
+            "https://api.tavily.com/search",
+            json={
+                "api_key": self.tavily_api_key,
+                "query": query,
+                "search_depth": "basic",
+                "max_results": 5,
+            },
+        )
+        response.raise_for_status()
+        data = response.json()
+        
+        return [
+            {
+                "title": r.get("title", ""),
+                "url": r.get("url", ""),
+                "content": r.get("content", ""),
+                "score": r.get("score", 0),
+            }
+            for r in data.get("results", [])
+        ]
     
     def _duckduckgo_search(self, query: str) -> list[dict]:
-        """Fallback search using DuckDuckGo (limited)."""
-        try:
-            # Using DuckDuckGo instant answer API (limited but free)
-            response = requests.get(
-                "https://api.duckduckgo.com/",
-                params={
-                    "q": query,
-                    "format": "json",
-                    "no_html": 1,
-                },
-                timeout=10
-            )
-            data = response.json()
-            
-            results = []
-            
-            # Abstract
-            if data.get("Abstract"):
+        """Fallback search using DuckDuckGo (limited). Errors propagate to the router."""
+        # Using DuckDuckGo instant answer API (limited but free)
+        response = self.transport.get(
+            "https://api.duckduckgo.com/",
+            params={
+                "q": query,
+                "format": "json",
+                "no_html": 1,
+            },
+        )
+        response.raise_for_status()
+        data = response.json()
+        
+        results = []
+        
+        # DuckDuckGo has no relevance scores. These fixed ones only order its
+        # results (an instant answer is a direct hit, so it ranks high) and
+        # are marked uncalibrated so they never count towards confidence
+        if data.get("Abstract"):
+            results.append({
+                "title": data.get("Heading", ""),
+                "url": data.get("AbstractURL", ""),
+                "content": data.get("Abstract", ""),
+                "score": 0.9,
+                "calibrated": False,
+            })
+        
+        # Related topics
+        for topic in data.get("RelatedTopics", [])[:3]:
+            if isinstance(topic, dict) and topic.get("Text"):
                 results.append({
-                    "title": data.get("Heading", ""),
-                    "url": data.get("AbstractURL", ""),
-                    "content": data.get("Abstract", ""),
+                    "title": topic.get("Text", "")[:50],
+                    "url": topic.get("FirstURL", ""),
+                    "content": topic.get("Text", ""),
+                    "score": 0.5,
+                    "calibrated": False,
                 })
-            
-            # Related topics
-            for topic in data.get("RelatedTopics", [])[:3]:
-                if isinstance(topic, dict) and topic.get("Text"):
-                    results.append({
-                        "title": topic.get("Text", "")[:50],
-                        "url": topic.get("FirstURL", ""),
-                        "content": topic.get("Text", ""),
-                    })
-            
-            return results
-        except Exception as e:
-            print(f"DuckDuckGo search error: {e}")
-            return []
+        
+        return results
     
-    def _synthesize_results(self, task: str, results: list[dict]) -> str:
-        """Synthesize search results into useful information."""
-        if not results:
+    def _synthesize_results(self, task: str, results_text: str) -> str:
+        """Synthesize formatted search results into useful information."""
+        if not results_text:
             return "No search results found."
         
-        # Format results for LLM
-        results_text = ""
-        for i, r in enumerate(results[:10], 1):
-            results_text += f"\n[{i}] {r.get('title', 'Untitled')}\n"
-            results_text += f"    URL: {r.get('url', 'N/A')}\n"
-            results_text += f"    Content: {r.get('content', '')[:500]}\n"
-        
         system_prompt = """You are a research assistant. Synthesize the search results 
 into a coherent summary that addresses the research task. 
 
@@ -4,7 +4,8 @@ import json
 from datetime import datetime
 from typing import Optional
 
-from .base import BaseAgent, AgentOutput
+from .base import BaseAgent, AgentOutput, ordered_items, unique
+from ..events import SYNTHESIS_CHUNK, emit, wants
 
 
 class SynthesisAgent(BaseAgent):
@@ -13,6 +14,9 @@ class SynthesisAgent(BaseAgent):
     name = "synthesis"
     description = "Combines all research findings into a comprehensive report"
     
+    # Stream the report so synthesis.chunk events arrive as it is written
+    stream: bool = False
+    
     def run(self, task: str, context: dict = None) -> AgentOutput:
         """Synthesize findings into a final report."""
         try:
@@ -22,7 +26,7 @@ class SynthesisAgent(BaseAgent):
             # Collect all sources
             all_sources = []
             if context:
-                for key, value in context.items():
+                for key, value in ordered_items(context):
                     if isinstance(value, dict) and "sources" in value:
                         all_sources.extend(value["sources"])
                     elif isinstance(value, AgentOutput):
@@ -31,7 +35,7 @@ class SynthesisAgent(BaseAgent):
             return AgentOutput(
                 agent_name=self.name,
                 content=report,
-                sources=list(set(all_sources)),
+                sources=unique(all_sources),
                 success=True
             )
         
@@ -82,7 +86,10 @@ Be comprehensive but avoid redundancy."""
         # Format context from all agents
         context_str = "## Research Findings from Specialist Agents\n\n"
         if context:
-            for agent_name, output in context.items():
+            # Canonical order keeps the prompt identical however the agents
+            # happened to finish
+            sections = []
+            for agent_name, output in ordered_items(context):
                 if isinstance(output, dict):
                     content = output.get("content", str(output))
                     sources = output.get("sources", [])
@@ -93,19 +100,35 @@ Be comprehensive but avoid redundancy."""
                     content = str(output)
                     sources = []
                 
+                # Findings carried over from earlier (a chat session's working
+                # set) bring their own budget, which the run's scale leaves alone
+                data = getattr(output, "data", None) or {}
+                limit = data.get("prompt_chars") or self._budget(3000)
+                sections.append((agent_name, content, limit, sources))
+            
+            fitted = self._fit_all(task, [(name, content, limit) for name, content, limit, _ in sections])
+            for (agent_name, _, _, sources), content in zip(sections, fitted):
                 context_str += f"### From {agent_name.title()} Agent:\n"
-                context_str += f"{content[:3000]}\n"
+                context_str += f"{content}\n"
                 if sources:
                     context_str += f"Sources: {', '.join(sources[:5])}\n"
                 context_str += "\n---\n\n"
         
         user_prompt = f"Research Question: {task}\n\n{context_str}"
         
-        report = self._complete(system_prompt, user_prompt, temperature=0.4)
+        if self.stream and wants(SYNTHESIS_CHUNK):
+            report = self._complete_stream(
+                system_prompt, user_prompt,
+                lambda delta: emit(SYNTHESIS_CHUNK, self.name, text=delta),
+                temperature=0.4,
+            )
+        else:
+            report = self._complete(system_prompt, user_prompt, temperature=0.4)
+            emit(SYNTHESIS_CHUNK, self.name, text=report)
         
         # Add metadata footer
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-        agents_used = list(context.keys()) if context else []
+        agents_used = [name for name, _ in ordered_items(context)]
         
         report += f"\n\n---\n"
         report += f"*Generated by ResearchSwarm on {timestamp}*\n"
@@ -0,0 +1,332 @@
+"""Deferred bulk research through provider batch-completion files.
+
+Many queries run together, one pipeline stage at a time. Every query runs
+in its own thread against a ``BatchingClient`` whose ``create`` call parks
+the request instead of sending it. Once every query is waiting on the LLM
+(no search in flight and no new request for ``settle`` seconds) the parked
+requests are written to one batch JSONL file, submitted through a
+``BatchBackend``, polled, and their results released, which advances all
+queries to their next stage together.
+
+    runner = BatchRunner(OpenAIBatchBackend(OpenAI()), workdir="batches/")
+    results = runner.run(queries, depth="standard")
+
+``LocalBatchBackend`` is a file-based stand-in that answers batches with any
+chat client, for offline testing.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Optional
+
+from .cassette import jsonable, to_namespace
+from .transport import Transport
+
+if TYPE_CHECKING:
+    from .coordinator import ResearchResult, ResearchSwarm
+
+CHAT_COMPLETIONS_URL = "/v1/chat/completions"
+
+# Batch states after which polling stops
+TERMINAL_STATES = ("completed", "failed", "expired", "cancelled")
+
+
+class BatchBackend(ABC):
+    """Submits batch request files and returns their results."""
+
+    @abstractmethod
+    def submit(self, path: str) -> str:
+        """Submit a batch JSONL file and return the batch id."""
+
+    @abstractmethod
+    def status(self, batch_id: str) -> str:
+        """Current state of a batch (see ``TERMINAL_STATES``)."""
+
+    @abstractmethod
+    def results(self, batch_id: str) -> dict[str, dict]:
+        """Output lines of a finished batch, keyed by ``custom_id``."""
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """The OpenAI Batch API (24h window, discounted tokens)."""
+
+    def __init__(self, client: Any, completion_window: str = "24h"):
+        self.client = client
+        self.completion_window = completion_window
+
+    def submit(self, path: str) -> str:
+        with open(path, "rb") as f:
+            uploaded = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=CHAT_COMPLETIONS_URL,
+            completion_window=self.completion_window,
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id: str) -> dict[str, dict]:
+        batch = self.client.batches.retrieve(batch_id)
+        lines = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if line.strip():
+                    item = json.loads(line)
+                    lines[item["custom_id"]] = item
+        return lines
+
+
+class LocalBatchBackend(BatchBackend):
+    """File-based stand-in for a batch API.
+
+    Batches are copied into ``directory`` and answered on first poll by
+    calling ``client`` (any object with ``chat.completions.create``) for each
+    line, writing an output file in the provider's format.
+    """
+
+    def __init__(self, client: Any, directory: str):
+        self.client = client
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, batch_id: str, kind: str) -> str:
+        return os.path.join(self.directory, f"{batch_id}.{kind}.jsonl")
+
+    def submit(self, path: str) -> str:
+        batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+        with open(path) as src, open(self._path(batch_id, "input"), "w") as dst:
+            dst.write(src.read())
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        if not os.path.exists(self._path(batch_id, "output")):
+            self._process(batch_id)
+        return "completed"
+
+    def _process(self, batch_id: str):
+        out_lines = []
+        with open(self._path(batch_id, "input")) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                item = {"id": f"req_{uuid.uuid4().hex[:12]}", "custom_id": request["custom_id"]}
+                try:
+                    response = self.client.chat.completions.create(**request["body"])
+                    item["response"] = {"status_code": 200, "body": jsonable(response)}
+                    item["error"] = None
+                except Exception as e:
+                    item["response"] = None
+                    item["error"] = {"message": str(e)}
+                out_lines.append(json.dumps(item))
+        with open(self._path(batch_id, "output"), "w") as f:
+            f.write("\n".join(out_lines) + "\n")
+
+    def results(self, batch_id: str) -> dict[str, dict]:
+        lines = {}
+        with open(self._path(batch_id, "output")) as f:
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    lines[item["custom_id"]] = item
+        return lines
+
+
+class _Completions:
+    def __init__(self, create):
+        self.create = create
+
+
+class BatchingClient:
+    """Chat client that parks each request until its batch comes back."""
+
+    def __init__(self, runner: "BatchRunner"):
+        self._runner = runner
+        self.chat = SimpleNamespace(completions=_Completions(self._create))
+
+    def _create(self, **kwargs):
+        return self._runner._enqueue(kwargs).result()
+
+
+class _TrackedTransport(Transport):
+    """Transport that tells the runner while searches are in flight."""
+
+    def __init__(self, runner: "BatchRunner", **kwargs):
+        super().__init__(**kwargs)
+        self._runner = runner
+
+    def request(self, method: str, url: str, **kwargs):
+        self._runner._search_started()
+        try:
+            return super().request(method, url, **kwargs)
+        finally:
+            self._runner._search_finished()
+
+
+@dataclass
+class BatchStats:
+    """What a bulk run submitted."""
+    batches: int = 0
+    requests: int = 0
+    failed_requests: int = 0
+    batch_ids: list[str] = field(default_factory=list)
+    requests_per_batch: list[int] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "failed_requests": self.failed_requests,
+            "batch_ids": list(self.batch_ids),
+            "requests_per_batch": list(self.requests_per_batch),
+        }
+
+
+class BatchRunner:
+    """Runs many research queries stage by stage through a batch backend."""
+
+    def __init__(
+        self,
+        backend: BatchBackend,
+        workdir: str = "swarm-batches",
+        poll_interval: float = 30.0,
+        settle: float = 0.5,
+        transport: Optional[Transport] = None,
+        **swarm_kwargs,
+    ):
+        self.backend = backend
+        self.workdir = workdir
+        self.poll_interval = poll_interval
+        self.settle = settle
+        self.swarm_kwargs = swarm_kwargs
+        self.stats = BatchStats()
+        self._transport = transport
+        self._cond = threading.Condition()
+        self._pending: list[tuple[str, dict, Future]] = []
+        self._searches_in_flight = 0
+        self._last_activity = time.monotonic()
+        self._counter = 0
+        os.makedirs(workdir, exist_ok=True)
+
+    def _build_swarm(self) -> "ResearchSwarm":
+        from .coordinator import ResearchSwarm
+
+        transport = self._transport or _TrackedTransport(
+            self, max_connections=self.swarm_kwargs.get("max_connections", 64)
+        )
+        return ResearchSwarm(client=BatchingClient(self), transport=transport, **self.swarm_kwargs)
+
+    def run(self, queries: list[str], **research_kwargs) -> list["ResearchResult"]:
+        """Research every query; results come back in input order.
+
+        A query whose pipeline raises gets the exception in its slot.
+        """
+        swarm = self._build_swarm()
+        with ThreadPoolExecutor(max_workers=max(1, len(queries))) as executor:
+            futures = [
+                executor.submit(swarm.research, query, **research_kwargs)
+                for query in queries
+            ]
+            while not all(f.done() for f in futures):
+                if self._ready_to_flush():
+                    self._flush()
+                else:
+                    with self._cond:
+                        self._cond.wait(timeout=self.settle / 2)
+            # Drain anything parked by the last stage
+            if self._pending:
+                self._flush()
+
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _enqueue(self, body: dict) -> Future:
+        future: Future = Future()
+        with self._cond:
+            self._counter += 1
+            custom_id = f"req-{self._counter}"
+            self._pending.append((custom_id, body, future))
+            self._last_activity = time.monotonic()
+            self._cond.notify_all()
+        return future
+
+    def _search_started(self):
+        with self._cond:
+            self._searches_in_flight += 1
+
+    def _search_finished(self):
+        with self._cond:
+            self._searches_in_flight -= 1
+            self._last_activity = time.monotonic()
+            self._cond.notify_all()
+
+    def _ready_to_flush(self) -> bool:
+        with self._cond:
+            return (
+                bool(self._pending)
+                and self._searches_in_flight == 0
+                and time.monotonic() - self._last_activity >= self.settle
+            )
+
+    def _flush(self):
+        """Submit everything parked so far as one batch and resolve it."""
+        with self._cond:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        path = os.path.join(self.workdir, f"stage-{self.stats.batches + 1}.jsonl")
+        with open(path, "w") as f:
+            for custom_id, body, _ in pending:
+                f.write(json.dumps({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": CHAT_COMPLETIONS_URL,
+                    "body": jsonable(body),
+                }) + "\n")
+
+        try:
+            batch_id = self.backend.submit(path)
+            self.stats.batches += 1
+            self.stats.requests += len(pending)
+            self.stats.batch_ids.append(batch_id)
+            self.stats.requests_per_batch.append(len(pending))
+
+            state = self.backend.status(batch_id)
+            while state not in TERMINAL_STATES:
+                time.sleep(self.poll_interval)
+                state = self.backend.status(batch_id)
+            lines = self.backend.results(batch_id) if state == "completed" else {}
+        except Exception as e:
+            for _, _, future in pending:
+                future.set_exception(e)
+            return
+
+        for custom_id, _, future in pending:
+            item = lines.get(custom_id)
+            response = (item or {}).get("response") or {}
+            if item and not item.get("error") and response.get("status_code") == 200:
+                future.set_result(to_namespace(response["body"]))
+            else:
+                self.stats.failed_requests += 1
+                error = (item or {}).get("error") or {"message": f"batch {batch_id} {state}"}
+                future.set_exception(RuntimeError(f"Batch request {custom_id} failed: {error}"))
+
+        with self._cond:
+            self._last_activity = time.monotonic()
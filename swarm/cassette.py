@@ -0,0 +1,292 @@
+"""Record/replay cassettes for LLM and search I/O.
+
+A cassette captures every ``chat.completions.create`` call and every search
+HTTP exchange of a run, with its latency, so the run can be replayed offline
+and deterministically. Replaying with ``speed=0`` removes all I/O time and
+leaves only the swarm's own orchestration overhead.
+
+    cassette = Cassette()
+    swarm = recording_swarm(cassette)
+    swarm.research("...")
+    cassette.save("run.cassette.json.gz")
+
+    swarm = replaying_swarm(Cassette.load("run.cassette.json.gz"), speed=0)
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Optional
+
+from .transport import Transport
+
+if TYPE_CHECKING:
+    from .coordinator import ResearchSwarm
+
+CASSETTE_VERSION = 1
+
+# Request fields that must never be written to disk or affect matching
+SECRET_FIELDS = ("api_key",)
+
+
+class CassetteMiss(KeyError):
+    """Raised in replay when a request has no recorded response."""
+
+
+def jsonable(value: Any) -> Any:
+    """Convert SDK objects (pydantic models, namespaces) to plain JSON data."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, SimpleNamespace):
+        return {k: jsonable(v) for k, v in vars(value).items()}
+    if isinstance(value, dict):
+        return {k: jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [jsonable(v) for v in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def to_namespace(value: Any) -> Any:
+    """Turn JSON data back into attribute-style objects like SDK responses."""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: to_namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [to_namespace(v) for v in value]
+    return value
+
+
+def _scrub(payload: Any) -> Any:
+    if isinstance(payload, dict):
+        return {k: v for k, v in payload.items() if k not in SECRET_FIELDS}
+    return payload
+
+
+def request_key(kind: str, request: dict) -> str:
+    """Stable hash of a request, used to match replays to recordings."""
+    blob = json.dumps([kind, request], sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()[:24]
+
+
+class Cassette:
+    """Recorded LLM and search interactions, matched by request hash.
+
+    Identical requests are replayed in the order they were recorded, so a
+    run that repeats a call gets the same sequence of answers back.
+    """
+
+    def __init__(self, interactions: Optional[list[dict]] = None, meta: Optional[dict] = None):
+        self.interactions: list[dict] = list(interactions or [])
+        self.meta: dict = dict(meta or {})
+        self._lock = threading.Lock()
+        self._queues: Optional[dict[str, deque]] = None
+        self.replayed = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version: {payload.get('version')}")
+        return cls(payload.get("interactions", []), payload.get("meta", {}))
+
+    def save(self, path: str):
+        opener = gzip.open if path.endswith(".gz") else open
+        with self._lock:
+            payload = {
+                "version": CASSETTE_VERSION,
+                "meta": self.meta,
+                "interactions": self.interactions,
+            }
+        with opener(path, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"), default=str)
+
+    @property
+    def recorded_latency(self) -> float:
+        """Total I/O time captured in the cassette, in seconds."""
+        return sum(i.get("latency", 0.0) for i in self.interactions)
+
+    def record(self, kind: str, request: dict, response: Any, latency: float):
+        """Append one interaction."""
+        request = jsonable(request)
+        with self._lock:
+            self.interactions.append({
+                "kind": kind,
+                "key": request_key(kind, request),
+                "request": request,
+                "response": jsonable(response),
+                "latency": round(latency, 4),
+            })
+
+    def next_response(self, kind: str, request: dict) -> tuple[Any, float]:
+        """Pop the recorded (response, latency) for a request."""
+        key = request_key(kind, jsonable(request))
+        with self._lock:
+            if self._queues is None:
+                self._queues = defaultdict(deque)
+                for interaction in self.interactions:
+                    self._queues[interaction["key"]].append(interaction)
+            queue = self._queues.get(key)
+            if not queue:
+                self.misses += 1
+                raise CassetteMiss(f"No recorded {kind} response for request {key}")
+            interaction = queue.popleft()
+            self.replayed += 1
+        return interaction["response"], interaction.get("latency", 0.0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "interactions": len(self.interactions),
+                "replayed": self.replayed,
+                "misses": self.misses,
+                "recorded_latency": round(self.recorded_latency, 3),
+            }
+
+
+class _Completions:
+    def __init__(self, create):
+        self.create = create
+
+
+class RecordingClient:
+    """Wraps an OpenAI client and records every chat completion."""
+
+    def __init__(self, client: Any, cassette: Cassette):
+        self._client = client
+        self.cassette = cassette
+        self.chat = SimpleNamespace(completions=_Completions(self._create))
+
+    def _create(self, **kwargs):
+        start = time.perf_counter()
+        response = self._client.chat.completions.create(**kwargs)
+        self.cassette.record("llm", kwargs, response, time.perf_counter() - start)
+        return response
+
+
+class ReplayClient:
+    """Serves chat completions from a cassette."""
+
+    def __init__(self, cassette: Cassette, speed: float = 0.0):
+        self.cassette = cassette
+        self.speed = speed
+        self.chat = SimpleNamespace(completions=_Completions(self._create))
+
+    def _create(self, **kwargs):
+        response, latency = self.cassette.next_response("llm", kwargs)
+        if self.speed:
+            time.sleep(latency * self.speed)
+        return to_namespace(response)
+
+
+class RecordingTransport(Transport):
+    """Transport that records every search exchange it performs."""
+
+    def __init__(self, cassette: Cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def request(self, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        response = super().request(method, url, **kwargs)
+        latency = time.perf_counter() - start
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        self.cassette.record(
+            "search",
+            _search_request(method, url, kwargs),
+            {"status_code": response.status_code, "json": body},
+            latency,
+        )
+        return response
+
+
+class ReplayResponse:
+    """Minimal ``requests.Response`` stand-in for replayed searches."""
+
+    def __init__(self, status_code: int, body: Any):
+        self.status_code = status_code
+        self._body = body
+
+    def json(self):
+        if self._body is None:
+            raise ValueError("Recorded response had no JSON body")
+        return self._body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"Replayed HTTP error {self.status_code}")
+
+
+class ReplayTransport(Transport):
+    """Transport that serves search exchanges from a cassette."""
+
+    def __init__(self, cassette: Cassette, speed: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+        self.speed = speed
+
+    def request(self, method: str, url: str, **kwargs):
+        with self._lock:
+            self._search_requests += 1
+        response, latency = self.cassette.next_response(
+            "search", _search_request(method, url, kwargs)
+        )
+        if self.speed:
+            time.sleep(latency * self.speed)
+        return ReplayResponse(response["status_code"], response["json"])
+
+
+def _search_request(method: str, url: str, kwargs: dict) -> dict:
+    return {
+        "method": method,
+        "url": url,
+        "params": _scrub(kwargs.get("params")),
+        "json": _scrub(kwargs.get("json")),
+    }
+
+
+def recording_swarm(cassette: Cassette, client: Any = None, **swarm_kwargs) -> "ResearchSwarm":
+    """A swarm whose LLM and search I/O is recorded into ``cassette``."""
+    from .coordinator import ResearchSwarm
+
+    transport = RecordingTransport(
+        cassette, max_connections=swarm_kwargs.get("max_connections", 64)
+    )
+    client = RecordingClient(client or transport.openai_client(), cassette)
+    swarm = ResearchSwarm(client=client, transport=transport, **swarm_kwargs)
+    cassette.meta.update({
+        "model": swarm.model,
+        "search_backend": "tavily" if swarm.agents["search"].tavily_api_key else "duckduckgo",
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    })
+    return swarm
+
+
+def replaying_swarm(cassette: Cassette, speed: float = 0.0, **swarm_kwargs) -> "ResearchSwarm":
+    """A swarm served entirely from ``cassette``; no network is touched.
+
+    ``speed`` scales the recorded latencies: 1.0 replays at recorded speed,
+    0 removes I/O time entirely.
+    """
+    from .coordinator import ResearchSwarm
+
+    swarm_kwargs.setdefault("model", cassette.meta.get("model", "gpt-4o"))
+    swarm = ResearchSwarm(
+        client=ReplayClient(cassette, speed),
+        transport=ReplayTransport(cassette, speed),
+        **swarm_kwargs,
+    )
+    # Take the same search path as the recording did
+    search = swarm.agents["search"]
+    search.tavily_api_key = "replay" if cassette.meta.get("search_backend") == "tavily" else None
+    return swarm
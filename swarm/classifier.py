@@ -0,0 +1,120 @@
+"""Local query classifier for adaptive research depth."""
+
+import re
+from dataclasses import dataclass, field, asdict
+
+
+DATA_TERMS = {
+    "statistics", "stats", "data", "number", "numbers", "percent",
+    "percentage", "rate", "rates", "growth", "trend", "trends", "market",
+    "size", "revenue", "cost", "costs", "price", "prices", "pricing",
+    "figures", "metrics", "share", "forecast", "benchmark", "benchmarks",
+    "compare", "comparison", "adoption", "funding", "spend", "spending",
+}
+
+LITERATURE_TERMS = {
+    "research", "study", "studies", "paper", "papers", "academic",
+    "literature", "evidence", "theory", "theories", "scientific", "clinical",
+    "survey", "algorithm", "algorithms", "mechanism", "mechanisms",
+    "advances", "state-of-the-art", "peer-reviewed", "experiments",
+}
+
+CRITIC_TERMS = {
+    "pros", "cons", "risks", "risk", "drawbacks", "limitations", "downsides",
+    "controversy", "controversial", "debate", "criticism", "should",
+    "versus", "vs", "implications", "ethical", "tradeoffs", "trade-offs",
+}
+
+MULTI_WORD_DATA = ("how many", "how much", "market size", "growth rate")
+
+FACTUAL_OPENERS = (
+    "who ", "when ", "where ", "what is ", "what's ", "what are ",
+    "which ", "define ", "is ", "does ", "how old ", "how tall ",
+)
+
+
+@dataclass
+class QueryProfile:
+    """Agent set and search breadth chosen for a query."""
+    kind: str
+    agents: list[str]
+    optional: list[str] = field(default_factory=list)
+    max_queries: int = 3
+    signals: dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class QueryClassifier:
+    """Keyword heuristics that pick agents without any network call.
+
+    Specialists are added only when the query mentions their domain. Weak
+    signals on otherwise factual queries make a specialist *optional*: it
+    only runs if the search results do not already answer the question with
+    at least ``confidence_threshold`` relevance. That threshold is on the
+    provider's own relevance scale (Tavily's 0-1 score); providers without
+    relevance scores report no confidence, so their specialists always run.
+    """
+
+    def __init__(self, confidence_threshold: float = 0.75):
+        self.confidence_threshold = confidence_threshold
+
+    def classify(self, query: str) -> QueryProfile:
+        """Classify a query into a research profile."""
+        text = " ".join(query.lower().split())
+        tokens = re.findall(r"[a-z0-9][a-z0-9'\-]*", text)
+        words = set(tokens)
+
+        data_score = len(words & DATA_TERMS)
+        data_score += sum(1 for phrase in MULTI_WORD_DATA if phrase in text)
+        if re.search(r"\b(19|20)\d{2}\b|\d+%", text):
+            data_score += 1
+        literature_score = len(words & LITERATURE_TERMS)
+        critic_score = len(words & CRITIC_TERMS)
+
+        factual = text.startswith(FACTUAL_OPENERS) and len(tokens) <= 12
+        signals = {
+            "tokens": len(tokens),
+            "factual": factual,
+            "data": data_score,
+            "literature": literature_score,
+            "critic": critic_score,
+        }
+
+        agents = ["search"]
+        optional = []
+        for name, score in (
+            ("data", data_score),
+            ("literature", literature_score),
+            ("critic", critic_score),
+        ):
+            # The critic needs a stronger signal than the other specialists
+            threshold = 2 if name == "critic" else 1
+            if score >= threshold:
+                agents.append(name)
+                if factual and score == threshold:
+                    optional.append(name)
+
+        specialists = len(agents) - 1
+        if factual and not specialists:
+            kind = "factual"
+            max_queries = 1 if len(tokens) <= 6 else 2
+        elif specialists >= 2 or len(tokens) > 20:
+            kind = "analytical"
+            max_queries = 3
+        else:
+            kind = agents[1] if specialists else "general"
+            max_queries = 2 if factual else 3
+
+        return QueryProfile(
+            kind=kind,
+            agents=agents,
+            optional=optional,
+            max_queries=max_queries,
+            signals=signals,
+        )
+
+    def is_confident(self, search_confidence: float) -> bool:
+        """Whether search results alone answer the query well enough."""
+        return search_confidence >= self.confidence_threshold
@@ -3,21 +3,115 @@
 
 import os
 import sys
+import threading
+import time
+import uuid
 
 import click
-from rich.console import Console
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.markdown import Markdown
 
-from .coordinator import ResearchSwarm
+from . import __version__
 
+# rich, openai and the agent modules are imported inside the commands that use
+# them so that `swarm --version` and `swarm agents` start without loading them.
+_console = None
 
-console = Console()
+
+def get_console():
+    """Return the shared rich console, creating it on first use."""
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
+
+
+class AgentProgress:
+    """Live per-agent status table, fed by a swarm's lifecycle events."""
+    
+    STATUS = {
+        "agent.queued": "[dim]queued[/dim]",
+        "agent.started": "[yellow]running[/yellow]",
+        "agent.finished": "[green]done ✓[/green]",
+        "agent.failed": "[red]failed ✗[/red]",
+        "plan.started": "[yellow]planning[/yellow]",
+        "plan.finished": "[green]planned ✓[/green]",
+    }
+    
+    def __init__(self, run_id: str):
+        self._lock = threading.Lock()
+        self.rows: dict[str, dict] = {}
+        # Only the user's run; chat prefetching may have other runs in flight
+        self.run_id = run_id
+    
+    def __call__(self, event):
+        if not event.agent or event.run_id != self.run_id:
+            return
+        with self._lock:
+            row = self.rows.setdefault(event.agent, {
+                "status": "", "started": None, "finished": None,
+                "calls": 0, "tokens": 0, "searches": 0, "chars": 0,
+            })
+            if event.type in self.STATUS:
+                row["status"] = self.STATUS[event.type]
+            if event.type in ("agent.started", "plan.started"):
+                row["started"], row["finished"] = event.timestamp, None
+            elif event.type in ("agent.finished", "agent.failed", "plan.finished"):
+                row["finished"] = event.timestamp
+            elif event.type == "llm.received":
+                row["calls"] += 1
+                row["tokens"] += event.data["prompt_tokens"] + event.data["completion_tokens"]
+            elif event.type == "search.issued":
+                row["searches"] += 1
+            elif event.type == "synthesis.chunk":
+                row["chars"] += len(event.data.get("text", ""))
+    
+    def __rich__(self):
+        from rich.table import Table
+        
+        table = Table(box=None, padding=(0, 2), header_style="bold")
+        for column in ("Agent", "Status", "Elapsed", "LLM calls", "Tokens", "Progress"):
+            table.add_column(column, justify="right" if column in ("Elapsed", "LLM calls", "Tokens") else "left")
+        now = time.time()
+        with self._lock:
+            for name, row in self.rows.items():
+                elapsed = ""
+                if row["started"]:
+                    elapsed = f"{(row['finished'] or now) - row['started']:.1f}s"
+                progress = []
+                if row["searches"]:
+                    progress.append(f"{row['searches']} searches")
+                if row["chars"]:
+                    progress.append(f"{row['chars']} chars written")
+                table.add_row(
+                    f"[cyan]{name}[/cyan]", row["status"], elapsed,
+                    str(row["calls"] or ""), str(row["tokens"] or ""), ", ".join(progress),
+                )
+        return table
+
+
+def run_with_progress(console, swarm, query: str, run=None, **research_kwargs):
+    """Run ``swarm.research`` (or ``run``) while showing the live per-agent table.
+    
+    ``run`` must pass ``run_id`` on to ``swarm.research``; the table shows
+    only the run with that id.
+    """
+    from rich.live import Live
+    
+    run_id = uuid.uuid4().hex[:12]
+    progress = AgentProgress(run_id)
+    subscription = swarm.events.subscribe(progress)
+    try:
+        with Live(progress, console=console, refresh_per_second=8):
+            result = (run or swarm.research)(query, run_id=run_id, **research_kwargs)
+            # Let the table catch up with the last events before it freezes
+            subscription.flush(timeout=1.0)
+    finally:
+        subscription.close()
+    return result
 
 
 @click.group()
-@click.version_option(version="0.1.0")
+@click.version_option(version=__version__)
 def cli():
     """🐝 ResearchSwarm - Multi-agent research system."""
     pass
@@ -25,12 +119,29 @@ def cli():
 
 @cli.command()
 @click.argument("query")
-@click.option("--depth", "-d", default="standard", type=click.Choice(["quick", "standard", "deep"]), help="Research depth")
+@click.option("--depth", "-d", default="standard", type=click.Choice(["auto", "quick", "standard", "deep"]), help="Research depth (auto picks agents per query)")
+@click.option("--rounds", type=int, default=None, help="Max deepening rounds when the critic runs (deep: 3)")
 @click.option("--output", "-o", help="Output file path")
 @click.option("--json", "json_output", is_flag=True, help="Output as JSON")
-def research(query, depth, output, json_output):
+@click.option("--map-reduce", is_flag=True, help="Condense oversized agent input chunk by chunk instead of truncating")
+@click.option("--latency-budget", type=float, help="Target wall time in seconds (scheduler trims the run to fit)")
+@click.option("--cost-budget", type=float, help="Target cost in USD (scheduler trims the run to fit)")
+@click.option("--record", "record_path", help="Record LLM and search I/O to a cassette file")
+@click.option("--replay", "replay_path", help="Replay LLM and search I/O from a cassette file (offline)")
+@click.option("--replay-speed", default=0.0, help="Replay latency scale: 1 = recorded speed, 0 = no I/O time")
+@click.option("--events-log", help="Append lifecycle events to a JSON-lines file")
+@click.option("--metrics-file", help="Write Prometheus-format metrics to a file after the run")
+def research(query, depth, rounds, output, json_output, map_reduce, latency_budget, cost_budget,
+             record_path, replay_path, replay_speed, events_log, metrics_file):
     """Run a research query."""
-    if not os.getenv("OPENAI_API_KEY"):
+    from rich.panel import Panel
+    from rich.markdown import Markdown
+
+    from .coordinator import ResearchSwarm
+
+    console = get_console()
+
+    if not replay_path and not os.getenv("OPENAI_API_KEY"):
         console.print("[red]Error: OPENAI_API_KEY environment variable not set[/red]")
         sys.exit(1)
     
@@ -41,17 +152,73 @@ def research(query, depth, output, json_output):
         border_style="blue"
     ))
     
-    swarm = ResearchSwarm()
+    cassette = None
+    if replay_path:
+        from .cassette import Cassette, replaying_swarm
+        cassette = Cassette.load(replay_path)
+        swarm = replaying_swarm(cassette, speed=replay_speed, map_reduce=map_reduce)
+    elif record_path:
+        from .cassette import Cassette, recording_swarm
+        cassette = Cassette(meta={"query": query, "depth": depth, "max_rounds": rounds})
+        swarm = recording_swarm(cassette, map_reduce=map_reduce)
+    else:
+        # Cassettes hold whole responses, so only live runs stream synthesis
+        swarm = ResearchSwarm(map_reduce=map_reduce, stream_synthesis=True)
+    
+    events_sink = None
+    if events_log:
+        from .events import JsonlSink
+        events_sink = JsonlSink(events_log)
+        events_subscription = swarm.events.subscribe(events_sink)
+    
+    # Budgeted runs start from the estimates learned by earlier runs
+    estimates_path = os.path.expanduser("~/.cache/research-swarm/scheduler.json")
+    budgeted = latency_budget is not None or cost_budget is not None
+    if budgeted and os.path.exists(estimates_path):
+        swarm.scheduler.load(estimates_path)
+    
+    result = run_with_progress(
+        console,
+        swarm,
+        query,
+        depth=depth,
+        max_rounds=rounds,
+        latency_budget=latency_budget,
+        cost_budget=cost_budget,
+    )
+    
+    if events_sink:
+        events_subscription.flush()
+        events_subscription.close()
+        events_sink.close()
+    if metrics_file:
+        swarm.metrics.dump(metrics_file)
+    
+    if budgeted and not replay_path:
+        os.makedirs(os.path.dirname(estimates_path), exist_ok=True)
+        swarm.scheduler.save(estimates_path)
+        outcome = result.metadata["schedule"]["outcome"]
+        console.print(
+            f"[dim]Scheduler: predicted {outcome['predicted_seconds']:.1f}s / ${outcome['predicted_cost']:.4f}, "
+            f"actual {outcome['actual_seconds']:.1f}s / ${outcome['actual_cost']:.4f}[/dim]"
+        )
     
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        console=console,
-    ) as progress:
-        task = progress.add_task("Research in progress...", total=None)
-        result = swarm.research(query, depth=depth)
+    if record_path:
+        cassette.save(record_path)
+        console.print(f"[dim]Recorded {len(cassette.interactions)} interactions to {record_path}[/dim]")
+    elif replay_path:
+        stats = cassette.stats()
+        console.print(
+            f"[dim]Replayed {stats['replayed']} interactions ({stats['misses']} misses); "
+            f"recorded I/O time {stats['recorded_latency']:.1f}s[/dim]"
+        )
     
-    console.print(f"\n[dim]Completed in {result.duration_seconds:.1f}s using {len(result.agent_outputs)} agents[/dim]\n")
+    usage = result.metadata.get("usage", {}).get("total", {})
+    console.print(
+        f"\n[dim]Completed in {result.duration_seconds:.1f}s using {len(result.agent_outputs)} agents"
+        f" · {usage.get('prompt_tokens', 0) + usage.get('completion_tokens', 0)} tokens"
+        f" ({usage.get('cache_hit_rate', 0):.0%} of prompt cached)[/dim]\n"
+    )
     
     if json_output:
         import json
@@ -78,82 +245,172 @@ def research(query, depth, output, json_output):
 
 
 @cli.command()
-def chat():
+@click.option("--metrics-port", type=int, help="Serve Prometheus metrics on this port at /metrics")
+@click.option("--stateless", is_flag=True, help="Research every message from scratch (no follow-up reuse)")
+@click.option("--prefetch", type=click.Choice(["search", "full"]), help="Prefetch likely follow-ups while you read: their searches, or full answers")
+@click.option("--prefetch-budget", default=8000, help="Max tokens of prefetch work per turn")
+def chat(metrics_port, stateless, prefetch, prefetch_budget):
     """Interactive research chat."""
+    from rich.panel import Panel
+    from rich.markdown import Markdown
+
+    from .coordinator import ResearchSwarm
+    from .session import ChatSession
+
+    console = get_console()
+
     if not os.getenv("OPENAI_API_KEY"):
         console.print("[red]Error: OPENAI_API_KEY environment variable not set[/red]")
         sys.exit(1)
+    if prefetch and stateless:
+        console.print("[red]Error: --prefetch answers follow-ups and needs a session; drop --stateless[/red]")
+        sys.exit(1)
     
     console.print(Panel.fit(
         "[bold blue]🐝 ResearchSwarm Chat[/bold blue]\n"
         "Ask any research question. Type 'quit' to exit.\n"
-        "Prefix with 'deep:' for deep research.",
+        "Prefix with 'deep:' for deep research, 'new:' to start a new topic.",
         border_style="blue"
     ))
     
-    swarm = ResearchSwarm()
+    swarm = ResearchSwarm(stream_synthesis=True)
+    if metrics_port:
+        from .metrics import serve_metrics
+        serve_metrics(swarm.metrics, metrics_port)
+        console.print(f"[dim]Metrics at http://127.0.0.1:{metrics_port}/metrics[/dim]")
+    session = ChatSession(swarm)
+    ask = session.ask
+    prefetcher = None
+    if prefetch:
+        from .prefetch import Prefetcher
+        prefetcher = Prefetcher(session, mode=prefetch, token_budget=prefetch_budget)
+        ask = prefetcher.ask
     
     while True:
         try:
             query = console.input("\n[bold green]You:[/bold green] ")
             
             if query.lower() in ("quit", "exit", "q"):
-                console.print("[dim]Goodbye![/dim]")
                 break
             
             if not query.strip():
                 continue
             
-            # Check for depth prefix
+            # Check for depth prefix; deep research always starts afresh
             depth = "quick"
+            fresh = stateless
             if query.lower().startswith("deep:"):
                 depth = "deep"
+                fresh = True
                 query = query[5:].strip()
             elif query.lower().startswith("standard:"):
                 depth = "standard"
                 query = query[9:].strip()
+            elif query.lower().startswith("new:"):
+                fresh = True
+                query = query[4:].strip()
             
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                console=console,
-            ) as progress:
-                task = progress.add_task(f"Researching ({depth})...", total=None)
-                result = swarm.research(query, depth=depth)
+            console.print(f"[dim]Researching ({depth})...[/dim]")
+            result = run_with_progress(console, swarm, query, run=ask, depth=depth, fresh=fresh)
+            turn = result.metadata["session"]
             
-            console.print(f"\n[bold blue]Research Report:[/bold blue] [dim]({result.duration_seconds:.1f}s)[/dim]\n")
+            console.print(f"\n[bold blue]Research Report:[/bold blue] [dim]({turn['seconds']:.1f}s)[/dim]\n")
             console.print(Markdown(result.report))
+            if result.metadata.get("prefetch", {}).get("hit"):
+                ready = "answer" if result.metadata["prefetch"]["answer_ready"] else "search"
+                console.print(f"[dim]Prefetched {ready} for: {result.metadata['prefetch']['question']}[/dim]")
+            if turn["followup"]:
+                searched = "1 new search" if turn["new_searches"] else "no new search"
+                saved = ""
+                if "tokens_saved" in turn:
+                    saved = f"; ~{turn['tokens_saved']:,} tokens, {turn['seconds_saved']:.1f}s saved vs a full run"
+                console.print(f"[dim]Follow-up: reused earlier findings, {searched}{saved}[/dim]")
             
         except KeyboardInterrupt:
-            console.print("\n[dim]Goodbye![/dim]")
+            console.print()
             break
+    
+    if prefetcher:
+        prefetcher.cancel()
+        stats = prefetcher.stats()
+        console.print(
+            f"[dim]Prefetch: {stats['hits']}/{stats['lookups']} follow-ups hit "
+            f"({stats['hit_rate']:.0%}); spent {stats['spent']['tokens']:,} tokens "
+            f"(${stats['spent']['cost']:.4f}), wasted {stats['wasted']['tokens']:,} tokens "
+            f"(${stats['wasted']['cost']:.4f}), {stats['wasted']['requests']} requests[/dim]"
+        )
+    console.print("[dim]Goodbye![/dim]")
 
 
 @cli.command()
-def agents():
-    """List available agents."""
-    swarm = ResearchSwarm.__new__(ResearchSwarm)
-    swarm.agents = {}
+@click.argument("queries_file", type=click.Path(exists=True, dir_okay=False))
+@click.option("--depth", "-d", default="standard", type=click.Choice(["auto", "quick", "standard", "deep"]), help="Research depth")
+@click.option("--output-dir", "-o", default="reports", help="Directory for the markdown reports")
+@click.option("--workdir", default="swarm-batches", help="Directory for batch request files")
+@click.option("--poll-interval", default=60.0, help="Seconds between batch status checks")
+@click.option("--local", "local_dir", help="Answer batches locally with the live API (for testing) instead of the Batch API")
+def batch(queries_file, depth, output_dir, workdir, poll_interval, local_dir):
+    """Research many queries (one per line) through the discounted Batch API."""
+    from .batch import BatchRunner, LocalBatchBackend, OpenAIBatchBackend
+    from .transport import Transport
+
+    console = get_console()
+
+    if not os.getenv("OPENAI_API_KEY"):
+        console.print("[red]Error: OPENAI_API_KEY environment variable not set[/red]")
+        sys.exit(1)
+    
+    with open(queries_file) as f:
+        queries = [line.strip() for line in f if line.strip()]
+    
+    client = Transport().openai_client()
+    if local_dir:
+        backend = LocalBatchBackend(client, local_dir)
+    else:
+        backend = OpenAIBatchBackend(client)
+    
+    runner = BatchRunner(backend, workdir=workdir, poll_interval=poll_interval)
+    console.print(f"[bold blue]🐝 ResearchSwarm batch[/bold blue] {len(queries)} queries, depth {depth}")
+    with console.status("Waiting for batches..."):
+        results = runner.run(queries, depth=depth)
     
-    from .agents import SearchAgent, DataAgent, LiteratureAgent, CriticAgent, SynthesisAgent
+    os.makedirs(output_dir, exist_ok=True)
+    for i, (query, result) in enumerate(zip(queries, results), 1):
+        if isinstance(result, Exception):
+            console.print(f"[red]✗ {query[:60]}: {result}[/red]")
+            continue
+        path = os.path.join(output_dir, f"report-{i:03d}.md")
+        with open(path, "w") as f:
+            f.write(result.report)
+        console.print(f"[green]✓[/green] {query[:60]} → {path}")
     
+    stats = runner.stats
+    console.print(f"\n[dim]{stats.batches} batches, {stats.requests} requests, {stats.failed_requests} failed[/dim]")
+
+
+@cli.command()
+def agents():
+    """List available agents."""
+    # Static text only: plain click output keeps this command free of rich,
+    # openai and the agent modules.
     agents_info = [
-        ("search", SearchAgent, "Searches the web for relevant information"),
-        ("data", DataAgent, "Extracts statistics and structured data"),
-        ("literature", LiteratureAgent, "Reviews academic and industry literature"),
-        ("critic", CriticAgent, "Provides critical analysis and counterarguments"),
-        ("synthesis", SynthesisAgent, "Combines findings into a coherent report"),
+        ("search", "Searches the web for relevant information"),
+        ("data", "Extracts statistics and structured data"),
+        ("literature", "Reviews academic and industry literature"),
+        ("critic", "Provides critical analysis and counterarguments"),
+        ("synthesis", "Combines findings into a coherent report"),
     ]
     
-    console.print("\n[bold]Available Agents:[/bold]\n")
+    click.echo("\n" + click.style("Available Agents:", bold=True) + "\n")
     
-    for name, cls, desc in agents_info:
-        console.print(f"  [cyan]{name:12}[/cyan] {desc}")
+    for name, desc in agents_info:
+        click.echo(f"  {click.style(f'{name:12}', fg='cyan')} {desc}")
     
-    console.print("\n[bold]Research Depths:[/bold]\n")
-    console.print("  [cyan]quick[/cyan]      2 agents (search + synthesis) - ~30s")
-    console.print("  [cyan]standard[/cyan]   4 agents - ~2min")
-    console.print("  [cyan]deep[/cyan]       5 agents (includes critic) - ~5min")
+    click.echo("\n" + click.style("Research Depths:", bold=True) + "\n")
+    click.echo(f"  {click.style('auto', fg='cyan')}       agents chosen per query by a local classifier")
+    click.echo(f"  {click.style('quick', fg='cyan')}      2 agents (search + synthesis) - ~30s")
+    click.echo(f"  {click.style('standard', fg='cyan')}   4 agents - ~2min")
+    click.echo(f"  {click.style('deep', fg='cyan')}       5 agents (includes critic) - ~5min")
 
 
 def main():
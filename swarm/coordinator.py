@@ -2,13 +2,15 @@
 
 import asyncio
 import concurrent.futures
+import contextvars
+import re
+import time
+import uuid
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 import json
 
-from openai import OpenAI
-
 from .agents import (
     BaseAgent,
     SearchAgent,
@@ -17,7 +19,30 @@ from .agents import (
     CriticAgent,
     SynthesisAgent,
 )
-from .agents.base import AgentOutput
+from .agents.base import AgentOutput, AGENT_ORDER, ordered_items, run_overrides, unique
+from .classifier import QueryClassifier
+from .events import (
+    AGENT_FAILED,
+    AGENT_FINISHED,
+    AGENT_QUEUED,
+    AGENT_STARTED,
+    PLAN_FINISHED,
+    PLAN_STARTED,
+    RUN_FINISHED,
+    RUN_STARTED,
+    EventBus,
+    emit,
+    reset_run,
+    set_run,
+)
+from .mapreduce import ChunkCache
+from .metrics import MetricsRegistry, observe_llm
+from .scheduler import Scheduler, token_cost
+from .transport import Transport
+from .usage import UsageTracker, create_within_ceiling, current_tracker, record_usage, reset_tracker, set_tracker
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 
 @dataclass
@@ -31,6 +56,7 @@ class ResearchResult:
     timestamp: datetime
     depth: str
     duration_seconds: float
+    metadata: dict = field(default_factory=dict)
     
     def to_dict(self) -> dict:
         return {
@@ -42,48 +68,95 @@ class ResearchResult:
             "timestamp": self.timestamp.isoformat(),
             "depth": self.depth,
             "duration_seconds": self.duration_seconds,
+            "metadata": self.metadata,
         }
 
 
 class ResearchSwarm:
-    """Orchestrates multiple research agents working in parallel."""
+    """Orchestrates multiple research agents working in parallel.
     
+    One swarm can serve many concurrent ``research()`` calls. Everything a
+    run decides (agents, contexts, overrides, outputs) lives in locals of
+    that call, and its usage tracker and event run id are context variables.
+    What is shared across runs is either read-only (``DEPTH_CONFIG``, agent
+    settings) or guarded by a lock (caches, scheduler, metrics, router).
+    """
+    
+    # Read-only presets: agent lists are tuples so no run can edit them
     DEPTH_CONFIG = {
         "quick": {
-            "agents": ["search", "synthesis"],
+            "agents": ("search", "synthesis"),
             "max_parallel": 2,
         },
         "standard": {
-            "agents": ["search", "data", "literature", "synthesis"],
+            "agents": ("search", "data", "literature", "synthesis"),
             "max_parallel": 4,
         },
         "deep": {
-            "agents": ["search", "data", "literature", "critic", "synthesis"],
+            "agents": ("search", "data", "literature", "critic", "synthesis"),
             "max_parallel": 5,
+            "max_rounds": 3,
         },
     }
     
+    # Follow-up searches per deepening round
+    MAX_GAPS_PER_ROUND = 3
+    
     def __init__(
         self,
-        client: Optional[OpenAI] = None,
+        client: Optional["OpenAI"] = None,
         model: str = "gpt-4o",
-        max_workers: int = 5
+        max_workers: int = 5,
+        transport: Optional[Transport] = None,
+        max_connections: int = 64,
+        fast_model: str = "gpt-4o-mini",
+        scheduler: Optional[Scheduler] = None,
+        map_reduce: bool = False,
+        chunk_cache: Optional[ChunkCache] = None,
+        events: Optional[EventBus] = None,
+        stream_synthesis: bool = False,
+        metrics: Optional[MetricsRegistry] = None,
     ):
-        self.client = client or OpenAI()
+        # One pooled transport per swarm, reused across research() calls.
+        # max_workers bounds the agents of one run, but concurrent runs share
+        # the pool, so it is sized separately. Pass the same transport to
+        # several swarms to share connections between them.
+        self.transport = transport or Transport(max_connections=max_connections)
+        self.client = client or self.transport.openai_client()
         self.model = model
+        self.fast_model = fast_model
         self.max_workers = max_workers
+        self.classifier = QueryClassifier()
+        self.scheduler = scheduler or Scheduler()
+        # Lifecycle events of every run; subscribe to follow progress
+        self.events = events or EventBus()
+        # Aggregate counters and latency histograms across runs
+        self.metrics = metrics or MetricsRegistry()
         
         # Initialize agents
         self.agents: dict[str, BaseAgent] = {
-            "search": SearchAgent(self.client, self.model),
-            "data": DataAgent(self.client, self.model),
-            "literature": LiteratureAgent(self.client, self.model),
-            "critic": CriticAgent(self.client, self.model),
-            "synthesis": SynthesisAgent(self.client, self.model),
+            "search": SearchAgent(self.client, self.model, self.transport),
+            "data": DataAgent(self.client, self.model, self.transport),
+            "literature": LiteratureAgent(self.client, self.model, self.transport),
+            "critic": CriticAgent(self.client, self.model, self.transport),
+            "synthesis": SynthesisAgent(self.client, self.model, self.transport),
         }
+        
+        # Agents share one chunk cache so map-reduce work is reused across
+        # agents and runs
+        self.chunk_cache = chunk_cache or ChunkCache()
+        self.map_reduce = map_reduce
+        for agent in self.agents.values():
+            agent.chunk_cache = self.chunk_cache
+            agent.metrics = self.metrics
+            agent.map_reduce = map_reduce
+        self.agents["synthesis"].stream = stream_synthesis
     
     def register_agent(self, agent: BaseAgent):
         """Register a custom agent."""
+        agent.chunk_cache = self.chunk_cache
+        agent.metrics = self.metrics
+        agent.map_reduce = self.map_reduce
         self.agents[agent.name] = agent
     
     def research(
@@ -91,36 +164,162 @@ class ResearchSwarm:
         query: str,
         depth: str = "standard",
         agents: Optional[list[str]] = None,
+        max_rounds: Optional[int] = None,
+        token_budget: Optional[int] = None,
+        latency_budget: Optional[float] = None,
+        cost_budget: Optional[float] = None,
+        max_queries: Optional[int] = None,
+        context_scale: Optional[float] = None,
+        prior: Optional[dict[str, AgentOutput]] = None,
+        run_id: Optional[str] = None,
     ) -> ResearchResult:
-        """Run a research query using the swarm."""
-        start_time = datetime.now()
+        """Run a research query using the swarm.
+        
+        With ``depth="auto"`` a local classifier picks the agents and search
+        breadth for the query instead of a fixed preset.
+        
+        When the critic takes part and ``max_rounds`` (default: the depth's
+        ``max_rounds``) is above one, research deepens round by round: the
+        critic's open gaps become targeted follow-up searches until no gaps
+        remain, the rounds run out or ``token_budget`` tokens are spent.
         
+        ``latency_budget`` (seconds) and ``cost_budget`` (USD) hand the run to
+        the scheduler, which trims agents, picks a model per stage, narrows
+        search and shrinks context to fit, based on estimates from past runs.
+        Budgeted runs do a single round.
+        
+        ``max_queries`` caps the search agent's query count (1 searches the
+        query as written, with no LLM call) and ``context_scale`` scales every
+        agent's prompt budgets, as the scheduler does. ``prior`` holds
+        findings gathered earlier, such as a chat session's working set: they
+        are handed to synthesis next to this run's outputs, so ``agents`` need
+        only cover what is new (``agents=[]`` runs synthesis alone).
+        
+        ``run_id`` tags the run's events (default: a fresh id), so a caller can
+        follow its own run while others share the event bus.
+        """
+        start_time = datetime.now()
+        tracker = UsageTracker()
+        token = set_tracker(tracker)
+        run_id = run_id or uuid.uuid4().hex[:12]
+        run_token = set_run(self.events, run_id)
+        emit(RUN_STARTED, query=query, depth=depth)
+        result = None
+        try:
+            result = self._research(
+                query, depth, agents, max_rounds, token_budget,
+                latency_budget, cost_budget, max_queries, context_scale, prior, start_time, tracker,
+            )
+            result.metadata["run_id"] = run_id
+            return result
+        finally:
+            seconds = (datetime.now() - start_time).total_seconds()
+            outcome = "ok" if result is not None else "error"
+            self.metrics.counter(
+                "swarm_research_runs_total", "Research runs by depth and outcome", ("depth", "outcome")
+            ).labels(depth, outcome).inc()
+            self.metrics.histogram(
+                "swarm_research_duration_seconds", "Research run wall time", ("depth",)
+            ).labels(depth).observe(seconds)
+            emit(RUN_FINISHED, success=result is not None, seconds=round(seconds, 3))
+            reset_run(run_token)
+            reset_tracker(token)
+    
+    def _research(
+        self,
+        query: str,
+        depth: str,
+        agents: Optional[list[str]],
+        max_rounds: Optional[int],
+        token_budget: Optional[int],
+        latency_budget: Optional[float],
+        cost_budget: Optional[float],
+        max_queries: Optional[int],
+        context_scale: Optional[float],
+        prior: Optional[dict[str, AgentOutput]],
+        start_time: datetime,
+        tracker: UsageTracker,
+    ) -> ResearchResult:
+        """Body of ``research`` once usage tracking is in place."""
         # Get config for depth
         config = self.DEPTH_CONFIG.get(depth, self.DEPTH_CONFIG["standard"])
         
         # Determine which agents to use
-        agent_names = agents or config["agents"]
+        profile = None
+        if agents is None and depth == "auto":
+            profile = self.classifier.classify(query)
+            requested = profile.agents
+        else:
+            requested = config["agents"] if agents is None else agents
+        
+        # Synthesis always runs last, on its own. Build a new list: the preset
+        # and the caller's list are shared with other runs
+        agent_names = [name for name in requested if name != "synthesis"]
         
-        # Make sure synthesis is always last
-        if "synthesis" in agent_names:
-            agent_names.remove("synthesis")
+        contexts = {}
+        if profile:
+            contexts["search"] = {"max_queries": profile.max_queries}
+        if max_queries:
+            contexts["search"] = {"max_queries": max_queries}
         
-        # Plan the research
-        plan = self._plan_research(query, agent_names)
+        # Fit the run to the latency/cost budget
+        schedule = None
+        overrides: dict[str, dict] = {}
+        if latency_budget or cost_budget:
+            schedule = self.scheduler.plan(
+                agent_names, [self.model, self.fast_model], latency_budget, cost_budget
+            )
+            agent_names = list(schedule.agents)
+            max_rounds = 1
+            contexts["search"] = {"max_queries": schedule.max_queries}
+            overrides = {
+                stage: {"model": model, "context_scale": schedule.context_scale}
+                for stage, model in schedule.models.items()
+            }
+        elif context_scale:
+            overrides = {
+                stage: {"context_scale": context_scale}
+                for stage in (*agent_names, "synthesis")
+            }
+        
+        # The critic reviews the other agents' findings, so when deepening it
+        # runs after them instead of alongside
+        max_rounds = max_rounds or config.get("max_rounds", 1)
+        deepen = "critic" in agent_names and max_rounds > 1
+        if deepen:
+            agent_names = [n for n in agent_names if n != "critic"]
+        
+        # Optional specialists wait for search and are skipped when its
+        # results already answer the query confidently
+        optional = [n for n in (profile.optional if profile else []) if n in agent_names]
+        required = [n for n in agent_names if n not in optional]
         
         # Execute research agents in parallel (except synthesis)
-        agent_outputs = self._execute_parallel(query, agent_names, plan)
+        agent_outputs = self._run_stage(query, required, contexts, overrides)
+        
+        skipped = []
+        if optional:
+            search_output = agent_outputs.get("search")
+            confidence = search_output.data.get("confidence", 0.0) if search_output else 0.0
+            if search_output and search_output.success and self.classifier.is_confident(confidence):
+                skipped = optional
+            else:
+                agent_outputs.update(self._run_stage(query, optional, contexts, overrides))
         
-        # Run synthesis with all other outputs as context
-        synthesis_output = self.agents["synthesis"].run(
-            task=query,
-            context=agent_outputs
+        deepening = None
+        if deepen:
+            deepening = self._deepen(query, agent_outputs, max_rounds, token_budget, tracker)
+        
+        # Run synthesis with all other outputs (and earlier findings) as context
+        synthesis_output = self._timed_run(
+            self.agents["synthesis"], query, {**(prior or {}), **agent_outputs},
+            overrides.get("synthesis", {}),
         )
         agent_outputs["synthesis"] = synthesis_output
         
         # Collect all sources
         all_sources = []
-        for output in agent_outputs.values():
+        for _, output in ordered_items(agent_outputs):
             all_sources.extend(output.sources)
         
         # Calculate duration
@@ -130,18 +329,173 @@ class ResearchSwarm:
         report = synthesis_output.content
         summary = report.split("\n\n")[0] if "\n\n" in report else report[:500]
         
+        # Feed the scheduler's estimates and check its predictions. Follow-up
+        # searches while deepening would skew the search estimate, and a
+        # deepening critic runs once per round. Scaled stages are normalized
+        # by the scale they ran at; earlier findings keep their own budget,
+        # so synthesis over them is not a sample of a scaled synthesis
+        search_breadth = contexts.get("search", {}).get("max_queries", 3)
+        for stage, seconds in tracker.seconds.items():
+            usage = tracker.by_agent.get(stage)
+            if deepening and stage in ("search", "critic"):
+                continue
+            if prior and stage == "synthesis":
+                continue
+            if usage and stage in (*self.agents, "coordinator"):
+                self.scheduler.observe(
+                    stage, tracker.models.get(stage, self.model), seconds,
+                    usage.prompt_tokens, usage.completion_tokens, search_breadth,
+                    overrides.get(stage, {}).get("context_scale", 1.0),
+                )
+        scheduling = None
+        if schedule:
+            cost = sum(
+                token_cost(model, t.prompt_tokens, t.completion_tokens, t.cached_tokens)
+                for model, t in tracker.by_model.items()
+            )
+            scheduling = {
+                "plan": schedule.to_dict(),
+                "outcome": self.scheduler.record_outcome(schedule, duration, cost),
+            }
+        
         return ResearchResult(
             query=query,
             report=report,
             summary=summary,
             agent_outputs=agent_outputs,
-            sources=list(set(all_sources)),
+            sources=unique(all_sources),
             timestamp=start_time,
             depth=depth,
             duration_seconds=duration,
+            metadata={
+                "transport": self.transport.stats().to_dict(),
+                "search_providers": self.agents["search"].router.snapshot()
+                if isinstance(self.agents.get("search"), SearchAgent) else None,
+                "profile": profile.to_dict() if profile else None,
+                "skipped_agents": skipped,
+                "prior": sorted(prior or ()),
+                "deepening": deepening,
+                "schedule": scheduling,
+                "usage": tracker.to_dict(),
+            },
         )
     
-    def _plan_research(self, query: str, agent_names: list[str]) -> dict:
+    def _deepen(
+        self,
+        query: str,
+        agent_outputs: dict[str, AgentOutput],
+        max_rounds: int,
+        token_budget: Optional[int],
+        tracker: UsageTracker,
+    ) -> dict:
+        """Critique the findings and research the open gaps, round by round.
+        
+        Outputs from earlier rounds are kept and only the new gap queries are
+        searched; queries seen before are skipped or served from the search
+        agent's cache. Follow-up findings accumulate under ``"followup"``.
+        """
+        search_output = agent_outputs.get("search")
+        searched = {
+            _normalize(q)
+            for q in (search_output.data.get("queries", []) if search_output else [])
+            if isinstance(q, str)
+        }
+        gap_queries: list[str] = []
+        followups: list[tuple[str, AgentOutput]] = []
+        rounds = 1
+        
+        while True:
+            findings = {
+                name: output.content
+                for name, output in ordered_items(agent_outputs)
+                if output.success and name != "critic"
+            }
+            critic_output = self._timed_run(self.agents["critic"], query, findings)
+            agent_outputs["critic"] = critic_output
+            
+            gaps = [
+                _gap_to_query(g) for g in critic_output.data.get("gaps", [])
+                if isinstance(g, str) and g.strip()
+            ]
+            new_gaps = [g for g in unique(gaps) if _normalize(g) not in searched]
+            new_gaps = new_gaps[:self.MAX_GAPS_PER_ROUND]
+            
+            if not critic_output.success:
+                stop_reason = "critic_failed"
+                break
+            if not new_gaps:
+                stop_reason = "no_gaps"
+                break
+            if rounds >= max_rounds:
+                stop_reason = "max_rounds"
+                break
+            spent = tracker.total.prompt_tokens + tracker.total.completion_tokens
+            if token_budget and spent >= token_budget:
+                stop_reason = "token_budget"
+                break
+            
+            rounds += 1
+            searched.update(_normalize(g) for g in new_gaps)
+            gap_queries.extend(new_gaps)
+            followups.extend(self._search_gaps(new_gaps))
+            
+            agent_outputs["followup"] = AgentOutput(
+                agent_name="search",
+                content="\n\n".join(
+                    f"Gap: {gap}\n{output.content}" for gap, output in followups
+                ),
+                sources=unique(s for _, output in followups for s in output.sources),
+                data={"gap_queries": list(gap_queries)},
+                success=any(output.success for _, output in followups),
+            )
+        
+        return {
+            "rounds": rounds,
+            "stop_reason": stop_reason,
+            "gap_queries": gap_queries,
+        }
+    
+    def _search_gaps(self, gaps: list[str]) -> list[tuple[str, AgentOutput]]:
+        """Run one targeted search per gap, in parallel."""
+        search = self.agents["search"]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run,
+                    self._timed_run, search, gap, {"max_queries": 1},
+                )
+                for gap in gaps
+            ]
+            return [(gap, future.result()) for gap, future in zip(gaps, futures)]
+    
+    def _run_stage(
+        self,
+        query: str,
+        agent_names: list[str],
+        contexts: Optional[dict[str, dict]] = None,
+        overrides: Optional[dict[str, dict]] = None,
+    ) -> dict[str, AgentOutput]:
+        """Plan (when there is something to coordinate) and run agents."""
+        if not agent_names:
+            return {}
+        overrides = overrides or {}
+        
+        # A lone agent simply gets the query; planning would only echo it
+        if len(agent_names) > 1:
+            plan = self._plan_research(
+                query, agent_names, overrides.get("coordinator", {}).get("model")
+            )
+        else:
+            plan = {}
+        
+        return self._execute_parallel(query, agent_names, plan, contexts, overrides)
+    
+    def _plan_research(
+        self,
+        query: str,
+        agent_names: list[str],
+        model: Optional[str] = None,
+    ) -> dict:
         """Plan the research strategy."""
         system_prompt = """You are a research coordinator. Given a research query,
 create a brief plan for how to investigate it.
@@ -156,10 +510,16 @@ For each agent, provide a specific task. Return JSON:
 
 Only include tasks for the agents listed. Be specific and actionable."""
 
-        user_prompt = f"Query: {query}\n\nAgents available: {', '.join(agent_names)}"
+        rank = {name: i for i, name in enumerate(AGENT_ORDER)}
+        ordered = sorted(agent_names, key=lambda n: (rank.get(n, len(rank)), n))
+        user_prompt = f"Query: {query}\n\nAgents available: {', '.join(ordered)}"
         
-        response = self.client.chat.completions.create(
-            model=self.model,
+        model = model or self.model
+        emit(PLAN_STARTED, "coordinator", agents=ordered, model=model)
+        start = time.perf_counter()
+        response = create_within_ceiling(
+            self.client.chat.completions.create,
+            model=model,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
@@ -167,6 +527,13 @@ Only include tasks for the agents listed. Be specific and actionable."""
             response_format={"type": "json_object"},
             temperature=0.3,
         )
+        record_usage("coordinator", response, model)
+        seconds = time.perf_counter() - start
+        observe_llm(self.metrics, "coordinator", model, seconds, getattr(response, "usage", None))
+        tracker = current_tracker()
+        if tracker is not None:
+            tracker.add_time("coordinator", seconds, model)
+        emit(PLAN_FINISHED, "coordinator", seconds=round(seconds, 3))
         
         try:
             return json.loads(response.choices[0].message.content)
@@ -174,15 +541,72 @@ Only include tasks for the agents listed. Be specific and actionable."""
             # Default tasks
             return {name: query for name in agent_names}
     
+    def predict_followups(
+        self,
+        query: str,
+        summary: str,
+        n: int = 3,
+        model: Optional[str] = None,
+    ) -> list[str]:
+        """Predict the user's most likely next questions, most likely first.
+
+        One call on the fast model by default, recorded as the "prefetch"
+        stage. Used to prefetch follow-ups in chat.
+        """
+        system_prompt = f"""You predict how a research conversation continues.
+Given the user's question and a summary of the answer, list the {n} follow-up
+questions the user is most likely to ask next, most likely first. Phrase them
+as the user would, briefly.
+
+Return JSON: {{"questions": ["...", "..."]}}"""
+
+        user_prompt = f"Question: {query}\n\nAnswer summary: {summary[:1500]}"
+
+        model = model or self.fast_model
+        start = time.perf_counter()
+        response = create_within_ceiling(
+            self.client.chat.completions.create,
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.3,
+        )
+        record_usage("prefetch", response, model)
+        observe_llm(self.metrics, "prefetch", model, time.perf_counter() - start, getattr(response, "usage", None))
+
+        try:
+            questions = json.loads(response.choices[0].message.content).get("questions", [])
+        except (json.JSONDecodeError, AttributeError):
+            return []
+        if not isinstance(questions, list):
+            return []
+        return unique(q.strip() for q in questions if isinstance(q, str) and q.strip())[:n]
+
     def _execute_parallel(
         self,
         query: str,
         agent_names: list[str],
-        plan: dict
+        plan: dict,
+        contexts: Optional[dict[str, dict]] = None,
+        overrides: Optional[dict[str, dict]] = None,
     ) -> dict[str, AgentOutput]:
         """Execute agents in parallel."""
+        contexts = contexts or {}
+        overrides = overrides or {}
         outputs = {}
         
+        # Agents submitted but not yet picked up by a worker, across all runs
+        queue_depth = self.metrics.gauge(
+            "swarm_executor_queue_depth", "Agent tasks waiting for a worker thread"
+        ).labels()
+        
+        def dequeue_and_run(*args):
+            queue_depth.dec()
+            return self._timed_run(*args)
+        
         with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
             # Submit all agent tasks
             future_to_agent = {}
@@ -190,7 +614,15 @@ Only include tasks for the agents listed. Be specific and actionable."""
                 if name in self.agents:
                     agent = self.agents[name]
                     task = plan.get(name, query)
-                    future = executor.submit(agent.run, task, {})
+                    emit(AGENT_QUEUED, name)
+                    queue_depth.inc()
+                    # Run in a copy of this context so usage is recorded
+                    # against the calling research run
+                    future = executor.submit(
+                        contextvars.copy_context().run,
+                        dequeue_and_run, agent, task,
+                        dict(contexts.get(name, {})), overrides.get(name, {}),
+                    )
                     future_to_agent[future] = name
             
             # Collect results as they complete
@@ -209,7 +641,53 @@ Only include tasks for the agents listed. Be specific and actionable."""
         
         return outputs
     
+    @staticmethod
+    def _timed_run(
+        agent: BaseAgent,
+        task: str,
+        context: dict,
+        overrides: Optional[dict] = None,
+    ) -> AgentOutput:
+        """Run an agent under per-run overrides and record its wall time."""
+        start = time.perf_counter()
+        with run_overrides(**(overrides or {})):
+            model = agent.active_model
+            emit(AGENT_STARTED, agent.name, model=model)
+            try:
+                output = agent.run(task, context)
+            except Exception as e:
+                agent.metrics.counter(
+                    "swarm_agent_runs_total", "Agent runs by outcome", ("agent", "outcome")
+                ).labels(agent.name, "error").inc()
+                emit(AGENT_FAILED, agent.name, seconds=round(time.perf_counter() - start, 3), error=str(e))
+                raise
+        output.duration_seconds = time.perf_counter() - start
+        agent.metrics.histogram(
+            "swarm_agent_duration_seconds", "Agent run wall time", ("agent",)
+        ).labels(agent.name).observe(output.duration_seconds)
+        agent.metrics.counter(
+            "swarm_agent_runs_total", "Agent runs by outcome", ("agent", "outcome")
+        ).labels(agent.name, "ok" if output.success else "error").inc()
+        if output.success:
+            emit(AGENT_FINISHED, agent.name, seconds=round(output.duration_seconds, 3))
+        else:
+            emit(AGENT_FAILED, agent.name, seconds=round(output.duration_seconds, 3), error=output.error)
+        tracker = current_tracker()
+        if tracker is not None:
+            tracker.add_time(agent.name, output.duration_seconds, model)
+        return output
+    
     def chat(self, query: str) -> str:
         """Simple chat interface for quick queries."""
         result = self.research(query, depth="quick")
         return result.report
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _gap_to_query(gap: str) -> str:
+    """Turn a critic gap such as "Not addressed: X" into a search query."""
+    gap = re.sub(r"^\s*(not addressed|should consider|missing)\s*:\s*", "", gap, flags=re.I)
+    return gap.strip()[:200]
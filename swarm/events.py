@@ -0,0 +1,364 @@
+"""Structured lifecycle events for research runs.
+
+A ``ResearchSwarm`` publishes typed events to its ``EventBus`` as a run
+progresses: planning, each agent being queued, started, finished or failed,
+every LLM call and search, and the synthesis text as it arrives. Events of
+one run share a ``run_id``, so one bus can serve a swarm shared by many
+concurrent runs.
+
+Subscribers never block the pipeline. Each sync subscriber is fed from its
+own bounded queue by a worker thread, and async subscribers are scheduled on
+their event loop. A subscriber that falls behind loses events (counted in
+``dropped``) rather than slowing research down.
+
+    swarm.events.subscribe(print)                       # sync
+    swarm.events.subscribe(handler, types=[AGENT_FINISHED])
+    swarm.events.subscribe(LogSink())                   # logging
+    stream = EventStream(swarm.events)                  # SSE text
+    swarm.research(query, run_id=stream.run_id)
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+RUN_STARTED = "run.started"
+RUN_FINISHED = "run.finished"
+PLAN_STARTED = "plan.started"
+PLAN_FINISHED = "plan.finished"
+AGENT_QUEUED = "agent.queued"
+AGENT_STARTED = "agent.started"
+AGENT_FINISHED = "agent.finished"
+AGENT_FAILED = "agent.failed"
+LLM_SENT = "llm.sent"
+LLM_RECEIVED = "llm.received"
+SEARCH_ISSUED = "search.issued"
+SYNTHESIS_CHUNK = "synthesis.chunk"
+
+EVENT_TYPES = (
+    RUN_STARTED, RUN_FINISHED,
+    PLAN_STARTED, PLAN_FINISHED,
+    AGENT_QUEUED, AGENT_STARTED, AGENT_FINISHED, AGENT_FAILED,
+    LLM_SENT, LLM_RECEIVED,
+    SEARCH_ISSUED,
+    SYNTHESIS_CHUNK,
+)
+
+
+@dataclass(frozen=True)
+class Event:
+    """One lifecycle event of a research run."""
+    type: str
+    run_id: str
+    agent: Optional[str] = None
+    data: dict = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict:
+        return {
+            "type": self.type,
+            "run_id": self.run_id,
+            "agent": self.agent,
+            "data": self.data,
+            "timestamp": self.timestamp,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), default=str)
+
+    def to_sse(self) -> str:
+        """Server-sent events wire format."""
+        return f"event: {self.type}\ndata: {self.to_json()}\n\n"
+
+
+class Subscription:
+    """A registered subscriber; call ``close()`` (or the bus's
+    ``unsubscribe``) to stop receiving events."""
+
+    def __init__(
+        self,
+        bus: "EventBus",
+        callback: Callable[[Event], Any],
+        types: Optional[frozenset[str]],
+        max_queue: int,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ):
+        self._bus = bus
+        self.callback = callback
+        self.types = types
+        self.max_queue = max_queue
+        self.loop = loop
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._queue: Optional[queue.Queue] = None
+        if loop is None:
+            self._queue = queue.Queue(maxsize=max_queue)
+            threading.Thread(
+                target=self._drain, name="swarm-events", daemon=True
+            ).start()
+
+    def wants(self, event_type: str) -> bool:
+        return self.types is None or event_type in self.types
+
+    def deliver(self, event: Event):
+        """Hand an event over without blocking the publisher."""
+        if self._queue is not None:
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                with self._lock:
+                    self.dropped += 1
+            return
+        with self._lock:
+            if self._pending >= self.max_queue:
+                self.dropped += 1
+                return
+            self._pending += 1
+        try:
+            self.loop.call_soon_threadsafe(self._schedule, event)
+        except RuntimeError:
+            # The subscriber's loop has been closed
+            with self._lock:
+                self._pending -= 1
+                self.dropped += 1
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything delivered so far has been handled."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._queue is not None and self._queue.unfinished_tasks == 0:
+                return True
+            if self._queue is None and self._pending == 0:
+                return True
+            time.sleep(0.005)
+        return False
+
+    def close(self):
+        self._bus.unsubscribe(self)
+
+    def _stop(self):
+        if self._queue is None:
+            return
+        # The sentinel must not wait behind a stuck subscriber: make room
+        # by dropping the oldest unhandled events
+        while True:
+            try:
+                self._queue.put_nowait(None)
+                return
+            except queue.Full:
+                pass
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                continue
+            self._queue.task_done()
+            with self._lock:
+                self.dropped += 1
+
+    def _drain(self):
+        while True:
+            event = self._queue.get()
+            try:
+                if event is None:
+                    return
+                self.callback(event)
+                self.delivered += 1
+            except Exception:
+                self.errors += 1
+                logger.exception("Event subscriber %r failed", self.callback)
+            finally:
+                self._queue.task_done()
+
+    def _schedule(self, event: Event):
+        task = self.loop.create_task(self.callback(event))
+        task.add_done_callback(self._done)
+
+    def _done(self, task: "asyncio.Task"):
+        with self._lock:
+            self._pending -= 1
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self.errors += 1
+            logger.error("Async event subscriber %r failed: %s", self.callback, task.exception())
+        else:
+            self.delivered += 1
+
+
+class EventBus:
+    """Fans events out to subscribers without blocking the publisher."""
+
+    def __init__(self, max_queue: int = 1000):
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._subscribers: tuple[Subscription, ...] = ()
+
+    def subscribe(
+        self,
+        callback: Callable[[Event], Any],
+        types: Optional[Iterable[str]] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> Subscription:
+        """Call ``callback`` with every event (or only those in ``types``).
+
+        Coroutine functions are run on ``loop``, by default the loop running
+        when ``subscribe`` is called.
+        """
+        if asyncio.iscoroutinefunction(callback) or asyncio.iscoroutinefunction(
+            getattr(callback, "__call__", None)
+        ):
+            loop = loop or asyncio.get_running_loop()
+        else:
+            loop = None
+        subscription = Subscription(
+            self, callback, frozenset(types) if types is not None else None, self.max_queue, loop
+        )
+        with self._lock:
+            self._subscribers = (*self._subscribers, subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription not in self._subscribers:
+                return
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+        subscription._stop()
+
+    def wants(self, event_type: str) -> bool:
+        """Whether anyone listens for ``event_type`` (cheap; no lock)."""
+        return any(s.wants(event_type) for s in self._subscribers)
+
+    def publish(self, event: Event):
+        for subscription in self._subscribers:
+            if subscription.wants(event.type):
+                subscription.deliver(event)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait for every subscriber to catch up (e.g. before printing)."""
+        return all(s.flush(timeout) for s in self._subscribers)
+
+    @property
+    def dropped(self) -> int:
+        return sum(s.dropped for s in self._subscribers)
+
+
+# The bus and run id of the research run executing in this context. Like the
+# usage tracker, it follows the run into agent threads via copy_context().
+_current_run: contextvars.ContextVar[Optional[tuple[EventBus, str]]] = contextvars.ContextVar(
+    "event_run", default=None
+)
+
+
+def set_run(bus: EventBus, run_id: str) -> contextvars.Token:
+    """Make ``bus``/``run_id`` current; pass the returned token to ``reset_run``."""
+    return _current_run.set((bus, run_id))
+
+
+def reset_run(token: contextvars.Token):
+    _current_run.reset(token)
+
+
+def wants(event_type: str) -> bool:
+    """Whether the current run has a subscriber for ``event_type``."""
+    run = _current_run.get()
+    return run is not None and run[0].wants(event_type)
+
+
+def emit(event_type: str, agent: Optional[str] = None, **data):
+    """Publish an event for the current run, if anyone is listening."""
+    run = _current_run.get()
+    if run is None:
+        return
+    bus, run_id = run
+    if bus.wants(event_type):
+        bus.publish(Event(event_type, run_id, agent, data))
+
+
+class LogSink:
+    """Subscriber that writes events to a ``logging`` logger."""
+
+    def __init__(self, logger_name: str = "swarm.events", level: int = logging.INFO):
+        self.logger = logging.getLogger(logger_name)
+        self.level = level
+
+    def __call__(self, event: Event):
+        detail = " ".join(f"{k}={v}" for k, v in event.data.items() if k != "text")
+        self.logger.log(
+            self.level, "[%s] %s %s %s", event.run_id, event.type, event.agent or "-", detail
+        )
+
+
+class JsonlSink:
+    """Subscriber that appends events to a JSON-lines file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, event: Event):
+        self._file.write(event.to_json() + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class EventStream:
+    """Iterate over a bus's events as server-sent-events text.
+
+    Ends after ``run.finished`` of ``run_id``, so a serve endpoint can
+    stream one research run. Without ``run_id`` a fresh one is made; start
+    the run with it:
+
+        stream = EventStream(swarm.events)
+        threading.Thread(
+            target=swarm.research, args=(query,), kwargs={"run_id": stream.run_id}
+        ).start()
+        return StreamingResponse(stream, media_type="text/event-stream")
+    """
+
+    def __init__(
+        self,
+        bus: EventBus,
+        run_id: Optional[str] = None,
+        types: Optional[Iterable[str]] = None,
+        heartbeat: float = 15.0,
+    ):
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.heartbeat = heartbeat
+        self._types = frozenset(types) if types is not None else None
+        self._queue: queue.Queue = queue.Queue()
+        self._subscription = bus.subscribe(self._queue.put_nowait)
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            while True:
+                try:
+                    event = self._queue.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    # SSE comment line keeps proxies from closing the stream
+                    yield ": keep-alive\n\n"
+                    continue
+                if event.run_id != self.run_id:
+                    continue
+                if self._types is None or event.type in self._types:
+                    yield event.to_sse()
+                if event.type == RUN_FINISHED:
+                    return
+        finally:
+            self.close()
+
+    def close(self):
+        self._subscription.close()
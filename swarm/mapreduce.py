@@ -0,0 +1,206 @@
+"""Map-reduce summarization for material larger than one prompt.
+
+Sections (one per agent output or source) are split into chunks on paragraph
+boundaries, each chunk is condensed in parallel (map), and the condensed
+pieces are merged level by level (reduce) until the result fits the budget.
+Chunking is per section and every map/reduce result is cached by content
+hash, so adding one source only recomputes the chunks that changed.
+"""
+
+import concurrent.futures
+import contextvars
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+
+MAP_PROMPT = """You condense one excerpt of a larger body of research material.
+Keep every fact, figure, date, name and citation marker ([1], URLs) that is
+relevant to the research task. Drop repetition and filler. Do not add facts.
+Reply with the condensed excerpt only."""
+
+REDUCE_PROMPT = """You merge condensed research notes into one set of notes.
+Keep every fact, figure, date, name and citation marker ([1], URLs) that is
+relevant to the research task, merging duplicates. Do not add facts.
+Reply with the merged notes only."""
+
+
+class ChunkCache:
+    """LRU cache of map/reduce outputs, optionally persisted to a directory."""
+
+    def __init__(self, max_entries: int = 2048, directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        if self.directory and os.path.exists(self._path(key)):
+            with open(self._path(key)) as f:
+                value = json.load(f)["value"]
+            self.put(key, value, persist=False)
+            with self._lock:
+                self.hits += 1
+            return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value: str, persist: bool = True):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        if persist and self.directory:
+            with open(self._path(key), "w") as f:
+                json.dump({"value": value}, f)
+
+
+def split_text(text: str, chunk_chars: int) -> list[str]:
+    """Split on paragraph (then line, then hard) boundaries into <= chunk_chars."""
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+    for paragraph in text.split("\n\n"):
+        pieces = [paragraph]
+        if len(paragraph) > chunk_chars:
+            pieces = [paragraph[i:i + chunk_chars] for i in range(0, len(paragraph), chunk_chars)]
+        for piece in pieces:
+            if current and size + len(piece) + 2 > chunk_chars:
+                chunks.append("\n\n".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece) + 2
+    if current:
+        chunks.append("\n\n".join(current))
+    return [c for c in chunks if c.strip()]
+
+
+class MapReduceSummarizer:
+    """Condenses sections that exceed a character budget.
+
+    ``complete`` is the agent's ``(system_prompt, user_prompt) -> str`` LLM
+    call; ``key_prefix`` (e.g. agent and model) namespaces cache entries.
+    """
+
+    def __init__(
+        self,
+        complete: Callable[[str, str], str],
+        cache: Optional[ChunkCache] = None,
+        chunk_chars: int = 6000,
+        max_workers: int = 4,
+        key_prefix: str = "",
+        instructions: str = "",
+    ):
+        self.complete = complete
+        self.cache = cache if cache is not None else ChunkCache()
+        self.chunk_chars = chunk_chars
+        self.max_workers = max_workers
+        self.key_prefix = key_prefix
+        self.instructions = instructions
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def summarize(self, task: str, sections: list[tuple[str, str]], budget_chars: int) -> str:
+        """Reduce labelled sections to at most ``budget_chars`` characters."""
+        notes = [note for _, note in self._map(task, sections)]
+        return self._reduce(task, notes, budget_chars)
+
+    def summarize_each(self, task: str, sections: list[tuple[str, str, int]]) -> list[str]:
+        """Reduce each ``(label, text, budget_chars)`` section to its own budget.
+
+        The chunks of all sections are mapped in one parallel pass, then the
+        sections are reduced side by side.
+        """
+        notes: list[list[str]] = [[] for _ in sections]
+        mapped = self._map(task, [(label, text) for label, text, _ in sections])
+        for i, note in mapped:
+            notes[i].append(note)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(sections))) as executor:
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run, self._reduce, task, section_notes, budget
+                )
+                for section_notes, (_, _, budget) in zip(notes, sections)
+            ]
+            return [f.result() for f in futures]
+
+    def _map(self, task: str, sections: list[tuple[str, str]]) -> list[tuple[int, str]]:
+        """Condense every chunk of every section; (section index, note) pairs."""
+        pieces = [
+            (i, label, chunk)
+            for i, (label, text) in enumerate(sections)
+            for chunk in split_text(text, self.chunk_chars)
+        ]
+        notes = self._parallel(
+            MAP_PROMPT,
+            task,
+            [f"Section: {label}\n\n{chunk}" if label else chunk for _, label, chunk in pieces],
+        )
+        return [(i, note) for (i, _, _), note in zip(pieces, notes)]
+
+    def _reduce(self, task: str, notes: list[str], budget_chars: int) -> str:
+        # Merge neighbouring notes until everything fits one budget
+        while len("\n\n".join(notes)) > budget_chars and len(notes) > 1:
+            groups = self._group(notes)
+            if len(groups) == len(notes):
+                # Nothing could be combined; each note is already chunk-sized
+                break
+            notes = self._parallel(REDUCE_PROMPT, task, ["\n\n---\n\n".join(g) for g in groups])
+        merged = "\n\n".join(notes)
+        if len(merged) > budget_chars:
+            merged = self._parallel(REDUCE_PROMPT, task, [merged[:self.chunk_chars]])[0]
+        return merged[:budget_chars]
+
+    def _group(self, notes: list[str]) -> list[list[str]]:
+        groups: list[list[str]] = []
+        size = 0
+        for note in notes:
+            if groups and size + len(note) <= self.chunk_chars:
+                groups[-1].append(note)
+                size += len(note)
+            else:
+                groups.append([note])
+                size = len(note)
+        return groups
+
+    def _parallel(self, system_prompt: str, task: str, inputs: list[str]) -> list[str]:
+        if self.instructions:
+            system_prompt = f"{system_prompt}\n\n{self.instructions}"
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run, self._one, system_prompt, task, text
+                )
+                for text in inputs
+            ]
+            return [f.result() for f in futures]
+
+    def _one(self, system_prompt: str, task: str, text: str) -> str:
+        key = hashlib.sha256(
+            json.dumps([self.key_prefix, system_prompt, task, text]).encode()
+        ).hexdigest()[:32]
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        with self._lock:
+            self.calls += 1
+        result = self.complete(system_prompt, f"Research task: {task}\n\nMaterial:\n{text}")
+        self.cache.put(key, result)
+        return result
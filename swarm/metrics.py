@@ -0,0 +1,347 @@
+"""Aggregate metrics for long-running deployments.
+
+A ``MetricsRegistry`` holds counters, gauges and histograms, optionally
+split by labels, and renders them in the Prometheus text exposition format.
+Recording is thread-safe and cheap: a dict lookup for the labelled series
+and one uncontended lock per update, so it can sit on the hot path.
+
+Histograms are HDR-style: values land in log-linear buckets (a fixed number
+of sub-buckets per power of two), so quantiles such as p95 are accurate to
+about 1% over any range without configuring bucket bounds up front.
+
+    registry = swarm.metrics
+    registry.render()                 # Prometheus text
+    registry.dump("swarm.prom")       # node_exporter textfile collector
+    serve_metrics(registry, 9108)     # GET /metrics
+"""
+
+import math
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+# Default Prometheus ``le`` bounds for exported histograms (seconds)
+DEFAULT_BOUNDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class _Value:
+    """One counter or gauge series."""
+
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class HdrHistogram:
+    """Log-linear bucketed histogram with bounded relative error.
+
+    ``sub_buckets`` per power of two bound the relative error of a
+    quantile at ``1 / sub_buckets`` (64 -> ~1.6%, halved at the midpoint).
+    Only buckets that received values are stored.
+    """
+
+    __slots__ = ("_lock", "sub_buckets", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, sub_buckets: int = 64):
+        self._lock = threading.Lock()
+        self.sub_buckets = sub_buckets
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _index(self, value: float) -> int:
+        if value <= 0:
+            return -(1 << 30)
+        mantissa, exponent = math.frexp(value)
+        return exponent * self.sub_buckets + int((mantissa - 0.5) * 2 * self.sub_buckets)
+
+    def _midpoint(self, index: int) -> float:
+        if index == -(1 << 30):
+            return 0.0
+        exponent, sub = divmod(index, self.sub_buckets)
+        return math.ldexp(0.5 + (sub + 0.5) / (2 * self.sub_buckets), exponent)
+
+    def observe(self, value: float):
+        index = self._index(value)
+        with self._lock:
+            self.counts[index] = self.counts.get(index, 0) + 1
+            self.count += 1
+            self.sum += value
+            if value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Value at quantile ``q`` (0-1); 0 when empty."""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = q * self.count
+            seen = 0
+            for index in sorted(self.counts):
+                seen += self.counts[index]
+                if seen >= rank:
+                    return min(max(self._midpoint(index), self.min), self.max)
+            return self.max
+
+    def cumulative(self, bounds: tuple) -> list[int]:
+        """Counts at or below each bound, for Prometheus ``le`` buckets."""
+        with self._lock:
+            items = sorted(self.counts.items())
+        result = []
+        seen = 0
+        position = 0
+        for bound in bounds:
+            while position < len(items) and self._midpoint(items[position][0]) <= bound:
+                seen += items[position][1]
+                position += 1
+            result.append(seen)
+        return result
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "p50": round(self.quantile(0.5), 6),
+            "p95": round(self.quantile(0.95), 6),
+            "p99": round(self.quantile(0.99), 6),
+            "max": round(self.max, 6) if self.count else 0.0,
+        }
+
+
+class Metric:
+    """A named metric with zero or more labels; each label set is a series."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series: dict[tuple, object] = {}
+
+    def _new(self):
+        return _Value()
+
+    def labels(self, *values, **labels):
+        """The series for a label set, created on first use."""
+        # Fast path: positional string labels are already the key
+        series = self._series.get(values)
+        if series is not None:
+            return series
+        key = tuple(str(labels[n]) for n in self.labelnames) if labels else tuple(map(str, values))
+        series = self._series.get(key)
+        if series is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                series = self._series.setdefault(key, self._new())
+        return series
+
+    def items(self) -> list[tuple[dict, object]]:
+        with self._lock:
+            series = list(self._series.items())
+        return [(dict(zip(self.labelnames, key)), value) for key, value in sorted(series)]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        self.labels(**labels).inc(amount)
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels):
+        self.labels(**labels).inc(amount)
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.labels(**labels).dec(amount)
+
+    def set(self, value: float, **labels):
+        self.labels(**labels).set(value)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (),
+                 bounds: tuple = DEFAULT_BOUNDS, sub_buckets: int = 64):
+        super().__init__(name, documentation, labelnames)
+        self.bounds = tuple(bounds)
+        self.sub_buckets = sub_buckets
+
+    def _new(self):
+        return HdrHistogram(self.sub_buckets)
+
+    def observe(self, value: float, **labels):
+        self.labels(**labels).observe(value)
+
+
+class MetricsRegistry:
+    """Thread-safe collection of metrics, exported as Prometheus text."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: dict[str, Metric] = {}
+        self.created = time.time()
+
+    def _get(self, cls, name: str, documentation: str, labelnames: tuple, **kwargs) -> Metric:
+        metric = self._metrics.get(name)
+        if metric.__class__ is cls:
+            return metric
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = cls(name, documentation, labelnames, **kwargs)
+                    self._metrics[name] = metric
+        if not isinstance(metric, cls):
+            raise ValueError(f"Metric {name} is already registered as a {metric.type}")
+        return metric
+
+    def counter(self, name: str, documentation: str = "", labelnames: tuple = ()) -> Counter:
+        return self._get(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str = "", labelnames: tuple = ()) -> Gauge:
+        return self._get(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str = "", labelnames: tuple = (),
+                  bounds: tuple = DEFAULT_BOUNDS) -> Histogram:
+        return self._get(Histogram, name, documentation, labelnames, bounds=bounds)
+
+    def snapshot(self) -> dict:
+        """Current values as plain data (histograms as count/sum/quantiles)."""
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        snapshot = {}
+        for name, metric in metrics:
+            series = []
+            for labels, value in metric.items():
+                if isinstance(value, HdrHistogram):
+                    series.append({"labels": labels, **value.to_dict()})
+                else:
+                    series.append({"labels": labels, "value": value.value})
+            snapshot[name] = series
+        return snapshot
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        lines = []
+        for name, metric in metrics:
+            if metric.documentation:
+                lines.append(f"# HELP {name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            for labels, value in metric.items():
+                if isinstance(value, HdrHistogram):
+                    for bound, count in zip(metric.bounds, value.cumulative(metric.bounds)):
+                        lines.append(f"{name}_bucket{_labels(labels, le=_number(bound))} {count}")
+                    lines.append(f"{name}_bucket{_labels(labels, le='+Inf')} {value.count}")
+                    lines.append(f"{name}_sum{_labels(labels)} {_number(value.sum)}")
+                    lines.append(f"{name}_count{_labels(labels)} {value.count}")
+                else:
+                    lines.append(f"{name}{_labels(labels)} {_number(value.value)}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str):
+        """Write ``render()`` to ``path`` atomically (textfile collector)."""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _labels(labels: dict, **extra) -> str:
+    pairs = {**labels, **extra}
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs.items()) + "}"
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def serve_metrics(registry: MetricsRegistry, port: int = 9108, host: str = "127.0.0.1"):
+    """Serve ``GET /metrics`` from a daemon thread; returns the server."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="swarm-metrics", daemon=True).start()
+    return server
+
+
+def observe_llm(registry: Optional[MetricsRegistry], agent: str, model: str,
+                seconds: float, usage) -> None:
+    """Record one LLM call: count, latency and tokens by kind."""
+    if registry is None:
+        return
+    registry.counter(
+        "swarm_llm_calls_total", "LLM calls", ("agent", "model")
+    ).labels(agent, model).inc()
+    registry.histogram(
+        "swarm_llm_duration_seconds", "LLM call latency", ("model",)
+    ).labels(model).observe(seconds)
+    if usage is None:
+        return
+    tokens = registry.counter(
+        "swarm_llm_tokens_total", "LLM tokens by kind (prompt, completion, cached)",
+        ("agent", "model", "kind"),
+    )
+    tokens.labels(agent, model, "prompt").inc(getattr(usage, "prompt_tokens", 0) or 0)
+    tokens.labels(agent, model, "completion").inc(getattr(usage, "completion_tokens", 0) or 0)
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) or 0
+    if cached:
+        tokens.labels(agent, model, "cached").inc(cached)
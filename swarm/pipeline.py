@@ -0,0 +1,226 @@
+"""Streaming, bounded-memory pipeline from search results to prompt text.
+
+Results flow through generators: dedupe -> chunk -> score -> select. Only the
+selection keeps anything around, and it holds at most as many chunks as fit
+the prompt budget, so peak memory follows the budget rather than the number
+of results retrieved.
+
+With a ``Reranker`` (see ``swarm.rerank``) the selection keeps a pool a few
+times the budget instead, and the pool is reranked in one batch and thinned
+for diversity before rendering.
+"""
+
+import hashlib
+import heapq
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+
+if TYPE_CHECKING:
+    from .rerank import Reranker
+
+
+STOPWORDS = {
+    "the", "and", "for", "are", "but", "not", "you", "all", "any", "can",
+    "her", "was", "one", "our", "out", "has", "have", "had", "how", "its",
+    "what", "when", "where", "which", "who", "why", "with", "from", "this",
+    "that", "these", "those", "into", "about", "than", "then", "them",
+    "they", "their", "there", "been", "will", "would", "should", "could",
+    "does", "did", "also", "more", "most", "some", "such", "other",
+}
+
+_WORD = re.compile(r"[a-z0-9]{3,}")
+
+
+def terms(text: str) -> set[str]:
+    """Lowercase content words of a text."""
+    return {w for w in _WORD.findall(text.lower()) if w not in STOPWORDS}
+
+
+@dataclass
+class Chunk:
+    """A slice of one search result's content."""
+    url: str
+    title: str
+    text: str
+    provider_score: float
+    seq: int
+    score: float = 0.0
+
+
+@dataclass
+class PipelineStats:
+    """Counters gathered while results stream through."""
+    results: int = 0
+    duplicates: int = 0
+    chunks: int = 0
+    top_scores: Optional[list[float]] = None
+
+    def observe_score(self, score: float, keep: int = 3):
+        """Track the ``keep`` best provider scores in a tiny min-heap."""
+        if self.top_scores is None:
+            self.top_scores = []
+        if len(self.top_scores) < keep:
+            heapq.heappush(self.top_scores, score)
+        elif score > self.top_scores[0]:
+            heapq.heapreplace(self.top_scores, score)
+
+    @property
+    def confidence(self) -> float:
+        """Mean of the top three calibrated provider scores (0 with fewer than three)."""
+        scores = self.top_scores or []
+        if len(scores) < 3:
+            return 0.0
+        return round(sum(scores) / len(scores), 3)
+
+
+class SeenFilter:
+    """Fixed-size Bloom filter for "have we seen this key" checks.
+
+    Memory stays at ``bits / 8`` bytes however many keys are added; with the
+    default 2**20 bits and 50k keys the false-positive rate is about 0.3%.
+    """
+
+    def __init__(self, bits: int = 1 << 20):
+        # bits must be a power of two so positions can be masked
+        self._mask = bits - 1
+        self._bits = bytearray(bits // 8)
+
+    def _positions(self, key: str) -> tuple[int, int, int]:
+        # Double hashing over one 128-bit digest; stable across processes
+        # (unlike hash()), so false positives are reproducible
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return h1 & self._mask, (h1 + h2) & self._mask, (h1 + 2 * h2) & self._mask
+
+    def add(self, key: str) -> bool:
+        """Add ``key``; return True if it was (probably) already present."""
+        present = True
+        for pos in self._positions(key):
+            byte, bit = pos >> 3, 1 << (pos & 7)
+            if not self._bits[byte] & bit:
+                present = False
+                self._bits[byte] |= bit
+        return present
+
+
+def dedupe_results(results: Iterable[dict], stats: PipelineStats) -> Iterator[dict]:
+    """Drop results whose URL (or, lacking one, content) was already seen."""
+    seen = SeenFilter()
+    for result in results:
+        stats.results += 1
+        key = (result.get("url") or "").rstrip("/").lower() or result.get("content", "")
+        if seen.add(key):
+            stats.duplicates += 1
+            continue
+        # Only real relevance scores say how well search answered the query
+        if result.get("calibrated", True):
+            stats.observe_score(float(result.get("score", 0) or 0))
+        yield result
+
+
+def chunk_results(results: Iterable[dict], chunk_chars: int,
+                  max_chunks_per_result: int = 4) -> Iterator[Chunk]:
+    """Split each result's content into chunks of at most ``chunk_chars``."""
+    seq = 0
+    for result in results:
+        content = result.get("content") or ""
+        url = result.get("url", "")
+        title = result.get("title", "") or "Untitled"
+        provider_score = float(result.get("score", 0) or 0)
+        for start in range(0, max(len(content), 1), chunk_chars):
+            if start // chunk_chars >= max_chunks_per_result:
+                break
+            yield Chunk(url, title, content[start:start + chunk_chars], provider_score, seq)
+            seq += 1
+
+
+def score_chunks(chunks: Iterable[Chunk], task: str, stats: PipelineStats) -> Iterator[Chunk]:
+    """Score chunks by task-term overlap blended with the provider's score."""
+    task_terms = sorted(terms(task))
+    for chunk in chunks:
+        stats.chunks += 1
+        # Substring tests are much cheaper than tokenizing every chunk
+        text = chunk.text.lower()
+        hits = sum(1 for term in task_terms if term in text)
+        overlap = hits / len(task_terms) if task_terms else 0.0
+        chunk.score = 0.6 * overlap + 0.4 * chunk.provider_score
+        yield chunk
+
+
+def select_top(chunks: Iterable[Chunk], budget_chars: int, chunk_chars: int) -> list[Chunk]:
+    """Keep the best chunks that fit ``budget_chars``, in a bounded heap.
+
+    Ties favour earlier chunks, so ordering is deterministic.
+    """
+    capacity = max(1, budget_chars // max(chunk_chars, 1))
+    heap: list[tuple[float, int, Chunk]] = []
+    for chunk in chunks:
+        item = (chunk.score, -chunk.seq, chunk)
+        if len(heap) < capacity:
+            heapq.heappush(heap, item)
+        elif item[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, item)
+    return [chunk for _, _, chunk in sorted(heap, key=lambda x: (-x[0], -x[1]))]
+
+
+def rerank_chunks(chunks: list[Chunk], task: str, reranker: "Reranker", k: int) -> list[Chunk]:
+    """Pick ``k`` chunks from a candidate pool by batch relevance and MMR."""
+    picks = reranker.rerank(
+        task, [c.text for c in chunks], k, [c.provider_score for c in chunks]
+    )
+    selected = []
+    for index, relevance in picks:
+        chunk = chunks[index]
+        chunk.score = relevance
+        selected.append(chunk)
+    return selected
+
+
+def render_chunks(chunks: list[Chunk]) -> tuple[str, list[str]]:
+    """Format selected chunks grouped by source, numbered for citation.
+
+    Returns the text (built with a single join) and the cited URLs in
+    citation order.
+    """
+    groups: dict[str, list[Chunk]] = {}
+    for chunk in chunks:
+        groups.setdefault(chunk.url or chunk.title, []).append(chunk)
+
+    parts = []
+    urls = []
+    for i, group in enumerate(groups.values(), 1):
+        first = group[0]
+        if first.url:
+            urls.append(first.url)
+        parts.append(f"\n[{i}] {first.title}\n")
+        parts.append(f"    URL: {first.url or 'N/A'}\n")
+        # Chunks of one source in their original order
+        text = " … ".join(c.text for c in sorted(group, key=lambda c: c.seq))
+        parts.append(f"    Content: {text}\n")
+    return "".join(parts), urls
+
+
+def build_context(
+    results: Iterable[dict],
+    task: str,
+    budget_chars: int,
+    chunk_chars: int = 500,
+    stats: Optional[PipelineStats] = None,
+    reranker: Optional["Reranker"] = None,
+    pool_factor: int = 6,
+) -> tuple[str, list[str], list[Chunk]]:
+    """Run the full pipeline: returns (prompt text, cited URLs, selected chunks).
+    
+    With ``reranker``, ``pool_factor`` times the budget is kept as candidates
+    for reranking.
+    """
+    stats = stats if stats is not None else PipelineStats()
+    scored = score_chunks(chunk_results(dedupe_results(results, stats), chunk_chars), task, stats)
+    if reranker is None:
+        selected = select_top(scored, budget_chars, chunk_chars)
+    else:
+        pool = select_top(scored, budget_chars * pool_factor, chunk_chars)
+        selected = rerank_chunks(pool, task, reranker, max(1, budget_chars // max(chunk_chars, 1)))
+    text, urls = render_chunks(selected)
+    return text, urls, selected
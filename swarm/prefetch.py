@@ -0,0 +1,341 @@
+"""Speculative prefetching of likely follow-ups in a chat session.
+
+While the user reads an answer the swarm is idle. A ``Prefetcher`` uses that
+time: after each turn the coordinator predicts the likely next questions
+(one call on the fast model), and in the background their searches are
+warmed into the search agent's cache. In ``"full"`` mode the follow-up
+answers themselves are computed too. When the next message matches a
+prediction, its prefetched answer is returned at once, or its research runs
+against the warm cache. A new message cancels the round: no further step
+starts and no further LLM call of it is sent, so an answer being computed is
+cut short and discarded, unless it is the one the message matched. Calls
+and searches already sent finish in the background and count as waste.
+
+All speculative work shares one strict budget per turn: ``token_budget``
+LLM tokens and ``request_budget`` requests (LLM calls plus search provider
+requests). Work is only started when its estimate fits in what is left, and
+every LLM call of the round runs under a token ceiling: a call that would
+not fit is never sent, and an answer cut short by it is thrown away.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
+from .pipeline import terms
+from .scheduler import token_cost
+from .usage import TokenCeiling, TokenLimitReached, UsageTracker, reset_tracker, set_tracker, token_ceiling
+
+if TYPE_CHECKING:
+    from .coordinator import ResearchResult
+    from .session import ChatSession
+
+logger = logging.getLogger(__name__)
+
+MODES = ("search", "full")
+
+
+def _stems(text: str) -> set[str]:
+    # "agent" and "agents" should match
+    return {w[:-1] if len(w) > 3 and w.endswith("s") else w for w in terms(text)}
+
+
+@dataclass
+class Speculation:
+    """One predicted follow-up and the work done for it ahead of time."""
+    question: str
+    resolved: str = ""
+    kwargs: dict = field(default_factory=dict)
+    started: bool = False
+    answering: bool = False
+    result: Optional["ResearchResult"] = None
+    tokens: int = 0
+    requests: int = 0
+    cost: float = 0.0
+    used: bool = False
+    # Set when the search is warm / the answer is ready, or never will be
+    warmed: threading.Event = field(default_factory=threading.Event)
+    answered: threading.Event = field(default_factory=threading.Event)
+
+
+@dataclass
+class PrefetchRound:
+    """Predictions made after one turn, and the spend of making them."""
+    depth: str
+    # Every LLM call of the round goes through it; exhausted on cancel
+    ceiling: TokenCeiling
+    speculations: list[Speculation] = field(default_factory=list)
+    tokens: int = 0
+    requests: int = 0
+    cost: float = 0.0
+    cancelled: threading.Event = field(default_factory=threading.Event)
+    finished: threading.Event = field(default_factory=threading.Event)
+
+    @property
+    def hit(self) -> bool:
+        return any(s.used for s in self.speculations)
+
+
+class Prefetcher:
+    """Wraps a ``ChatSession`` and prefetches likely follow-ups between turns.
+
+    ``mode`` is ``"search"`` (warm the predicted follow-ups' searches) or
+    ``"full"`` (also compute their answers). ``followups`` is how many
+    questions to predict. A message matches a prediction when, ignoring the
+    conversation's topic words, they share at least ``match_threshold`` of
+    their content words (Jaccard).
+    """
+
+    def __init__(
+        self,
+        session: "ChatSession",
+        mode: str = "search",
+        followups: int = 3,
+        token_budget: int = 8000,
+        request_budget: int = 8,
+        match_threshold: float = 0.6,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+        self.session = session
+        self.swarm = session.swarm
+        self.mode = mode
+        self.followups = followups
+        self.token_budget = token_budget
+        self.request_budget = request_budget
+        self.match_threshold = match_threshold
+        self.rounds: list[PrefetchRound] = []
+        self.lookups = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+        self._current: Optional[PrefetchRound] = None
+
+    def ask(self, query: str, depth: str = "quick", fresh: bool = False, **research_kwargs) -> "ResearchResult":
+        """Answer a message like ``ChatSession.ask``, using prefetched work.
+
+        The result's ``metadata["prefetch"]`` tells whether it was a hit and
+        which prediction it matched. Afterwards, prefetching for the next
+        turn starts in the background.
+        """
+        start = time.perf_counter()
+        speculation = self._take(query, depth, fresh)
+        if speculation is None:
+            result = self.session.ask(query, depth=depth, fresh=fresh, **research_kwargs)
+        else:
+            speculation.warmed.wait()
+            if speculation.answering:
+                speculation.answered.wait()
+            result = speculation.result
+            if result is None:
+                # Only the search was warmed: research the predicted wording,
+                # which is what the cache holds
+                result = self.swarm.research(
+                    speculation.resolved, depth=depth, **speculation.kwargs, **research_kwargs
+                )
+            result = self.session.record(
+                query, speculation.resolved, depth, True, result, time.perf_counter() - start
+            )
+        result.metadata["prefetch"] = {
+            "hit": speculation is not None,
+            "question": speculation.question if speculation else None,
+            "answer_ready": speculation is not None and speculation.result is not None,
+        }
+        self.start(query, result.summary, depth)
+        return result
+
+    def start(self, query: str, summary: str, depth: str):
+        """Predict follow-ups to ``query`` and prefetch them in the background."""
+        self.cancel()
+        round_ = PrefetchRound(depth=depth, ceiling=TokenCeiling(self.token_budget))
+        with self._lock:
+            self.rounds.append(round_)
+            self._current = round_
+        threading.Thread(
+            target=self._run, args=(round_, query, summary), name="swarm-prefetch", daemon=True
+        ).start()
+
+    def cancel(self):
+        """Stop prefetching: no further step starts and no further LLM call is sent.
+
+        Calls already sent finish in the background.
+        """
+        current = self._stop()
+        if current is not None:
+            current.ceiling.exhaust()
+
+    def _stop(self) -> Optional[PrefetchRound]:
+        """Stop the current round from starting steps; returns it."""
+        with self._lock:
+            current, self._current = self._current, None
+            if current is not None:
+                current.cancelled.set()
+        return current
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the current round's prefetching to finish."""
+        current = self._current
+        return current is None or current.finished.wait(timeout)
+
+    def _take(self, query: str, depth: str, fresh: bool) -> Optional[Speculation]:
+        """The started speculation matching ``query``; cancels the rest."""
+        current = self._stop()
+        if current is None:
+            return None
+        match = None
+        if not fresh and depth == current.depth:
+            topic = _stems(self.session.topic or "")
+            words = _stems(query) - topic
+            best = self.match_threshold
+            for speculation in current.speculations:
+                if not speculation.started:
+                    continue
+                predicted = _stems(speculation.question) - topic
+                union = words | predicted
+                score = len(words & predicted) / len(union) if union else 0.0
+                if score >= best:
+                    match, best = speculation, score
+        if match is None or not match.answering:
+            # An answer in flight is only worth finishing if it is the match
+            current.ceiling.exhaust()
+        with self._lock:
+            self.lookups += 1
+            if match is not None:
+                match.used = True
+                self.hits += 1
+        outcome = "hit" if match is not None else "miss"
+        self.swarm.metrics.counter(
+            "swarm_prefetch_lookups_total", "Chat messages checked against prefetched follow-ups", ("result",)
+        ).labels(outcome).inc()
+        return match
+
+    def _run(self, round_: PrefetchRound, query: str, summary: str):
+        tracker = UsageTracker()
+        token = set_tracker(tracker)
+        try:
+            with token_ceiling(round_.ceiling):
+                self._prefetch(round_, query, summary, tracker)
+        except TokenLimitReached:
+            pass
+        except Exception:
+            logger.warning("Prefetching after %r failed", query[:80], exc_info=True)
+        finally:
+            reset_tracker(token)
+            for speculation in round_.speculations:
+                speculation.warmed.set()
+                speculation.answered.set()
+            round_.finished.set()
+
+    def _prefetch(self, round_: PrefetchRound, query: str, summary: str, tracker: UsageTracker):
+        if not self._fits(round_, tokens=500, requests=1):
+            return
+        questions = self.swarm.predict_followups(query, summary, self.followups)
+        round_.tokens += tracker.total.prompt_tokens + tracker.total.completion_tokens
+        round_.requests += tracker.total.calls
+        round_.cost += sum(
+            token_cost(model, t.prompt_tokens, t.completion_tokens, t.cached_tokens)
+            for model, t in tracker.by_model.items()
+        )
+        self._spend(tracker.total.prompt_tokens + tracker.total.completion_tokens)
+
+        for question in questions:
+            followup, resolved, kwargs = self.session.plan(question, followup=True)
+            if followup:
+                round_.speculations.append(Speculation(question, resolved, kwargs))
+
+        # Searches first: cheap, and what every follow-up waits on
+        search = self.swarm.agents["search"]
+        for speculation in round_.speculations:
+            if not self._claim(round_, speculation, "started", tokens=0, requests=1):
+                break
+            if speculation.kwargs.get("agents"):
+                provider = search.warm(speculation.resolved)
+                speculation.requests += provider != "cache"
+                round_.requests += provider != "cache"
+            speculation.warmed.set()
+
+        if self.mode != "full":
+            return
+        for speculation in round_.speculations:
+            if not speculation.started:
+                break
+            if not self._claim(round_, speculation, "answering", self._estimate(), requests=2):
+                break
+            result = self.swarm.research(speculation.resolved, depth=round_.depth, **speculation.kwargs)
+            usage = result.metadata["usage"]
+            if not round_.ceiling.reached:
+                speculation.result = result
+            speculation.tokens = usage["total"]["prompt_tokens"] + usage["total"]["completion_tokens"]
+            speculation.requests += usage["total"]["calls"]
+            speculation.cost = sum(
+                token_cost(model, t["prompt_tokens"], t["completion_tokens"], t["cached_tokens"])
+                for model, t in usage["by_model"].items()
+            )
+            round_.tokens += speculation.tokens
+            round_.requests += usage["total"]["calls"]
+            round_.cost += speculation.cost
+            self._spend(speculation.tokens)
+            speculation.answered.set()
+            if round_.ceiling.reached:
+                # Some call of this answer did not fit or the round was cancelled
+                break
+
+    def _claim(self, round_: PrefetchRound, speculation: Speculation, step: str,
+               tokens: int, requests: int) -> bool:
+        """Mark a step as started unless the round is cancelled or over budget.
+
+        Checked under the lock ``cancel`` holds, so once a new message has
+        cancelled the round no further step starts.
+        """
+        with self._lock:
+            if round_.cancelled.is_set() or not self._fits(round_, tokens, requests):
+                return False
+            setattr(speculation, step, True)
+            return True
+
+    def _fits(self, round_: PrefetchRound, tokens: int, requests: int) -> bool:
+        return (round_.tokens + tokens <= self.token_budget
+                and round_.requests + requests <= self.request_budget)
+
+    def _estimate(self) -> int:
+        """Expected tokens of a follow-up answer, from the session's follow-ups."""
+        spent = [t["tokens"] for t in self.session.stats.history if t["followup"]]
+        return int(sum(spent) / len(spent)) if spent else 3000
+
+    def _spend(self, tokens: int):
+        self.swarm.metrics.counter(
+            "swarm_prefetch_tokens_total", "LLM tokens spent on speculative prefetching"
+        ).labels().inc(tokens)
+
+    def stats(self) -> dict:
+        """Hit rate and spend; rounds without a hit waste their prediction too."""
+        with self._lock:
+            rounds = list(self.rounds)
+            current = self._current
+        spent = {"tokens": 0, "requests": 0, "cost": 0.0}
+        wasted = {"tokens": 0, "requests": 0, "cost": 0.0}
+        for round_ in rounds:
+            spent["tokens"] += round_.tokens
+            spent["requests"] += round_.requests
+            spent["cost"] += round_.cost
+            if round_ is current:
+                continue  # still waiting for the next message
+            if round_.hit:
+                waste = [(s.tokens, s.requests, s.cost) for s in round_.speculations if not s.used]
+            else:
+                waste = [(round_.tokens, round_.requests, round_.cost)]
+            wasted["tokens"] += sum(w[0] for w in waste)
+            wasted["requests"] += sum(w[1] for w in waste)
+            wasted["cost"] += sum(w[2] for w in waste)
+        for totals in (spent, wasted):
+            totals["cost"] = round(totals["cost"], 6)
+        return {
+            "mode": self.mode,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+            "predicted": sum(len(r.speculations) for r in rounds),
+            "spent": spent,
+            "wasted": wasted,
+        }
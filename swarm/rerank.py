@@ -0,0 +1,186 @@
+"""Vectorized relevance reranking with a diversity constraint.
+
+Candidates (search result chunks) are scored against the task in one batch
+by two local models:
+
+* lexical: BM25 over the task's terms, with IDF taken from the batch itself;
+* embedding: cosine similarity of hashed bag-of-words vectors (unigrams and
+  bigrams folded into ``dim`` buckets, so no vocabulary or model download).
+
+Both are NumPy matrix operations over the whole batch. The final pick is
+greedy maximal marginal relevance (MMR), which trades relevance against
+similarity to what is already picked, so five near-copies of one page do
+not crowd out a different source.
+
+NumPy is an optional dependency (``pip install research-swarm[rerank]``);
+``available()`` tells whether reranking can run.
+"""
+
+import importlib.util
+import re
+import zlib
+from itertools import chain
+from typing import Optional, Sequence
+
+from .pipeline import STOPWORDS
+
+_TOKEN = re.compile(r"[a-z0-9]{2,}")
+
+
+def available() -> bool:
+    """Whether NumPy is installed."""
+    return importlib.util.find_spec("numpy") is not None
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens, stopwords included (they are masked per vocabulary)."""
+    return _TOKEN.findall(text.lower())
+
+
+class Reranker:
+    """Scores and selects candidates; see the module docstring.
+
+    ``lexical_weight``, ``embedding_weight`` and ``provider_weight`` blend the
+    normalized BM25 score, the embedding similarity and the search provider's
+    own score. ``diversity`` is MMR's trade-off: 0 ranks by relevance alone,
+    higher values penalize redundancy more.
+    """
+
+    def __init__(
+        self,
+        dim: int = 1024,
+        lexical_weight: float = 0.45,
+        embedding_weight: float = 0.35,
+        provider_weight: float = 0.2,
+        diversity: float = 0.3,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self.dim = dim
+        self.lexical_weight = lexical_weight
+        self.embedding_weight = embedding_weight
+        self.provider_weight = provider_weight
+        self.diversity = diversity
+        self.k1 = k1
+        self.b = b
+        # Token -> hashed column; stable across processes (unlike hash())
+        self._columns: dict[str, int] = {}
+
+    def _column(self, token: str) -> int:
+        column = self._columns.get(token)
+        if column is None:
+            column = zlib.crc32(token.encode()) % self.dim
+            if len(self._columns) < 200_000:
+                self._columns[token] = column
+        return column
+
+    def _encode(self, token_lists: Sequence[list[str]]):
+        """Flatten texts to (token ids, row of each token, lengths, vocabulary).
+
+        Stopwords are dropped here, once per distinct word rather than per
+        occurrence.
+        """
+        import numpy as np
+
+        vocab: dict[str, int] = {}
+        flat = list(chain.from_iterable(token_lists))
+        ids = np.array([vocab.setdefault(t, len(vocab)) for t in flat], dtype=np.intp)
+        rows = np.repeat(
+            np.arange(len(token_lists)), [len(tokens) for tokens in token_lists]
+        )
+        stop = np.array([t in STOPWORDS for t in vocab], dtype=bool)
+        if stop.any():
+            keep = ~stop[ids]
+            ids, rows = ids[keep], rows[keep]
+        lengths = np.bincount(rows, minlength=len(token_lists))
+        return ids, rows, lengths, vocab
+
+    def _embed_encoded(self, ids, rows, vocab: dict[str, int], n: int):
+        import numpy as np
+
+        columns = np.fromiter((self._column(t) for t in vocab), dtype=np.intp, count=len(vocab))[ids]
+        # Bigrams hash the pair of unigram columns, within one text only
+        same_row = rows[1:] == rows[:-1]
+        bigrams = (columns[:-1] * 1_000_003 + columns[1:] * 7 + 1)[same_row] % self.dim
+        flat = np.concatenate([rows * self.dim + columns, rows[1:][same_row] * self.dim + bigrams])
+        matrix = np.bincount(flat, minlength=n * self.dim).reshape(n, self.dim).astype(np.float32)
+        # Sublinear term frequency, then unit length
+        np.log1p(matrix, out=matrix)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-9)
+
+    def embed(self, token_lists: Sequence[list[str]]):
+        """L2-normalized hashed unigram+bigram vectors, one row per text."""
+        ids, rows, _, vocab = self._encode(token_lists)
+        return self._embed_encoded(ids, rows, vocab, len(token_lists))
+
+    def scores(self, task: str, texts: Sequence[str], provider_scores: Optional[Sequence[float]] = None):
+        """Relevance of every text to ``task`` (0-1), plus the text embeddings."""
+        import numpy as np
+
+        docs = [tokenize(t) for t in texts]
+        query = [t for t in dict.fromkeys(tokenize(task)) if t not in STOPWORDS]
+        n = len(docs)
+        ids, rows, lengths, vocab = self._encode(docs)
+
+        # BM25 from a (docs x query terms) count matrix and batch-level IDF
+        q = max(len(query), 1)
+        query_of = np.full(len(vocab) + 1, -1, dtype=np.intp)
+        for j, term in enumerate(query):
+            if term in vocab:
+                query_of[vocab[term]] = j
+        term = query_of[ids]
+        hit = term >= 0
+        counts = np.bincount(rows[hit] * q + term[hit], minlength=n * q).reshape(n, q).astype(np.float32)
+        df = (counts > 0).sum(axis=0)
+        idf = np.log1p((n - df + 0.5) / (df + 0.5))
+        norm = self.k1 * (1 - self.b + self.b * lengths / max(lengths.mean(), 1.0))
+        bm25 = (counts * (self.k1 + 1) / (counts + norm[:, None])) @ idf
+        if bm25.max() > 0:
+            bm25 = bm25 / bm25.max()
+
+        vectors = self._embed_encoded(ids, rows, vocab, n)
+        task_vector = self.embed([tokenize(task)])[0]
+        cosine = vectors @ task_vector
+
+        provider = np.zeros(n, dtype=np.float32)
+        if provider_scores is not None:
+            provider = np.clip(np.asarray(provider_scores, dtype=np.float32), 0, 1)
+
+        relevance = (
+            self.lexical_weight * bm25
+            + self.embedding_weight * cosine
+            + self.provider_weight * provider
+        )
+        return relevance, vectors
+
+    def select(self, relevance, vectors, k: int) -> list[int]:
+        """Greedy MMR: indexes of ``k`` relevant, mutually diverse candidates."""
+        import numpy as np
+
+        n = len(relevance)
+        k = min(k, n)
+        if k <= 0:
+            return []
+        chosen = [int(np.argmax(relevance))]
+        # Highest similarity of each candidate to anything chosen so far; one
+        # matrix-vector product per pick instead of the full n x n matrix
+        redundancy = vectors @ vectors[chosen[0]]
+        available_mask = np.ones(n, dtype=bool)
+        available_mask[chosen[0]] = False
+        while len(chosen) < k:
+            mmr = (1 - self.diversity) * relevance - self.diversity * redundancy
+            mmr[~available_mask] = -np.inf
+            pick = int(np.argmax(mmr))
+            chosen.append(pick)
+            available_mask[pick] = False
+            np.maximum(redundancy, vectors @ vectors[pick], out=redundancy)
+        return chosen
+
+    def rerank(self, task: str, texts: Sequence[str], k: int,
+               provider_scores: Optional[Sequence[float]] = None) -> list[tuple[int, float]]:
+        """Top ``k`` (index, relevance) pairs under the diversity constraint."""
+        if not texts:
+            return []
+        relevance, vectors = self.scores(task, texts, provider_scores)
+        return [(i, float(relevance[i])) for i in self.select(relevance, vectors, k)]
@@ -0,0 +1,242 @@
+"""Health-aware routing across search providers.
+
+Every provider has a circuit breaker: after ``failure_threshold`` consecutive
+errors it opens and the provider is skipped, so queries fail over to the
+next one straight away instead of waiting out timeouts. After ``cooldown``
+seconds one probe request is let through (half-open); success closes the
+breaker, failure re-opens it. When the preferred provider is healthy but
+slow (latency EWMA above ``slow_threshold``), it is raced against the next
+provider and the first useful answer wins. Raced requests use the shorter
+``race_timeout``, so a losing provider gives its worker back soon after the
+winner answers.
+"""
+
+import concurrent.futures
+import contextvars
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+Provider = tuple[str, Callable[[str], list[dict]]]
+
+_race_timeout: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "race_timeout", default=None
+)
+
+
+def race_timeout() -> Optional[float]:
+    """Timeout for search requests sent by a race in this context, if any."""
+    return _race_timeout.get()
+
+
+class NoProviderAvailable(RuntimeError):
+    """Raised when every provider failed or is circuit-broken."""
+
+
+@dataclass
+class ProviderHealth:
+    """Rolling health of one provider and the state of its breaker."""
+    name: str
+    state: str = CLOSED
+    requests: int = 0
+    errors: int = 0
+    consecutive_failures: int = 0
+    latency_ewma: Optional[float] = None
+    opened_at: float = 0.0
+    probing: bool = False
+    last_error: Optional[str] = None
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 3),
+            "latency_ewma": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+            "last_error": self.last_error,
+        }
+
+
+class SearchRouter:
+    """Picks, fails over and races between search providers.
+
+    Races run on the router's own pool of ``race_workers`` threads; size it
+    to the searches that can be in flight at once (the transport's
+    connection limit).
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        slow_threshold: float = 4.0,
+        race: bool = True,
+        alpha: float = 0.3,
+        race_workers: int = 4,
+        race_timeout: float = 6.0,
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.slow_threshold = slow_threshold
+        self.race = race
+        self.alpha = alpha
+        # Two workers per race
+        self.race_workers = max(2, race_workers)
+        self.race_timeout = race_timeout
+        self._lock = threading.Lock()
+        self._health: dict[str, ProviderHealth] = {}
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+    def health(self, name: str) -> ProviderHealth:
+        with self._lock:
+            return self._health.setdefault(name, ProviderHealth(name))
+
+    def snapshot(self) -> dict:
+        """Breaker state and stats of every provider seen so far."""
+        with self._lock:
+            return {name: h.to_dict() for name, h in self._health.items()}
+
+    def search(self, query: str, providers: list[Provider]) -> tuple[list[dict], str]:
+        """Search with the first healthy provider; returns (results, provider).
+
+        An empty answer falls through to the next provider too; it is not
+        counted as a failure.
+        """
+        # Breakers are consulted right before each attempt: a half-open
+        # provider's probe claim is only released by recording an attempt
+        remaining = list(providers)
+        tried = False
+        empty_from = None
+        while remaining:
+            name, fn = remaining.pop(0)
+            if not self._allow(name):
+                continue
+            tried = True
+            health = self.health(name)
+            slow = health.latency_ewma is not None and health.latency_ewma > self.slow_threshold
+            partner = None
+            while self.race and slow and remaining and partner is None:
+                candidate = remaining.pop(0)
+                if self._allow(candidate[0]):
+                    partner = candidate
+            if partner is not None:
+                outcome = self._race(query, (name, fn), partner)
+            else:
+                outcome = self._attempt(query, name, fn)
+            if outcome is None:
+                continue
+            results, used = outcome
+            if results:
+                return results, used
+            empty_from = empty_from or used
+        if not tried:
+            raise NoProviderAvailable("All search providers are circuit-broken")
+        if empty_from:
+            return [], empty_from
+        raise NoProviderAvailable(f"All search providers failed for query: {query[:80]}")
+
+    def _allow(self, name: str) -> bool:
+        """Whether the breaker lets a request through (maybe as a probe)."""
+        with self._lock:
+            health = self._health.setdefault(name, ProviderHealth(name))
+            if health.state == CLOSED:
+                return True
+            if health.state == OPEN and time.monotonic() - health.opened_at >= self.cooldown:
+                health.state = HALF_OPEN
+            if health.state == HALF_OPEN and not health.probing:
+                health.probing = True
+                return True
+            return False
+
+    def _attempt(self, query: str, name: str, fn) -> Optional[tuple[list[dict], str]]:
+        start = time.monotonic()
+        try:
+            results = fn(query)
+        except Exception as e:
+            self._record(name, time.monotonic() - start, e)
+            return None
+        self._record(name, time.monotonic() - start, None)
+        return results, name
+
+    def _race(self, query: str, first: Provider, second: Provider) -> Optional[tuple[list[dict], str]]:
+        """Run two providers at once and keep the first non-empty answer.
+
+        A loser that has not been sent yet is dropped; one already sending
+        runs on, bounded by ``race_timeout``, so its health still gets
+        recorded.
+        """
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self.race_workers, thread_name_prefix="search-race"
+                    )
+        decided = threading.Event()
+        futures = [
+            self._executor.submit(
+                contextvars.copy_context().run, self._raced, query, name, fn, decided
+            )
+            for name, fn in (first, second)
+        ]
+        fallback = None
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                outcome = future.result()
+                if outcome is None:
+                    continue
+                if outcome[0]:
+                    return outcome
+                fallback = fallback or outcome
+            return fallback
+        finally:
+            decided.set()
+            for future, (name, _) in zip(futures, (first, second)):
+                if future.cancel():
+                    self._release_probe(name)
+
+    def _raced(self, query: str, name: str, fn,
+               decided: threading.Event) -> Optional[tuple[list[dict], str]]:
+        # Picked up after the race was won: don't send it
+        if decided.is_set():
+            self._release_probe(name)
+            return None
+        _race_timeout.set(self.race_timeout)
+        outcome = self._attempt(query, name, fn)
+        if outcome is not None and outcome[0]:
+            decided.set()
+        return outcome
+
+    def _release_probe(self, name: str):
+        """Give back a probe claim for a request that was never sent."""
+        with self._lock:
+            self._health[name].probing = False
+
+    def _record(self, name: str, seconds: float, error: Optional[Exception]):
+        with self._lock:
+            health = self._health.setdefault(name, ProviderHealth(name))
+            health.requests += 1
+            if health.latency_ewma is None:
+                health.latency_ewma = seconds
+            else:
+                health.latency_ewma += self.alpha * (seconds - health.latency_ewma)
+            was_probe = health.state == HALF_OPEN
+            health.probing = False
+            if error is None:
+                health.consecutive_failures = 0
+                health.state = CLOSED
+                return
+            health.errors += 1
+            health.consecutive_failures += 1
+            health.last_error = str(error)[:200]
+            if was_probe or health.consecutive_failures >= self.failure_threshold:
+                health.state = OPEN
+                health.opened_at = time.monotonic()
@@ -0,0 +1,284 @@
+"""Latency/cost-aware scheduling of research runs."""
+
+import itertools
+import json
+import threading
+from dataclasses import dataclass, field, asdict
+from typing import Optional
+
+
+# USD per 1M tokens: (input, cached input, output)
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+}
+
+# Relative latency of a model versus gpt-4o, used until it has been observed
+MODEL_SPEED = {
+    "gpt-4o-mini": 0.6,
+    "gpt-4.1-mini": 0.6,
+}
+
+# Prior (seconds, prompt tokens, completion tokens) per stage on gpt-4o,
+# replaced by observations as runs complete
+STAGE_PRIORS = {
+    "coordinator": (3.0, 250, 150),
+    "search": (10.0, 2500, 600),
+    "data": (8.0, 1200, 500),
+    "literature": (12.0, 600, 900),
+    "critic": (10.0, 1200, 700),
+    "synthesis": (20.0, 4000, 1500),
+}
+DEFAULT_PRIOR = (10.0, 1500, 700)
+
+# Search cost grows with the number of queries; observations are stored
+# normalized to three queries
+BREADTH_FACTOR = {1: 0.5, 2: 0.75, 3: 1.0}
+
+
+def context_factors(stage: str, context_scale: float) -> tuple[float, float]:
+    """(seconds, prompt tokens) factors of a stage run at ``context_scale``.
+
+    Every agent's prompt budgets scale with it (planning has none). Prompt
+    tokens follow the scale; latency only half does, since completions and
+    round trips do not shrink. Observations are stored normalized to 1.0.
+    """
+    if stage == "coordinator":
+        return 1.0, 1.0
+    return 0.5 + 0.5 * context_scale, context_scale
+
+
+def model_price(model: str) -> tuple[float, float, float]:
+    """Per-1M-token prices for a model (prefix match, gpt-4o as fallback)."""
+    for name in sorted(MODEL_PRICES, key=len, reverse=True):
+        if model.startswith(name):
+            return MODEL_PRICES[name]
+    return MODEL_PRICES["gpt-4o"]
+
+
+def token_cost(model: str, prompt_tokens: float, completion_tokens: float,
+               cached_tokens: float = 0) -> float:
+    """Cost in USD of a number of tokens on a model."""
+    price_in, price_cached, price_out = model_price(model)
+    uncached = max(0.0, prompt_tokens - cached_tokens)
+    return (uncached * price_in + cached_tokens * price_cached
+            + completion_tokens * price_out) / 1_000_000
+
+
+@dataclass
+class StageEstimate:
+    """Exponentially weighted running estimate for one stage on one model."""
+    seconds: float
+    prompt_tokens: float
+    completion_tokens: float
+    samples: int = 0
+
+    def update(self, seconds: float, prompt_tokens: float, completion_tokens: float,
+               alpha: float):
+        # The first observation replaces the prior outright
+        weight = 1.0 if self.samples == 0 else alpha
+        self.seconds += weight * (seconds - self.seconds)
+        self.prompt_tokens += weight * (prompt_tokens - self.prompt_tokens)
+        self.completion_tokens += weight * (completion_tokens - self.completion_tokens)
+        self.samples += 1
+
+
+@dataclass
+class SchedulePlan:
+    """Agent set, per-stage models and budgets chosen for one run."""
+    agents: list[str]
+    models: dict[str, str]
+    max_queries: int
+    context_scale: float
+    predicted_seconds: float
+    predicted_cost: float
+    fits_budget: bool
+    stage_seconds: dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["predicted_seconds"] = round(self.predicted_seconds, 2)
+        data["predicted_cost"] = round(self.predicted_cost, 5)
+        data["stage_seconds"] = {k: round(v, 2) for k, v in self.stage_seconds.items()}
+        return data
+
+
+class Scheduler:
+    """Chooses agents, models, search breadth and context budgets for a budget.
+
+    Keeps running latency and token estimates per (stage, model) from past
+    runs, enumerates the candidate configurations (there are at most a few
+    hundred) and picks the richest one predicted to fit both budgets. When
+    nothing fits, the configuration that overshoots least is used.
+    """
+
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self.estimates: dict[tuple[str, str], StageEstimate] = {}
+        self.runs = 0
+        self.latency_abs_error = 0.0
+        self.cost_abs_error = 0.0
+
+    def estimate(self, stage: str, model: str) -> StageEstimate:
+        """Current estimate for a stage on a model (falls back to priors)."""
+        with self._lock:
+            known = self.estimates.get((stage, model))
+            if known is not None:
+                return StageEstimate(**asdict(known))
+            # Borrow another model's observation for this stage, rescaled
+            speed = MODEL_SPEED.get(model, 1.0)
+            for (other_stage, other_model), other in self.estimates.items():
+                if other_stage == stage and other.samples:
+                    ratio = speed / MODEL_SPEED.get(other_model, 1.0)
+                    return StageEstimate(
+                        other.seconds * ratio, other.prompt_tokens, other.completion_tokens
+                    )
+        seconds, prompt_tokens, completion_tokens = STAGE_PRIORS.get(stage, DEFAULT_PRIOR)
+        return StageEstimate(seconds * speed, prompt_tokens, completion_tokens)
+
+    def observe(self, stage: str, model: str, seconds: float, prompt_tokens: int,
+                completion_tokens: int, max_queries: int = 3, context_scale: float = 1.0):
+        """Fold one completed stage into the running estimates."""
+        factor = BREADTH_FACTOR.get(max_queries, 1.0) if stage == "search" else 1.0
+        seconds_factor, prompt_factor = context_factors(stage, context_scale)
+        seconds /= factor * seconds_factor
+        prompt_tokens /= factor * prompt_factor
+        completion_tokens /= factor
+        with self._lock:
+            estimate = self.estimates.get((stage, model))
+            if estimate is None:
+                estimate = StageEstimate(seconds, prompt_tokens, completion_tokens)
+                self.estimates[(stage, model)] = estimate
+            estimate.update(seconds, prompt_tokens, completion_tokens, self.alpha)
+
+    def record_outcome(self, plan: SchedulePlan, seconds: float, cost: float) -> dict:
+        """Compare a run against its plan and keep mean absolute errors."""
+        with self._lock:
+            self.runs += 1
+            self.latency_abs_error += abs(seconds - plan.predicted_seconds)
+            self.cost_abs_error += abs(cost - plan.predicted_cost)
+        return {
+            "predicted_seconds": round(plan.predicted_seconds, 2),
+            "actual_seconds": round(seconds, 2),
+            "latency_error_seconds": round(seconds - plan.predicted_seconds, 2),
+            "predicted_cost": round(plan.predicted_cost, 5),
+            "actual_cost": round(cost, 5),
+            "cost_error": round(cost - plan.predicted_cost, 5),
+        }
+
+    def accuracy(self) -> dict:
+        """Mean absolute prediction errors over all scheduled runs."""
+        with self._lock:
+            runs = self.runs or 1
+            return {
+                "runs": self.runs,
+                "mean_latency_error_seconds": round(self.latency_abs_error / runs, 3),
+                "mean_cost_error": round(self.cost_abs_error / runs, 6),
+            }
+
+    def plan(
+        self,
+        agents: list[str],
+        models: list[str],
+        latency_budget: Optional[float] = None,
+        cost_budget: Optional[float] = None,
+    ) -> SchedulePlan:
+        """Pick the configuration most likely to meet the budgets.
+
+        ``agents`` are the research agents the depth would normally run
+        (synthesis excluded); search is always kept. ``models`` lists the
+        candidate models, best first.
+        """
+        specialists = [a for a in agents if a != "search"]
+        best, best_key = None, None
+        for size in range(len(specialists), -1, -1):
+            for subset in itertools.combinations(specialists, size):
+                for research_model, synthesis_model in itertools.product(models, repeat=2):
+                    for max_queries in (3, 2, 1):
+                        for context_scale in (1.0, 0.5):
+                            candidate = self._predict(
+                                ["search", *subset], research_model, synthesis_model,
+                                max_queries, context_scale,
+                            )
+                            over = max(
+                                candidate.predicted_seconds / latency_budget if latency_budget else 0.0,
+                                candidate.predicted_cost / cost_budget if cost_budget else 0.0,
+                            )
+                            candidate.fits_budget = over <= 1.0
+                            quality = (
+                                2.0 * len(subset)
+                                + 2.0 * (synthesis_model == models[0])
+                                + 1.0 * (research_model == models[0])
+                                + 0.5 * max_queries
+                                + context_scale
+                            )
+                            # Feasible plans rank by quality then cost; the
+                            # rest by how far they overshoot
+                            if candidate.fits_budget:
+                                key = (1, quality, -candidate.predicted_cost)
+                            else:
+                                key = (0, -over, quality)
+                            if best_key is None or key > best_key:
+                                best, best_key = candidate, key
+        return best
+
+    def _predict(self, agents: list[str], research_model: str, synthesis_model: str,
+                 max_queries: int, context_scale: float) -> SchedulePlan:
+        stage_seconds = {}
+        cost = 0.0
+        models = {}
+        stages = list(agents)
+        if len(agents) > 1:
+            stages.insert(0, "coordinator")
+        for stage in stages:
+            estimate = self.estimate(stage, research_model)
+            factor = BREADTH_FACTOR[max_queries] if stage == "search" else 1.0
+            seconds_factor, prompt_factor = context_factors(stage, context_scale)
+            stage_seconds[stage] = estimate.seconds * factor * seconds_factor
+            cost += token_cost(research_model, estimate.prompt_tokens * factor * prompt_factor,
+                               estimate.completion_tokens * factor)
+            models[stage] = research_model
+        synthesis = self.estimate("synthesis", synthesis_model)
+        seconds_factor, prompt_factor = context_factors("synthesis", context_scale)
+        stage_seconds["synthesis"] = synthesis.seconds * seconds_factor
+        cost += token_cost(synthesis_model, synthesis.prompt_tokens * prompt_factor,
+                           synthesis.completion_tokens)
+        models["synthesis"] = synthesis_model
+
+        # Planning and synthesis are sequential; research agents run in parallel
+        parallel = max(stage_seconds[a] for a in agents)
+        seconds = stage_seconds.get("coordinator", 0.0) + parallel + stage_seconds["synthesis"]
+        return SchedulePlan(
+            agents=list(agents),
+            models=models,
+            max_queries=max_queries,
+            context_scale=context_scale,
+            predicted_seconds=seconds,
+            predicted_cost=cost,
+            fits_budget=False,
+            stage_seconds=stage_seconds,
+        )
+
+    def save(self, path: str):
+        """Persist the running estimates so later processes start warm."""
+        with self._lock:
+            payload = {
+                "estimates": [
+                    {"stage": stage, "model": model, **asdict(estimate)}
+                    for (stage, model), estimate in self.estimates.items()
+                ],
+            }
+        with open(path, "w") as f:
+            json.dump(payload, f, indent=2)
+
+    def load(self, path: str):
+        """Load estimates written by ``save``."""
+        with open(path) as f:
+            payload = json.load(f)
+        with self._lock:
+            for item in payload.get("estimates", []):
+                stage, model = item.pop("stage"), item.pop("model")
+                self.estimates[(stage, model)] = StageEstimate(**item)
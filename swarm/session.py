@@ -0,0 +1,288 @@
+"""Chat sessions that reuse earlier turns for follow-up questions.
+
+A stateless chat researches every message from scratch: planning, three
+generated search queries, every specialist and synthesis. Follow-ups such as
+"what about in Europe?" or "how fast is it growing?" mostly need what the
+previous turns already found. A ``ChatSession`` keeps those findings (agent
+outputs, their sources and the queries searched) in a bounded working set
+and answers a follow-up with at most one new search, for the follow-up as
+resolved against the conversation's topic, plus synthesis over the working
+set. Search results themselves stay in the search agent's cache.
+"""
+
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
+from .agents.base import AgentOutput, ordered_items, unique
+from .pipeline import terms
+
+if TYPE_CHECKING:
+    from .coordinator import ResearchResult, ResearchSwarm
+
+
+# Words that point back at the conversation ("how big is it?")
+_REFERENCE = re.compile(
+    r"\b(it|its|they|them|their|this|that|these|those|there|he|she|his|her|the same)\b", re.I
+)
+_OPENER = re.compile(
+    r"^\s*(and|also|but|so|what about|how about|why|what else|tell me more|more on|compare)\b", re.I
+)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+@dataclass
+class Turn:
+    """One answered message and the findings it added to the working set."""
+    query: str
+    resolved: str
+    depth: str
+    followup: bool
+    outputs: dict[str, AgentOutput]
+    summary: str
+    searches: list[str]
+    seconds: float
+    tokens: int
+    # Mean seconds/tokens of this session's full runs at the same depth
+    baseline: Optional[tuple[float, float]] = None
+
+    @property
+    def chars(self) -> int:
+        return sum(len(output.content) for output in self.outputs.values()) + len(self.summary)
+
+    def to_dict(self) -> dict:
+        data = {
+            "query": self.query,
+            "resolved": self.resolved,
+            "depth": self.depth,
+            "followup": self.followup,
+            "new_searches": self.searches if self.followup else [],
+            "seconds": round(self.seconds, 3),
+            "tokens": self.tokens,
+        }
+        if self.baseline:
+            data["seconds_saved"] = round(self.baseline[0] - self.seconds, 3)
+            data["tokens_saved"] = round(self.baseline[1] - self.tokens)
+        return data
+
+
+@dataclass
+class SessionStats:
+    """Per-session totals of reuse and its savings."""
+    turns: int = 0
+    followups: int = 0
+    searches_skipped: int = 0
+    seconds_saved: float = 0.0
+    tokens_saved: float = 0.0
+    history: list[dict] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return {
+            "turns": self.turns,
+            "followups": self.followups,
+            "searches_skipped": self.searches_skipped,
+            "seconds_saved": round(self.seconds_saved, 3),
+            "tokens_saved": round(self.tokens_saved),
+            "history": self.history,
+        }
+
+
+class ChatSession:
+    """A conversation with one swarm, answering follow-ups from a working set.
+
+    The working set holds the last ``max_turns`` turns, and older turns are
+    evicted first once their findings exceed ``max_chars`` (the latest turn is
+    always kept). A message is a follow-up when the session has history and
+    either it refers back ("it", "those", "what about ...") or at least half
+    its content words appeared in the conversation's queries. Anything else,
+    or ``fresh=True``, is researched in full and starts a new topic.
+
+    Follow-ups run with prompt budgets scaled by ``followup_scale``: their
+    search only has to add to what the working set already holds. The working
+    set itself is not scaled. Synthesis reads up to ``prior_chars`` of earlier
+    findings, as much as a full run's synthesis reads from four agents, and
+    condenses rather than cuts them in map-reduce mode.
+
+    Savings are measured against the session's own full runs: each follow-up
+    is compared with the mean latency and tokens of the full runs at its
+    depth, which is what the stateless chat spends per message.
+    """
+
+    def __init__(
+        self,
+        swarm: "ResearchSwarm",
+        max_turns: int = 6,
+        max_chars: int = 24_000,
+        followup_scale: float = 0.5,
+        prior_chars: int = 12_000,
+    ):
+        self.swarm = swarm
+        self.followup_scale = followup_scale
+        self.prior_chars = prior_chars
+        self.max_chars = max_chars
+        self.turns: deque[Turn] = deque(maxlen=max_turns)
+        self.topic: Optional[str] = None
+        self.stats = SessionStats()
+        # (seconds, tokens) of every full run, per depth
+        self._full_runs: dict[str, list[tuple[float, int]]] = {}
+        # Background prefetching plans follow-ups while a turn is recorded
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Forget the conversation (the swarm's search cache is kept)."""
+        self.turns.clear()
+        self.topic = None
+
+    def is_followup(self, query: str) -> bool:
+        """Whether ``query`` continues the current conversation."""
+        if not self.turns:
+            return False
+        # A cue may bring up a new aspect ("what about its cost?"), so it
+        # needs no words in common; "its" resolves to the topic
+        if _REFERENCE.search(query) or _OPENER.match(query):
+            return True
+        words = terms(query)
+        if not words:
+            return False
+        # Queries only: answers are long enough to share a word with anything
+        seen = terms(self.topic or "").union(
+            *(terms(q) for turn in self.turns for q in (turn.resolved, *turn.searches))
+        )
+        return len(words & seen) / len(words) >= 0.5
+
+    def resolve(self, query: str) -> str:
+        """The follow-up as a standalone query, anchored to the topic."""
+        if self.topic and not terms(query) >= terms(self.topic):
+            return f"{query.strip()} (regarding: {self.topic})"
+        return query.strip()
+
+    def searched(self) -> set[str]:
+        """Normalized queries already searched by the retained turns."""
+        return {_normalize(q) for turn in self.turns for q in turn.searches}
+
+    def working_set(self) -> dict[str, AgentOutput]:
+        """Findings and answers of the retained turns, newest first."""
+        turns = list(reversed(self.turns))
+        findings = [
+            (turn, name, output)
+            for turn in turns
+            for name, output in ordered_items(turn.outputs)
+            if output.success
+        ]
+        if not turns:
+            return {}
+        return {
+            "earlier findings": AgentOutput(
+                agent_name="session",
+                content="\n\n".join(
+                    f"On: {turn.resolved} ({name})\n{output.content}" for turn, name, output in findings
+                ),
+                sources=unique(s for _, _, output in findings for s in output.sources),
+                data={"prompt_chars": self.prior_chars},
+            ),
+            "earlier answers": AgentOutput(
+                agent_name="session",
+                content="\n\n".join(f"Q: {turn.query}\nA: {turn.summary}" for turn in turns),
+                data={"prompt_chars": 3000},
+            ),
+        }
+
+    def plan(self, query: str, fresh: bool = False,
+             followup: Optional[bool] = None) -> tuple[bool, str, dict]:
+        """How ``ask`` would research a message: (follow-up?, query, research kwargs).
+
+        ``followup`` overrides the detection, e.g. for predicted follow-ups.
+        """
+        with self._lock:
+            if followup is None:
+                followup = not fresh and self.is_followup(query)
+            if not followup or not self.turns:
+                return False, query.strip(), {}
+            resolved = self.resolve(query)
+            new_search = _normalize(resolved) not in self.searched()
+            return True, resolved, {
+                "agents": ["search"] if new_search else [],
+                "max_queries": 1,
+                "context_scale": self.followup_scale,
+                "prior": self.working_set(),
+            }
+
+    def ask(self, query: str, depth: str = "quick", fresh: bool = False, **research_kwargs) -> "ResearchResult":
+        """Answer a message, reusing the working set when it is a follow-up.
+
+        The result's ``metadata["session"]`` describes the turn: whether it
+        was a follow-up, what it searched and, when there is a baseline, the
+        seconds and tokens saved.
+        """
+        followup, resolved, kwargs = self.plan(query, fresh)
+        start = time.perf_counter()
+        result = self.swarm.research(resolved, depth=depth, **kwargs, **research_kwargs)
+        return self.record(query, resolved, depth, followup, result, time.perf_counter() - start)
+
+    def record(
+        self,
+        query: str,
+        resolved: str,
+        depth: str,
+        followup: bool,
+        result: "ResearchResult",
+        seconds: float,
+    ) -> "ResearchResult":
+        """Add an answered message to the working set (``ask`` does this).
+
+        ``seconds`` is how long the user waited, which for an answer computed
+        ahead of time can be far less than the run took.
+        """
+        tokens = _tokens(result)
+        search = result.agent_outputs.get("search")
+        with self._lock:
+            if not followup:
+                self.reset()
+                self.topic = resolved
+                self._full_runs.setdefault(depth, []).append((seconds, tokens))
+            runs = self._full_runs.get(depth)
+            baseline = None
+            if followup and runs:
+                baseline = (sum(s for s, _ in runs) / len(runs), sum(t for _, t in runs) / len(runs))
+
+            turn = Turn(
+                query=query,
+                resolved=resolved,
+                depth=depth,
+                followup=followup,
+                outputs={n: o for n, o in result.agent_outputs.items() if n != "synthesis"},
+                summary=result.summary,
+                searches=[q for q in (search.data.get("queries", []) if search else []) if isinstance(q, str)],
+                seconds=seconds,
+                tokens=tokens,
+                baseline=baseline,
+            )
+            self._remember(turn)
+
+            stats = self.stats
+            stats.turns += 1
+            if followup:
+                stats.followups += 1
+                stats.searches_skipped += search is None
+                if baseline:
+                    stats.seconds_saved += baseline[0] - seconds
+                    stats.tokens_saved += baseline[1] - tokens
+            stats.history.append(turn.to_dict())
+        result.metadata["session"] = turn.to_dict()
+        return result
+
+    def _remember(self, turn: Turn):
+        self.turns.append(turn)
+        while len(self.turns) > 1 and sum(t.chars for t in self.turns) > self.max_chars:
+            self.turns.popleft()
+
+
+def _tokens(result: "ResearchResult") -> int:
+    total = result.metadata.get("usage", {}).get("total", {})
+    return total.get("prompt_tokens", 0) + total.get("completion_tokens", 0)
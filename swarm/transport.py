@@ -0,0 +1,174 @@
+"""Shared, pooled HTTP transport for LLM and search traffic."""
+
+import importlib.util
+import threading
+from dataclasses import dataclass, asdict
+from typing import TYPE_CHECKING, Any, Optional
+
+from .router import race_timeout
+
+if TYPE_CHECKING:
+    import requests
+    from openai import OpenAI
+
+
+@dataclass
+class TransportStats:
+    """Request and connection counters for a transport."""
+    search_requests: int = 0
+    search_connections: int = 0
+    llm_requests: int = 0
+    llm_connections: int = 0
+    llm_tls_handshakes: int = 0
+
+    @property
+    def search_reuse_ratio(self) -> float:
+        """Fraction of search requests served on an already-open connection."""
+        if not self.search_requests:
+            return 0.0
+        return max(0.0, 1 - self.search_connections / self.search_requests)
+
+    @property
+    def llm_reuse_ratio(self) -> float:
+        """Fraction of LLM requests served on an already-open connection."""
+        if not self.llm_requests:
+            return 0.0
+        return max(0.0, 1 - self.llm_connections / self.llm_requests)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["search_reuse_ratio"] = round(self.search_reuse_ratio, 3)
+        data["llm_reuse_ratio"] = round(self.llm_reuse_ratio, 3)
+        return data
+
+
+class Transport:
+    """Keep-alive connection pools shared by every agent of a swarm.
+
+    Search backends go through one ``requests.Session`` and the OpenAI client
+    is built on one ``httpx.Client``; both are sized from ``max_connections``
+    (the swarm's ``max_connections``; every concurrent run and agent holds
+    one while it waits on the network) and live as long as the transport,
+    so repeated ``research()`` calls skip the TCP/TLS handshakes. HTTP/2 is
+    used for the LLM connection when the optional ``h2`` package is installed.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 5,
+        timeout: float = 10.0,
+        http2: Optional[bool] = None,
+    ):
+        self.max_connections = max(1, max_connections)
+        self.timeout = timeout
+        if http2 is None:
+            http2 = importlib.util.find_spec("h2") is not None
+        self.http2 = http2
+        self._lock = threading.Lock()
+        self._session: Optional["requests.Session"] = None
+        self._http_client = None
+        self._search_requests = 0
+        self._llm_requests = 0
+        self._llm_connections = 0
+        self._llm_tls_handshakes = 0
+
+    @property
+    def session(self) -> "requests.Session":
+        """The pooled session used for all search requests."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=4,
+                        pool_maxsize=self.max_connections,
+                    )
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+    def request(self, method: str, url: str, **kwargs) -> "requests.Response":
+        """Send a search request over the shared session."""
+        # Raced searches give up sooner so the loser frees its worker
+        kwargs.setdefault("timeout", race_timeout() or self.timeout)
+        with self._lock:
+            self._search_requests += 1
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> "requests.Response":
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> "requests.Response":
+        return self.request("POST", url, **kwargs)
+
+    def openai_client(self, **kwargs: Any) -> "OpenAI":
+        """Build an OpenAI client on the shared, pooled HTTP client."""
+        from openai import OpenAI
+
+        return OpenAI(http_client=self._get_http_client(), **kwargs)
+
+    def _get_http_client(self):
+        if self._http_client is None:
+            with self._lock:
+                if self._http_client is None:
+                    import httpx
+
+                    self._http_client = httpx.Client(
+                        http2=self.http2,
+                        limits=httpx.Limits(
+                            max_connections=self.max_connections,
+                            max_keepalive_connections=self.max_connections,
+                        ),
+                        timeout=httpx.Timeout(600.0, connect=self.timeout),
+                        event_hooks={"request": [self._on_llm_request]},
+                    )
+        return self._http_client
+
+    def _on_llm_request(self, request) -> None:
+        with self._lock:
+            self._llm_requests += 1
+        # httpcore reports connection setup through the "trace" extension.
+        request.extensions["trace"] = self._on_llm_trace
+
+    def _on_llm_trace(self, event_name: str, info: dict) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self._llm_connections += 1
+        elif event_name == "connection.start_tls.complete":
+            with self._lock:
+                self._llm_tls_handshakes += 1
+
+    def stats(self) -> TransportStats:
+        """Snapshot of request and handshake counters."""
+        search_connections = 0
+        if self._session is not None:
+            for adapter in set(self._session.adapters.values()):
+                pools = getattr(adapter, "poolmanager", None)
+                if pools is None:
+                    continue
+                for key in pools.pools.keys():
+                    pool = pools.pools.get(key)
+                    if pool is not None:
+                        search_connections += pool.num_connections
+        with self._lock:
+            return TransportStats(
+                search_requests=self._search_requests,
+                search_connections=search_connections,
+                llm_requests=self._llm_requests,
+                llm_connections=self._llm_connections,
+                llm_tls_handshakes=self._llm_tls_handshakes,
+            )
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+            if self._http_client is not None:
+                self._http_client.close()
+                self._http_client = None
@@ -0,0 +1,209 @@
+"""Token usage accounting for LLM calls."""
+
+import contextvars
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Optional, Union
+
+
+@dataclass
+class UsageTotals:
+    """Token counts for one agent or model."""
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """Share of prompt tokens served from the provider's prefix cache."""
+        if not self.prompt_tokens:
+            return 0.0
+        return self.cached_tokens / self.prompt_tokens
+
+    def add(self, prompt_tokens: int, completion_tokens: int, cached_tokens: int):
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cached_tokens += cached_tokens
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["cache_hit_rate"] = round(self.cache_hit_rate, 3)
+        return data
+
+
+class UsageTracker:
+    """Collects ``response.usage`` from every LLM call of one research run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total = UsageTotals()
+        self.by_agent: dict[str, UsageTotals] = {}
+        self.by_model: dict[str, UsageTotals] = {}
+        self.seconds: dict[str, float] = {}
+        self.models: dict[str, str] = {}
+
+    def add_time(self, stage: str, seconds: float, model: Optional[str] = None):
+        """Record wall time spent in a stage (agent run or planning)."""
+        with self._lock:
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+            if model:
+                self.models[stage] = model
+
+    def record(self, agent_name: str, usage: Any, model: Optional[str] = None):
+        """Record the usage object of a chat completion response."""
+        if usage is None:
+            return
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", 0) or 0
+        with self._lock:
+            self.total.add(prompt_tokens, completion_tokens, cached_tokens)
+            totals = self.by_agent.setdefault(agent_name, UsageTotals())
+            totals.add(prompt_tokens, completion_tokens, cached_tokens)
+            if model:
+                totals = self.by_model.setdefault(model, UsageTotals())
+                totals.add(prompt_tokens, completion_tokens, cached_tokens)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "total": self.total.to_dict(),
+                "by_agent": {
+                    name: totals.to_dict()
+                    for name, totals in sorted(self.by_agent.items())
+                },
+                "by_model": {
+                    name: totals.to_dict()
+                    for name, totals in sorted(self.by_model.items())
+                },
+                "seconds": {
+                    name: round(seconds, 3)
+                    for name, seconds in sorted(self.seconds.items())
+                },
+            }
+
+
+_current_tracker: contextvars.ContextVar[Optional[UsageTracker]] = contextvars.ContextVar(
+    "usage_tracker", default=None
+)
+
+
+def current_tracker() -> Optional[UsageTracker]:
+    """The tracker of the research run executing in this context, if any."""
+    return _current_tracker.get()
+
+
+def set_tracker(tracker: Optional[UsageTracker]) -> contextvars.Token:
+    """Make ``tracker`` current; pass the returned token to ``reset_tracker``."""
+    return _current_tracker.set(tracker)
+
+
+def reset_tracker(token: contextvars.Token):
+    _current_tracker.reset(token)
+
+
+def record_usage(agent_name: str, response: Any, model: Optional[str] = None):
+    """Record a response's usage against the current tracker, if any."""
+    tracker = _current_tracker.get()
+    if tracker is not None:
+        tracker.record(agent_name, getattr(response, "usage", None), model)
+
+
+class TokenLimitReached(RuntimeError):
+    """An LLM call did not fit in what is left of a token ceiling."""
+
+
+class TokenCeiling:
+    """A hard cap on the LLM tokens spent by a block of work, across threads.
+
+    Before it is sent, each call reserves its prompt (estimated generously
+    from its characters) plus a completion allowance, which it passes as
+    ``max_tokens``. A call that does not fit raises ``TokenLimitReached``
+    instead. Once answered, the call's reservation is replaced by its
+    reported usage. ``exhaust`` refuses every later call, e.g. once the work
+    is no longer wanted; calls already sent still finish.
+    """
+
+    chars_per_token = 3
+    max_completion = 4096
+
+    def __init__(self, tokens: int):
+        self.tokens = tokens
+        self.spent = 0
+        self.reached = False
+        self._reserved = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, request: dict) -> int:
+        """Reserve room for a chat completion request and cap its ``max_tokens``.
+
+        Returns the tokens reserved, to hand back to ``settle``.
+        """
+        prompt = sum(len(str(m.get("content") or "")) for m in request.get("messages", []))
+        prompt = prompt // self.chars_per_token + 1
+        with self._lock:
+            room = self.tokens - self.spent - self._reserved - prompt
+            completion = min(room, request.get("max_tokens") or self.max_completion)
+            if completion < 1:
+                self.reached = True
+                raise TokenLimitReached(f"LLM call needs ~{prompt} prompt tokens, "
+                                        f"{max(0, room + prompt)} of {self.tokens} left")
+            self._reserved += prompt + completion
+        request["max_tokens"] = completion
+        return prompt + completion
+
+    def exhaust(self):
+        """Refuse every call from now on."""
+        with self._lock:
+            self.tokens = 0
+
+    def settle(self, reserved: int, usage: Any):
+        """Replace a reservation with the call's reported usage (None if it failed)."""
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        with self._lock:
+            self._reserved -= reserved
+            self.spent += prompt_tokens + completion_tokens
+
+
+_current_ceiling: contextvars.ContextVar[Optional[TokenCeiling]] = contextvars.ContextVar(
+    "token_ceiling", default=None
+)
+
+
+def current_ceiling() -> Optional[TokenCeiling]:
+    """The token ceiling LLM calls in this context must fit in, if any."""
+    return _current_ceiling.get()
+
+
+def create_within_ceiling(create: Callable[..., Any], **request: Any) -> Any:
+    """Send a chat completion through ``create`` inside the current ceiling, if any."""
+    ceiling = _current_ceiling.get()
+    if ceiling is None:
+        return create(**request)
+    reserved = ceiling.reserve(request)
+    response = None
+    try:
+        response = create(**request)
+        return response
+    finally:
+        ceiling.settle(reserved, getattr(response, "usage", None))
+
+
+@contextmanager
+def token_ceiling(limit: Union[int, TokenCeiling]):
+    """Cap the LLM tokens spent inside the block, including the threads it starts.
+
+    ``limit`` is a token count or a ``TokenCeiling`` the caller keeps, e.g.
+    to ``exhaust`` it from another thread.
+    """
+    ceiling = limit if isinstance(limit, TokenCeiling) else TokenCeiling(limit)
+    token = _current_ceiling.set(ceiling)
+    try:
+        yield ceiling
+    finally:
+        _current_ceiling.reset(token)
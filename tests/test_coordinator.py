@@ -0,0 +1,38 @@
+"""Which stages a research run makes LLM calls for."""
+
+import sys
+from pathlib import Path
+
+# The offline fakes the benchmarks run against
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from _fakes import FakeClient, FakeTransport  # noqa: E402
+
+from swarm.coordinator import ResearchSwarm  # noqa: E402
+
+
+def calls_by_stage(result) -> dict[str, int]:
+    return {name: t["calls"] for name, t in result.metadata["usage"]["by_agent"].items()}
+
+
+def make_swarm() -> ResearchSwarm:
+    return ResearchSwarm(client=FakeClient(), transport=FakeTransport())
+
+
+def test_single_agent_run_skips_planning():
+    result = make_swarm().research("What is retrieval-augmented generation?", depth="quick")
+    assert list(result.agent_outputs) == ["search", "synthesis"]
+    assert "coordinator" not in calls_by_stage(result)
+
+
+def test_several_agents_are_planned():
+    result = make_swarm().research("What is retrieval-augmented generation?", depth="standard")
+    assert calls_by_stage(result)["coordinator"] == 1
+
+
+def test_empty_agent_list_runs_synthesis_alone():
+    result = make_swarm().research(
+        "What is retrieval-augmented generation?", depth="standard", agents=[]
+    )
+    assert list(result.agent_outputs) == ["synthesis"]
+    assert calls_by_stage(result) == {"synthesis": 1}
@@ -0,0 +1,35 @@
+"""Event bus subscriptions and per-run streams."""
+
+import threading
+
+from swarm.events import RUN_FINISHED, Event, EventBus, EventStream
+
+
+def test_close_does_not_block_on_stuck_subscriber():
+    bus = EventBus(max_queue=2)
+    release = threading.Event()
+    subscription = bus.subscribe(lambda event: release.wait())
+    for _ in range(5):
+        bus.publish(Event("test", "run"))
+
+    closer = threading.Thread(target=subscription.close)
+    closer.start()
+    closer.join(timeout=1.0)
+    assert not closer.is_alive()
+    release.set()
+
+
+def test_stream_follows_only_its_own_run():
+    bus = EventBus()
+    stream = EventStream(bus)
+    assert stream.run_id
+    bus.publish(Event(RUN_FINISHED, "other"))
+    bus.publish(Event("test", stream.run_id))
+    bus.publish(Event(RUN_FINISHED, stream.run_id))
+
+    chunks = []
+    reader = threading.Thread(target=lambda: chunks.extend(stream))
+    reader.start()
+    reader.join(timeout=2.0)
+    assert not reader.is_alive()
+    assert len(chunks) == 2 and all(stream.run_id in c for c in chunks)
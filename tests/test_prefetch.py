@@ -0,0 +1,78 @@
+"""Cancelling speculative prefetch work."""
+
+import sys
+import time
+from pathlib import Path
+
+# The offline fakes the benchmarks run against
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from _fakes import FakeClient, FakeTransport  # noqa: E402
+
+from swarm.coordinator import ResearchSwarm  # noqa: E402
+from swarm.prefetch import Prefetcher  # noqa: E402
+from swarm.session import ChatSession  # noqa: E402
+from swarm.usage import current_ceiling  # noqa: E402
+
+
+class RecordingClient(FakeClient):
+    """Records when each call starts and which token ceiling it ran under."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.started: list[tuple[float, object]] = []
+        create = self.chat.completions.create
+
+        def recording_create(**request):
+            with self.lock:
+                self.started.append((time.monotonic(), current_ceiling()))
+            return create(**request)
+
+        self.chat.completions.create = recording_create
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_new_message_stops_speculative_answers():
+    client = RecordingClient(latency=0.1, followups=(
+        "How fast is it growing?", "Who are the main vendors?", "What are the risks?",
+    ))
+    swarm = ResearchSwarm(client=client, transport=FakeTransport())
+    swarm.agents["search"].tavily_api_key = "test"
+    prefetcher = Prefetcher(
+        ChatSession(swarm), mode="full", token_budget=1_000_000, request_budget=100,
+    )
+    prefetcher.ask("What is the market size of AI agents in 2024?", depth="quick")
+    round_ = prefetcher.rounds[0]
+    wait_for(lambda: any(s.answering for s in round_.speculations))
+
+    cancelled_at = time.monotonic()
+    prefetcher.ask("Who is Ada Lovelace?", depth="quick", fresh=True)
+    assert round_.finished.wait(5)
+    prefetcher.cancel()
+
+    late = [t for t, ceiling in client.started if ceiling is round_.ceiling and t > cancelled_at]
+    assert late == []
+    assert all(s.result is None for s in round_.speculations)
+
+
+def test_matching_answer_in_flight_is_finished():
+    client = RecordingClient(latency=0.05, followups=("How fast is it growing?",))
+    swarm = ResearchSwarm(client=client, transport=FakeTransport())
+    swarm.agents["search"].tavily_api_key = "test"
+    prefetcher = Prefetcher(ChatSession(swarm), mode="full", followups=1,
+                            token_budget=1_000_000, request_budget=100)
+    prefetcher.ask("What is the market size of AI agents in 2024?", depth="quick")
+    round_ = prefetcher.rounds[0]
+    wait_for(lambda: any(s.answering for s in round_.speculations))
+
+    result = prefetcher.ask("How fast is it growing?", depth="quick")
+    assert result.metadata["prefetch"] == {
+        "hit": True, "question": "How fast is it growing?", "answer_ready": True,
+    }
+    prefetcher.cancel()
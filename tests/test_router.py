@@ -0,0 +1,122 @@
+"""Circuit breaker behaviour of the search router."""
+
+import time
+
+import pytest
+
+from swarm.router import (
+    CLOSED, HALF_OPEN, OPEN, NoProviderAvailable, SearchRouter, race_timeout,
+)
+
+
+class Backend:
+    """Search function that fails while ``failing`` is set."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.failing = False
+        self.calls = 0
+
+    def __call__(self, query: str) -> list[dict]:
+        self.calls += 1
+        if self.failing:
+            raise RuntimeError(f"{self.name} down")
+        return [{"title": self.name, "url": f"https://{self.name}.example.com", "content": query}]
+
+
+def test_open_breaker_skips_provider():
+    router = SearchRouter(failure_threshold=2, cooldown=60, race=False)
+    a, b = Backend("a"), Backend("b")
+    a.failing = True
+    providers = [("a", a), ("b", b)]
+    for _ in range(2):
+        assert router.search("q", providers)[1] == "b"
+    assert router.health("a").state == OPEN
+
+    router.search("q", providers)
+    assert a.calls == 2
+
+
+def test_unused_probe_claim_does_not_lock_out_fallback():
+    # b trips, cools down to half-open, then the primary answers on its own:
+    # b's probe was never sent, so b must stay available
+    router = SearchRouter(failure_threshold=1, cooldown=0, race=False)
+    a, b = Backend("a"), Backend("b")
+    b.failing = True
+    assert router.search("q", [("b", b), ("a", a)])[1] == "a"
+    assert router.health("b").state == OPEN
+
+    b.failing = False
+    assert router.search("q", [("a", a), ("b", b)])[1] == "a"
+    assert router.health("b").probing is False
+
+    a.failing = True
+    results, provider = router.search("q", [("a", a), ("b", b)])
+    assert provider == "b" and results
+    assert router.health("b").state == CLOSED
+
+
+def test_failed_probe_reopens_breaker():
+    router = SearchRouter(failure_threshold=1, cooldown=0, race=False)
+    a = Backend("a")
+    a.failing = True
+    with pytest.raises(NoProviderAvailable):
+        router.search("q", [("a", a)])
+    assert router.health("a").state == OPEN
+
+    with pytest.raises(NoProviderAvailable):
+        router.search("q", [("a", a)])
+    assert a.calls == 2
+    assert router.health("a").state == OPEN
+
+
+def test_all_open_raises_without_calling():
+    router = SearchRouter(failure_threshold=1, cooldown=60, race=False)
+    a = Backend("a")
+    a.failing = True
+    with pytest.raises(NoProviderAvailable):
+        router.search("q", [("a", a)])
+    with pytest.raises(NoProviderAvailable, match="circuit-broken"):
+        router.search("q", [("a", a)])
+    assert a.calls == 1
+    assert router.health("a").state in (OPEN, HALF_OPEN)
+
+
+class SlowBackend(Backend):
+    """Backend that answers after ``delay`` seconds, noting its timeout."""
+
+    def __init__(self, name: str, delay: float):
+        super().__init__(name)
+        self.delay = delay
+        self.timeouts = []
+
+    def __call__(self, query: str) -> list[dict]:
+        self.timeouts.append(race_timeout())
+        time.sleep(self.delay)
+        return super().__call__(query)
+
+
+def test_race_uses_own_pool_and_race_timeout():
+    router = SearchRouter(slow_threshold=0.01, race_workers=6, race_timeout=2.5)
+    a, b = SlowBackend("a", 0.05), SlowBackend("b", 0.0)
+    router.search("q", [("a", a)])
+    assert a.timeouts == [None]
+
+    assert router.search("q", [("a", a), ("b", b)])[1] == "b"
+    assert router._executor._max_workers == 6
+    assert b.timeouts == [2.5]
+
+
+def test_race_cancels_loser_not_yet_started():
+    router = SearchRouter(slow_threshold=0.01, race_workers=2)
+    a, b = SlowBackend("a", 0.05), Backend("b")
+    x, y = SlowBackend("x", 0.3), Backend("y")
+    router.search("q", [("a", a)])
+    router.search("q", [("x", x)])
+    # x loses to y and keeps one of the two workers busy
+    assert router.search("q", [("x", x), ("y", y)])[1] == "y"
+    # a wins on the free worker before b gets one; b is never sent
+    assert router.search("q", [("a", a), ("b", b)])[1] == "a"
+    time.sleep(0.4)
+    assert b.calls == 0
+    assert router.health("b").probing is False
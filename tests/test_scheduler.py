@@ -0,0 +1,28 @@
+"""Scheduler estimates across prompt budget scales."""
+
+import pytest
+
+from swarm.scheduler import Scheduler
+
+
+@pytest.mark.parametrize("stage", ["data", "synthesis"])
+def test_scaled_observation_is_normalized(stage):
+    full, scaled = Scheduler(), Scheduler()
+    full.observe(stage, "gpt-4o", 10.0, 4000, 500)
+    scaled.observe(stage, "gpt-4o", 7.5, 2000, 500, context_scale=0.5)
+    a, b = full.estimate(stage, "gpt-4o"), scaled.estimate(stage, "gpt-4o")
+    assert (a.seconds, a.prompt_tokens, a.completion_tokens) == (
+        b.seconds, b.prompt_tokens, b.completion_tokens
+    )
+
+
+def test_prediction_scales_every_agent_stage():
+    scheduler = Scheduler()
+    for stage in ("coordinator", "search", "data", "synthesis"):
+        scheduler.observe(stage, "gpt-4o", 10.0, 4000, 500)
+    full = scheduler._predict(["search", "data"], "gpt-4o", "gpt-4o", 3, 1.0)
+    half = scheduler._predict(["search", "data"], "gpt-4o", "gpt-4o", 3, 0.5)
+    assert half.stage_seconds["coordinator"] == full.stage_seconds["coordinator"]
+    for stage in ("search", "data", "synthesis"):
+        assert half.stage_seconds[stage] == pytest.approx(0.75 * full.stage_seconds[stage])
+    assert half.predicted_cost < full.predicted_cost
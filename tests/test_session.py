@@ -0,0 +1,47 @@
+"""Follow-up detection of chat sessions."""
+
+import pytest
+
+from swarm.session import ChatSession, Turn
+
+
+def session_about(topic: str) -> ChatSession:
+    session = ChatSession(swarm=None)
+    session.topic = topic
+    session.turns.append(Turn(
+        query=topic, resolved=topic, depth="quick", followup=False,
+        outputs={}, summary="", searches=[topic], seconds=1.0, tokens=100,
+    ))
+    return session
+
+
+@pytest.mark.parametrize("query", [
+    "what about its cost?",
+    "and its memory safety?",
+    "Is it popular?",
+    "What about in Europe?",
+    "Which of those are profitable?",
+    "Is Rust safe for systems programming?",
+])
+def test_followups(query):
+    assert session_about("Why is Rust used for systems programming?").is_followup(query)
+
+
+@pytest.mark.parametrize("query", [
+    "Who is Ada Lovelace?",
+    "Explain photosynthesis",
+    "Best hiking trails near Denver",
+])
+def test_standalone_questions(query):
+    assert not session_about("Why is Rust used for systems programming?").is_followup(query)
+
+
+def test_no_history_is_never_a_followup():
+    assert not ChatSession(swarm=None).is_followup("what about its cost?")
+
+
+def test_pronoun_followup_resolves_to_the_topic():
+    session = session_about("Why is Rust used for systems programming?")
+    assert session.resolve("what about its cost?") == (
+        "what about its cost? (regarding: Why is Rust used for systems programming?)"
+    )